@@ -0,0 +1,96 @@
+"""
+Cache Codec Benchmark
+Compares payload size and encode/decode time of the cache codecs on
+prediction-shaped payloads
+
+Usage:
+    python benchmarks/bench_cache_codecs.py --repeat 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poisson_model import PoissonModel, get_score_distribution
+from serialization import CODECS, MSGPACK_AVAILABLE, JSONCodec
+
+
+def build_payloads(seed=7):
+    """
+    Payloads shaped like the API's cached responses
+    """
+    rng = np.random.default_rng(seed)
+    model = PoissonModel(random_state=seed)
+
+    def team():
+        # Keys read by PoissonModel._calculate_lambda
+        return {'off_rating': rng.uniform(105, 120), 'def_rating': rng.uniform(105, 120),
+                'pace': rng.uniform(96, 104)}
+
+    matchups = [(team(), team()) for _ in range(15)]
+
+    dist = get_score_distribution(115.2, 110.8)
+
+    return {
+        # Array-valued dict from the vectorized slate simulation
+        'slate_simulation': model.simulate_slate(matchups, n_simulations=2000),
+        # Full score/margin/total PMFs for one matchup
+        'score_distribution': {
+            'team1_pmf': dist.team1_pmf,
+            'team2_pmf': dist.team2_pmf,
+            'margin_pmf': dist.margin_pmf,
+            'total_pmf': dist.total_pmf,
+        },
+        # Response-style dict holding a list of Monte Carlo draws
+        'prediction_list': {
+            'player': 'LeBron James',
+            'stat': 'points',
+            'line': 25.5,
+            'simulations': rng.normal(26.0, 6.0, 10000).tolist(),
+        },
+    }
+
+
+def time_codec(codec, payload, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        raw = codec.encode(payload)
+    encode_time = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        codec.decode(raw)
+    decode_time = (time.perf_counter() - start) / repeat
+
+    return len(raw), encode_time, decode_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    codec_names = [name for name in CODECS if name != 'msgpack' or MSGPACK_AVAILABLE]
+    payloads = build_payloads()
+
+    for payload_name, payload in payloads.items():
+        print(f"\n{payload_name}")
+        json_size, json_encode, json_decode = time_codec(JSONCodec(), payload, args.repeat)
+
+        for name in codec_names:
+            size, encode_time, decode_time = time_codec(CODECS[name](), payload, args.repeat)
+            print(f"  {name:<8} {size:>9,} bytes ({size / json_size:5.2f}x)  "
+                  f"encode {encode_time * 1e3:7.3f} ms ({json_encode / encode_time:5.1f}x)  "
+                  f"decode {decode_time * 1e3:7.3f} ms ({json_decode / decode_time:5.1f}x)")
+
+    if not MSGPACK_AVAILABLE:
+        print("\nmsgpack not installed; skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+ELO Season Simulation Benchmark
+Compares the vectorized simulate_season engine against the per-game Python loop
+
+Usage:
+    python benchmarks/bench_elo_season.py --simulations 1000
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from elo_system import ELORatingSystem
+
+
+def build_league(n_teams=30, seed=7):
+    """
+    Create an ELO system with spread-out ratings and a full 82-game schedule
+    """
+    rng = np.random.default_rng(seed)
+    elo = ELORatingSystem()
+    
+    team_ids = [f"T{idx:02d}" for idx in range(n_teams)]
+    for team_id in team_ids:
+        elo.ratings[team_id] = float(rng.normal(1500, 100))
+        elo.rating_history[team_id] = []
+    
+    # Round-robin home-and-away until every team has ~82 games (1,230 for 30 teams)
+    pairs = list(itertools.permutations(team_ids, 2))
+    rng.shuffle(pairs)
+    n_games = n_teams * 82 // 2
+    schedule = [
+        {'team1_id': home, 'team2_id': away, 'is_team1_home': True, 'league': 'nba'}
+        for home, away in itertools.islice(itertools.cycle(pairs), n_games)
+    ]
+    
+    return elo, schedule
+
+
+def time_call(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--simulations', type=int, default=1000)
+    parser.add_argument('--loop-simulations', type=int, default=None,
+                        help='Simulations for the Python loop (defaults to --simulations)')
+    args = parser.parse_args()
+    
+    loop_sims = args.loop_simulations or args.simulations
+    elo, schedule = build_league()
+    
+    print(f"Schedule: {len(schedule)} games, {len(elo.ratings)} teams")
+    
+    vectorized, vec_time = time_call(elo.simulate_season, schedule, args.simulations, random_state=0)
+    _, dynamic_time = time_call(elo.simulate_season, schedule, args.simulations, random_state=0, dynamic=True)
+    loop, loop_time = time_call(elo._simulate_season_loop, schedule, loop_sims)
+    
+    # Normalise to per-simulation cost so runs with different sizes compare fairly
+    vec_per_sim = vec_time / args.simulations
+    loop_per_sim = loop_time / loop_sims
+    
+    print(f"Vectorized: {args.simulations:>6} sims in {vec_time:8.3f}s ({vec_per_sim * 1e3:.3f} ms/sim)")
+    print(f"Dynamic:    {args.simulations:>6} sims in {dynamic_time:8.3f}s "
+          f"({dynamic_time / args.simulations * 1e3:.3f} ms/sim)")
+    print(f"Loop:       {loop_sims:>6} sims in {loop_time:8.3f}s ({loop_per_sim * 1e3:.3f} ms/sim)")
+    print(f"Speedup:    {loop_per_sim / vec_per_sim:.1f}x")
+    
+    max_gap = max(abs(vectorized[t]['mean_wins'] - loop[t]['mean_wins']) for t in loop)
+    print(f"Max mean-wins difference between engines: {max_gap:.2f}")
+
+
+if __name__ == "__main__":
+    main()
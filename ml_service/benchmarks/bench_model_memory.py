@@ -0,0 +1,86 @@
+"""
+Model Memory Benchmark
+Starts N worker processes that each load every model artifact, either by
+unpickling *.pkl or by memory-mapping the flat *.npy exports, and reports
+per-worker RSS / PSS / private memory while all workers are alive
+
+Usage:
+    python src/model_artifacts.py export
+    python benchmarks/bench_model_memory.py --workers 4
+"""
+
+import argparse
+import multiprocessing as mp
+import sys
+import warnings
+from pathlib import Path
+
+SRC_PATH = Path(__file__).parent.parent / "src"
+MODELS_PATH = Path(__file__).parent.parent / "models"
+
+
+def worker(mode, barrier, results):
+    sys.path.insert(0, str(SRC_PATH))
+    warnings.filterwarnings('ignore')
+    import numpy as np
+    from model_artifacts import load_flat_artifact, process_memory
+    from model_registry import load_artifact_file
+
+    baseline = process_memory()
+    models = []
+    for path in sorted(MODELS_PATH.rglob(f"*.{'npy' if mode == 'flat' else 'pkl'}")):
+        if mode == 'pickle' and not path.with_suffix('.npy').exists():
+            continue  # compare the same set of artifacts
+        model = load_flat_artifact(path) if mode == 'flat' else load_artifact_file(path)
+        if hasattr(model, 'predict'):
+            model.predict(np.zeros((64, model.n_features_in_)))
+        models.append(model)
+
+    barrier.wait()
+    loaded = process_memory()
+    results.put({key: loaded.get(key, 0) - baseline.get(key, 0) for key in loaded} | {'models': len(models)})
+    barrier.wait()
+
+
+def run(mode, workers):
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(mode, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    if not Path('/proc/self/smaps_rollup').exists():
+        print("needs /proc/self/smaps_rollup (Linux)")
+        return 1
+    if not any(MODELS_PATH.rglob('*.npy')):
+        print("no flat artifacts; run python src/model_artifacts.py export first")
+        return 1
+
+    summary = {}
+    for mode in ('pickle', 'flat'):
+        stats = run(mode, args.workers)
+        per_worker = {key: sum(s[key] for s in stats) / len(stats) for key in ('rss', 'pss', 'private_dirty')}
+        summary[mode] = per_worker
+        print(f"{mode:<7} {stats[0]['models']} artifacts x {args.workers} workers: "
+              f"rss +{per_worker['rss'] / 2**20:6.1f} MiB  pss +{per_worker['pss'] / 2**20:6.1f} MiB  "
+              f"private +{per_worker['private_dirty'] / 2**20:6.1f} MiB per worker")
+
+    saved = summary['pickle']['pss'] - summary['flat']['pss']
+    print(f"\nsaved per worker: {saved / 2**20:.1f} MiB pss, "
+          f"{saved * args.workers / 2**20:.1f} MiB across {args.workers} workers")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
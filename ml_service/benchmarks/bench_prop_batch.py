@@ -0,0 +1,70 @@
+"""
+Prop Batch Benchmark
+Times the /predict/player_props:batch scoring path (build_prop_features +
+score_props on the leased PropEnsemble) for a range of slate sizes, once
+with the flat *.npy exports and once with the native pickles
+
+Usage:
+    python src/model_artifacts.py export
+    python benchmarks/bench_prop_batch.py --sizes 1 64 1000
+"""
+
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+SRC_PATH = Path(__file__).parent.parent / "src"
+MODELS_PATH = Path(__file__).parent.parent / "models"
+
+sys.path.insert(0, str(SRC_PATH))
+
+
+def slate(size, stat):
+    stats = ('points', 'rebounds', 'assists') if stat == 'mixed' else (stat,)
+    return [{'player_name': f"player {i}", 'stat_type': stats[i % len(stats)], 'line': 10.0 + i % 20}
+            for i in range(size)]
+
+
+def time_batch(ensemble, props, repeats):
+    from prop_inference import build_prop_features, score_props
+
+    score_props(props, build_prop_features(props), ensemble)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        score_props(props, build_prop_features(props), ensemble)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 64, 256, 1000])
+    parser.add_argument('--stat', default='points', help="points/rebounds/assists, or mixed")
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    from model_registry import ModelRegistry
+
+    if not any(MODELS_PATH.rglob('*.npy')):
+        print("no flat artifacts; run python src/model_artifacts.py export first")
+        return 1
+
+    registries = {
+        'flat': ModelRegistry(MODELS_PATH).start(),
+        'pickle': ModelRegistry(MODELS_PATH, prefer_flat=False).start()
+    }
+
+    print(f"{'props':>6} {'flat ms':>9} {'pickle ms':>10} {'flat/pickle':>12}")
+    for size in args.sizes:
+        props = slate(size, args.stat)
+        timings = {mode: time_batch(registry.prop_ensemble, props, args.repeats)
+                   for mode, registry in registries.items()}
+        print(f"{size:>6} {timings['flat']:>9.2f} {timings['pickle']:>10.2f} "
+              f"{timings['flat'] / timings['pickle']:>11.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
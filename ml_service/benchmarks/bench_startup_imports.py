@@ -0,0 +1,81 @@
+"""
+Startup Import Benchmark
+Profiles `python -X importtime` for the API entry module and reports total
+import time, the slowest imports and which heavy ML libraries were pulled in
+
+Usage:
+    python benchmarks/bench_startup_imports.py --module api --repeat 5
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_PATH = Path(__file__).parent.parent / "src"
+
+# Libraries that should only load with the models, never at API import
+HEAVY_MODULES = ['torch', 'xgboost', 'lightgbm', 'catboost', 'optuna', 'shap',
+                 'sklearn', 'scipy', 'pandas', 'joblib']
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def profile_import(module):
+    """
+    Import module in a fresh interpreter
+
+    Returns:
+        (entries, loaded) where entries are (cumulative_us, depth, name) and
+        loaded is the list of heavy modules present afterwards
+    """
+    check = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        cwd=SRC_PATH, capture_output=True, text=True,
+        env={**os.environ, 'MODEL_RELOAD_INTERVAL': '0'}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            entries.append((int(cumulative), len(indent) // 2, name))
+
+    loaded = [m for m in result.stdout.strip().splitlines()[-1].split(',') if m] if result.stdout.strip() else []
+    return entries, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--module', default='api')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.repeat):
+        entries, loaded = profile_import(args.module)
+        totals.append(next(us for us, _, name in reversed(entries) if name == args.module))
+
+    print(f"import {args.module}: median {statistics.median(totals) / 1e3:.1f} ms "
+          f"(min {min(totals) / 1e3:.1f}, max {max(totals) / 1e3:.1f}) over {args.repeat} runs")
+
+    # Slowest direct dependencies of the entry module, from the last run
+    print(f"\nslowest imports (cumulative):")
+    direct = sorted((e for e in entries if e[1] == 1), reverse=True)[:args.top]
+    for cumulative, _, name in direct:
+        print(f"  {cumulative / 1e3:9.1f} ms  {name}")
+
+    print(f"\nheavy ML modules loaded at import: {', '.join(loaded) or 'none'}")
+    return 1 if loaded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,6 +30,11 @@ from scipy.optimize import minimize
 from functools import lru_cache
 import warnings
 
+try:
+    from .caching import TTLCache
+except ImportError:
+    from caching import TTLCache
+
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
@@ -88,28 +93,21 @@ class RiskMetrics:
 class MLEngineCore:
     """Core ML infrastructure with caching, monitoring, and fault tolerance"""
     
-    def __init__(self):
-        self.cache = {}
-        self.cache_ttl = {}
+    def __init__(self, cache_max_entries: int = 10000, cache_max_bytes: Optional[int] = None):
+        self.cache = TTLCache(max_entries=cache_max_entries, max_bytes=cache_max_bytes,
+                              default_ttl=300, name="ml_engine_cache")
         self.request_count = 0
         self.success_count = 0
         self.failure_count = 0
         self.latencies = deque(maxlen=1000)
         
     def cache_get(self, key: str) -> Optional[Any]:
-        """#1: Advanced request caching with TTL"""
-        if key in self.cache:
-            if datetime.now().timestamp() < self.cache_ttl.get(key, 0):
-                return self.cache[key]
-            else:
-                del self.cache[key]
-                del self.cache_ttl[key]
-        return None
+        """#1: Advanced request caching with TTL (bounded LRU)"""
+        return self.cache.get(key)
     
     def cache_set(self, key: str, value: Any, ttl_seconds: int = 300):
         """Set cache with TTL"""
-        self.cache[key] = value
-        self.cache_ttl[key] = datetime.now().timestamp() + ttl_seconds
+        self.cache.set(key, value, ttl=ttl_seconds)
         
     def generate_cache_key(self, *args) -> str:
         """Generate consistent cache key"""
@@ -132,6 +130,7 @@ class MLEngineCore:
             "avg_latency_ms": np.mean(self.latencies) if self.latencies else 0,
             "p95_latency_ms": np.percentile(self.latencies, 95) if self.latencies else 0,
             "cache_size": len(self.cache),
+            "cache": self.cache.stats(),
             "status": "healthy" if self.success_count / max(self.request_count, 1) > 0.95 else "degraded"
         }
 
@@ -429,7 +428,7 @@ class AdvancedFeatureEngineering:
     """
     
     def __init__(self):
-        self.feature_cache = {}
+        self.feature_cache = TTLCache(max_entries=5000, default_ttl=600, name="feature_cache")
     
     def calculate_momentum_indicators(self, data: np.ndarray, windows: List[int] = [5, 10, 20]) -> Dict[str, float]:
         """#51: Momentum indicators"""
@@ -1,18 +1,18 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, status
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, ValidationError
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 import json
-import joblib
 import numpy as np
-import pandas as pd
 from pathlib import Path
 import logging
 import time
 import traceback
 import os
+import asyncio
 
 # Configure comprehensive logging FIRST
 logging.basicConfig(
@@ -95,6 +95,23 @@ except ImportError as e:
         ModelPerformanceMetrics = dict
         BetType = str
 
+try:
+    from src.tiered_cache import TieredCache
+    from src.serialization import get_codec
+    from src.prop_inference import build_prop_features, score_props
+    from src.micro_batching import get_batcher, batcher_stats
+    from src.inference_executor import ExecutorSaturated, get_inference_executor
+    from src.model_registry import model_registry
+    from src.stream_api import odds_feed, router as stream_router
+except ImportError:
+    from tiered_cache import TieredCache
+    from serialization import get_codec
+    from prop_inference import build_prop_features, score_props
+    from micro_batching import get_batcher, batcher_stats
+    from inference_executor import ExecutorSaturated, get_inference_executor
+    from model_registry import model_registry
+    from stream_api import odds_feed, router as stream_router
+
 # Startup time for uptime tracking
 START_TIME = time.time()
 
@@ -122,6 +139,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Live odds / line movement / signal feeds (WebSocket and SSE)
+app.include_router(stream_router)
+
 # Request tracking and error handling middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -168,14 +188,26 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     logger.warning(f"HTTP {exc.status_code}: {exc.detail}")
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=exc.headers
+    )
+
+# Inference executor backlog full - shed load instead of queueing
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    """Handle inference backpressure"""
+    logger.warning(f"Shedding {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Inference capacity exhausted, retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)}
     )
 
 # Redis cache (optional - configured but not connected yet)
 cache = None
 try:
     if redis is not None:
-        cache = redis.Redis(host='localhost', port=6379, decode_responses=True, db=0, socket_timeout=1, socket_connect_timeout=1)
+        cache = redis.Redis(host='localhost', port=6379, decode_responses=False, db=0, socket_timeout=1, socket_connect_timeout=1)
         # Test connection lazily - don't block startup
         logger.info("Redis configured (will connect on first use)")
     else:
@@ -184,9 +216,20 @@ except Exception as e:
     logger.info("Redis not configured (service will work without caching)")
     cache = None
 
+# In-process L1 in front of Redis; Redis is bypassed while its circuit is open
+response_cache = TieredCache(
+    cache,
+    default_ttl=int(os.getenv('CACHE_TTL', 300)),
+    stale_ttl=int(os.getenv('CACHE_STALE_TTL', 60)),
+    codec=get_codec(os.getenv('CACHE_CODEC', 'binary'))
+)
+
 # Model storage
 MODELS_PATH = Path(__file__).parent.parent / "models"
 
+MAX_BATCH_PROPS = int(os.getenv('MAX_BATCH_PROPS', 1000))
+MODEL_LOADING_RETRY_AFTER = 5
+
 # ============================================
 # Pydantic Models (Legacy - kept for backward compatibility)
 # ============================================
@@ -201,6 +244,10 @@ class LegacyPlayerPropRequest(BaseModel):
     opponent: str
     is_home: bool
 
+class PlayerPropBatchRequest(BaseModel):
+    props: List[LegacyPlayerPropRequest]
+    chunk_size: Optional[int] = None  # rows scored per pass; None = whole slate in one pass
+
 class LegacyGameOutcomeRequest(BaseModel):
     home_team: str
     away_team: str
@@ -234,27 +281,15 @@ def get_cache_key(prefix: str, **kwargs) -> str:
 
 def safe_cache_get(key: str) -> Optional[Any]:
     """Safely get value from cache with error handling"""
-    if cache is None:
-        return None
-    try:
-        value = cache.get(key)
-        if value:
-            logger.debug(f"Cache hit: {key}")
-            return json.loads(value)
-        return None
-    except Exception as e:
-        logger.error(f"Cache get error for key {key}: {e}")
-        return None
+    value = response_cache.get(key)
+    if value is not None:
+        logger.debug(f"Cache hit: {key}")
+    return value
 
 def safe_cache_set(key: str, value: Any, ttl: int = 300):
     """Safely set value in cache with error handling"""
-    if cache is None:
-        return
-    try:
-        cache.setex(key, ttl, json.dumps(value))
-        logger.debug(f"Cache set: {key} (TTL: {ttl}s)")
-    except Exception as e:
-        logger.error(f"Cache set error for key {key}: {e}")
+    response_cache.set(key, value, ttl=ttl)
+    logger.debug(f"Cache set: {key} (TTL: {ttl}s)")
 
 def calculate_expected_value(probability: float, american_odds: int) -> float:
     """Calculate expected value from probability and odds"""
@@ -279,77 +314,6 @@ def odds_to_decimal(american_odds: int) -> float:
     else:
         return (100 / abs(american_odds)) + 1
 
-def generate_mock_features(player_name: str, stat_type: str, opponent: str) -> Dict:
-    import random
-    random.seed(hash(player_name + stat_type + opponent) % 10000)
-    
-    base_stats = {
-        'points': 25.0,
-        'rebounds': 8.0,
-        'assists': 6.0,
-        'threes': 2.5,
-        'steals': 1.2,
-        'blocks': 0.8
-    }
-    
-    return {
-        'season_avg': base_stats.get(stat_type, 10.0) + random.uniform(-3, 3),
-        'l5_avg': base_stats.get(stat_type, 10.0) + random.uniform(-4, 4),
-        'l10_avg': base_stats.get(stat_type, 10.0) + random.uniform(-2, 2),
-        'vs_opponent_avg': base_stats.get(stat_type, 10.0) + random.uniform(-5, 5),
-        'home_avg': base_stats.get(stat_type, 10.0) + random.uniform(-2, 3),
-        'days_rest': random.randint(0, 4),
-        'opponent_def_rating': random.uniform(105, 118),
-        'pace': random.uniform(95, 105),
-        'usage_rate': random.uniform(20, 35),
-        'minutes_projection': random.uniform(28, 38),
-        'injury_factor': random.uniform(0.95, 1.0),
-    }
-
-def predict_with_mock_model(features: Dict, stat_type: str, line: float) -> Dict:
-    import random
-    
-    base_prediction = features['season_avg']
-    recent_form = (features['l5_avg'] + features['l10_avg']) / 2
-    prediction = (base_prediction * 0.6 + recent_form * 0.4)
-    prediction += random.uniform(-2, 2)
-    
-    std_dev = 3.5
-    conf_interval = [prediction - 1.96 * std_dev, prediction + 1.96 * std_dev]
-    
-    if prediction > line:
-        over_prob = 0.5 + min(0.45, (prediction - line) / 10)
-    else:
-        over_prob = 0.5 - min(0.45, (line - prediction) / 10)
-    
-    over_prob = max(0.1, min(0.9, over_prob + random.uniform(-0.05, 0.05)))
-    
-    ev = calculate_expected_value(over_prob, -110)
-    kelly = calculate_kelly_criterion(over_prob, odds_to_decimal(-110))
-    kelly_fraction = kelly * 0.25
-    
-    confidence = int(70 + random.uniform(0, 25))
-    
-    feature_importance = [
-        {"name": "Recent Form (L5)", "impact": round(random.uniform(2, 5), 1)},
-        {"name": "vs Opponent History", "impact": round(random.uniform(1, 4), 1)},
-        {"name": "Home Court", "impact": round(random.uniform(0.5, 2.5), 1)},
-        {"name": "Minutes Projection", "impact": round(random.uniform(1, 3), 1)},
-        {"name": "Opponent Defense", "impact": round(random.uniform(-2, 1), 1)},
-    ]
-    
-    return {
-        "prediction": round(prediction, 1),
-        "confidence_interval": [round(conf_interval[0], 1), round(conf_interval[1], 1)],
-        "over_probability": round(over_prob, 3),
-        "expected_value": round(ev, 4),
-        "kelly_fraction": round(kelly_fraction, 4),
-        "recommended_bet_size_percent": round(kelly_fraction * 100, 2),
-        "confidence_score": confidence,
-        "feature_importance": feature_importance,
-        "model_version": "xgboost_v1.2.3"
-    }
-
 # ============================================
 # API Endpoints
 # ============================================
@@ -362,7 +326,12 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "ready": "/ready",
             "player_prop": "/predict/player_prop",
+            "player_props_batch": "/predict/player_props:batch",
+            "model_versions": "/models/versions",
+            "stream": "/api/v2/stream",
+            "stream_sse": "/api/v2/stream/sse",
             "game_outcome": "/predict/game_outcome",
             "live_game": "/predict/live_game",
             "sharp_money": "/detect/sharp_money",
@@ -372,46 +341,187 @@ def root():
 
 @app.get("/health")
 def health_check():
-    models_status = {
-        "points_model": (MODELS_PATH / "player_props" / "points_model.pkl").exists(),
-        "rebounds_model": (MODELS_PATH / "player_props" / "rebounds_model.pkl").exists(),
-        "assists_model": (MODELS_PATH / "player_props" / "assists_model.pkl").exists(),
-    }
+    """Liveness: the process is up and serving, whether or not models are loaded"""
+    models_status = {name: True for name in model_registry.names()}
+    models_status.update({name: False for name in model_registry.failures})
     
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "redis_connected": cache is not None,
+        "cache": response_cache.stats(),
+        "batching": batcher_stats(),
+        "executor": inference_executor.stats(),
         "models_loaded": models_status,
+        "models_ready": model_registry.ready,
         "version": "1.0.0"
     }
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness: every model artifact is loaded and warmed up"""
+    status_code = status.HTTP_200_OK if model_registry.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=model_registry.status())
+
+@app.get("/models/versions")
+def model_versions():
+    """Live model generation, generations still draining and reload counters"""
+    return model_registry.generations()
+
+def score_prop_batch(props: List[Dict]) -> List[Dict]:
+    """Score a list of prop dicts in one vectorized pass"""
+    with model_registry.acquire() as generation:
+        results = score_props(props, build_prop_features(props), generation.prop_ensemble)
+        feature_importance = generation.prop_ensemble.feature_importance()
+    for result in results:
+        result["model_generation"] = generation.version
+        result["feature_importance"] = feature_importance
+    return results
+
+# Heavy model work runs on a bounded pool so the event loop stays responsive
+inference_executor = get_inference_executor()
+
+# Concurrent single-prop requests share model calls
+prop_batcher = get_batcher(
+    "player_props", score_prop_batch, max_batch_size=64, max_wait_ms=5,
+    max_queue_size=int(os.getenv('MAX_QUEUED_PROPS', 512)), executor=inference_executor
+)
+
+def require_models() -> None:
+    """503 until startup has loaded a model generation (acquire() would fail)"""
+    if not model_registry.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="Models failed to load; retrying" if model_registry.start_error else "Models are still loading",
+            headers={"Retry-After": str(MODEL_LOADING_RETRY_AFTER)}
+        )
+
 @app.post("/predict/player_prop")
-async def predict_player_prop(request: LegacyPlayerPropRequest):
+async def predict_player_prop(request: LegacyPlayerPropRequest, response: Response):
+    require_models()
     try:
         logger.info(f"Generating prediction for {request.player_name} - {request.stat_type} O/U {request.line}")
-        features = generate_mock_features(request.player_name, request.stat_type, request.opponent)
-        prediction_result = predict_with_mock_model(features, request.stat_type, request.line)
+        prediction_result = await prop_batcher.submit(request.model_dump())
         
-        response = {
-            "player_id": request.player_id,
-            "player_name": request.player_name,
-            "stat": request.stat_type,
-            "line": request.line,
-            "opponent": request.opponent,
-            "is_home": request.is_home,
-            "game_date": request.game_date,
+        response.headers["X-Model-Version"] = prediction_result["model_generation"]
+        
+        return {
             **prediction_result,
-            "recommendation": "OVER" if prediction_result["over_probability"] > 0.55 else "UNDER" if prediction_result["over_probability"] < 0.45 else "PASS",
+            "stat": request.stat_type,
             "timestamp": datetime.now().isoformat()
         }
         
-        return response
-        
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         logger.error(f"Error in predict_player_prop: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict/player_props:batch")
+async def predict_player_props_batch(request: PlayerPropBatchRequest):
+    """
+    Score a slate of props and stream one JSON line per prop (NDJSON)
+    
+    Features are built once for the whole slate; each model runs once per
+    chunk of rows. Lines arrive in completion order and carry the prop's index.
+    """
+    if len(request.props) > MAX_BATCH_PROPS:
+        raise HTTPException(status_code=413, detail=f"Batch limited to {MAX_BATCH_PROPS} props")
+    
+    require_models()
+    
+    props = [prop.model_dump() for prop in request.props]
+    for index, prop in enumerate(props):
+        prop["index"] = index
+    
+    X = await inference_executor.run(build_prop_features, props)
+    
+    # Every chunk scores against the same generation even if a reload lands mid-stream
+    lease = model_registry.acquire()
+    ensemble = lease.generation.prop_ensemble
+    chunk_size = max(1, request.chunk_size or len(props) or 1)
+    logger.info(f"Batch prediction for {len(props)} props in chunks of {chunk_size}")
+    
+    async def score_chunk(start: int):
+        rows = slice(start, start + chunk_size)
+        try:
+            return await inference_executor.run(score_props, props[rows], X[rows], ensemble)
+        except ExecutorSaturated:
+            return [{"index": prop["index"], "error": "capacity exhausted", "retry": True} for prop in props[rows]]
+        except Exception as e:
+            logger.error(f"Batch chunk at {start} failed: {e}")
+            return [{"index": prop["index"], "error": str(e)} for prop in props[rows]]
+    
+    async def stream():
+        try:
+            chunks = [score_chunk(start) for start in range(0, len(props), chunk_size)]
+            for chunk in asyncio.as_completed(chunks):
+                timestamp = datetime.now().isoformat()
+                for result in await chunk:
+                    result.setdefault("timestamp", timestamp)
+                    result.setdefault("model_generation", lease.generation.version)
+                    yield json.dumps(result) + "\n"
+        finally:
+            lease.release()
+    
+    # release() is idempotent; the background task covers a stream that never started
+    return StreamingResponse(
+        stream(), media_type="application/x-ndjson",
+        headers={"X-Model-Version": lease.generation.version},
+        background=BackgroundTask(lease.release)
+    )
+
+def compute_game_outcome(request: LegacyGameOutcomeRequest) -> Dict:
+    import random
+    random.seed(hash(request.home_team + request.away_team))
+    
+    home_win_prob = random.uniform(0.35, 0.65)
+    predicted_spread = random.uniform(-8, 8)
+    predicted_total = random.uniform(210, 235)
+    
+    response = {
+        "game": f"{request.away_team} @ {request.home_team}",
+        "game_date": request.game_date,
+        "predictions": {
+            "home_win_probability": round(home_win_prob, 3),
+            "away_win_probability": round(1 - home_win_prob, 3),
+            "predicted_spread": round(predicted_spread, 1),
+            "predicted_total": round(predicted_total, 1),
+            "predicted_home_score": round((predicted_total + predicted_spread) / 2, 1),
+            "predicted_away_score": round((predicted_total - predicted_spread) / 2, 1)
+        },
+        "market": {
+            "spread": request.home_spread,
+            "total": request.total
+        },
+        "edges": {
+            "spread_edge": round(predicted_spread - (request.home_spread or 0), 1) if request.home_spread else None,
+            "total_edge": round(predicted_total - (request.total or 0), 1) if request.total else None
+        },
+        "recommendations": [],
+        "confidence_score": random.randint(65, 90),
+        "model_version": "ensemble_v1.0",
+        "timestamp": datetime.now().isoformat()
+    }
+    
+    if response["edges"]["spread_edge"] and abs(response["edges"]["spread_edge"]) > 2:
+        response["recommendations"].append({
+            "bet_type": "spread",
+            "side": "home" if response["edges"]["spread_edge"] > 0 else "away",
+            "edge": abs(response["edges"]["spread_edge"]),
+            "confidence": "high" if abs(response["edges"]["spread_edge"]) > 4 else "medium"
+        })
+    
+    if response["edges"]["total_edge"] and abs(response["edges"]["total_edge"]) > 3:
+        response["recommendations"].append({
+            "bet_type": "total",
+            "side": "over" if response["edges"]["total_edge"] > 0 else "under",
+            "edge": abs(response["edges"]["total_edge"]),
+            "confidence": "high" if abs(response["edges"]["total_edge"]) > 5 else "medium"
+        })
+    
+    return response
+
 @app.post("/predict/game_outcome")
 async def predict_game_outcome(request: LegacyGameOutcomeRequest):
     try:
@@ -422,63 +532,10 @@ async def predict_game_outcome(request: LegacyGameOutcomeRequest):
             date=request.game_date
         )
         
-        if cache:
-            cached = cache.get(cache_key)
-            if cached:
-                return json.loads(cached)
-        
-        import random
-        random.seed(hash(request.home_team + request.away_team))
-        
-        home_win_prob = random.uniform(0.35, 0.65)
-        predicted_spread = random.uniform(-8, 8)
-        predicted_total = random.uniform(210, 235)
-        
-        response = {
-            "game": f"{request.away_team} @ {request.home_team}",
-            "game_date": request.game_date,
-            "predictions": {
-                "home_win_probability": round(home_win_prob, 3),
-                "away_win_probability": round(1 - home_win_prob, 3),
-                "predicted_spread": round(predicted_spread, 1),
-                "predicted_total": round(predicted_total, 1),
-                "predicted_home_score": round((predicted_total + predicted_spread) / 2, 1),
-                "predicted_away_score": round((predicted_total - predicted_spread) / 2, 1)
-            },
-            "market": {
-                "spread": request.home_spread,
-                "total": request.total
-            },
-            "edges": {
-                "spread_edge": round(predicted_spread - (request.home_spread or 0), 1) if request.home_spread else None,
-                "total_edge": round(predicted_total - (request.total or 0), 1) if request.total else None
-            },
-            "recommendations": [],
-            "confidence_score": random.randint(65, 90),
-            "model_version": "ensemble_v1.0",
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        if response["edges"]["spread_edge"] and abs(response["edges"]["spread_edge"]) > 2:
-            response["recommendations"].append({
-                "bet_type": "spread",
-                "side": "home" if response["edges"]["spread_edge"] > 0 else "away",
-                "edge": abs(response["edges"]["spread_edge"]),
-                "confidence": "high" if abs(response["edges"]["spread_edge"]) > 4 else "medium"
-            })
-        
-        if response["edges"]["total_edge"] and abs(response["edges"]["total_edge"]) > 3:
-            response["recommendations"].append({
-                "bet_type": "total",
-                "side": "over" if response["edges"]["total_edge"] > 0 else "under",
-                "edge": abs(response["edges"]["total_edge"]),
-                "confidence": "high" if abs(response["edges"]["total_edge"]) > 5 else "medium"
-            })
-        
-        if cache:
-            cache.setex(cache_key, 300, json.dumps(response))
-        
-        return response
+        # Concurrent identical requests share one computation
+        return await response_cache.get_or_compute(
+            cache_key, lambda: compute_game_outcome(request), ttl=300
+        )
         
     except Exception as e:
         logger.error(f"Error in predict_game_outcome: {str(e)}")
@@ -645,6 +702,19 @@ async def optimize_bankroll(request: BankrollOptimizationRequest):
         logger.error(f"Error in optimize_bankroll: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Background model load started at startup; kept so its outcome is observed
+model_loading: Optional[asyncio.Future] = None
+
+def _model_loading_done(future: asyncio.Future):
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        # Already logged with a traceback and recorded in model_registry.status()
+        logger.error(f"Model loading failed at startup, /ready stays 503 until a retry succeeds: {error}")
+    else:
+        logger.info(f"Models ready: {len(model_registry.names())} loaded, {len(model_registry.failures)} failed")
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("CourtEdge ML API starting up...")
@@ -655,11 +725,27 @@ async def startup_event():
     (MODELS_PATH / "game_outcomes").mkdir(exist_ok=True)
     (MODELS_PATH / "line_movement").mkdir(exist_ok=True)
     
-    logger.info("ML API ready")
+    # Load and warm up models in the background; /ready flips once done
+    global model_loading
+    model_loading = asyncio.get_running_loop().run_in_executor(None, model_registry.start)
+    model_loading.add_done_callback(_model_loading_done)
+    
+    # Pick up retrained artifacts without a restart
+    reload_interval = float(os.getenv('MODEL_RELOAD_INTERVAL', 30))
+    if reload_interval > 0:
+        model_registry.watch(reload_interval)
+    
+    # Publish aggregated sportsbook odds to /api/v2/stream subscribers
+    odds_feed.start()
+    
+    logger.info("ML API live, loading models")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("ML API shutting down...")
+    inference_executor.shutdown()
+    model_registry.stop_watching()
+    await odds_feed.stop()
 
 if __name__ == "__main__":
     import uvicorn
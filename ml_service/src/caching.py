@@ -0,0 +1,230 @@
+"""
+In-Process Caching
+Bounded LRU cache with per-entry TTL shared by the ML service components
+"""
+
+import heapq
+import logging
+import pickle
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def pickled_size(value: Any) -> int:
+    """Approximate in-memory cost of a value by its pickled length"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry TTL
+
+    - Bounded by entry count and, optionally, by approximate bytes
+    - Expired entries are dropped on read and by a background sweep
+    - Hit/miss/eviction/expiration counters for monitoring
+
+    Operations never await, so the cache is also safe to use from asyncio code.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: Optional[int] = None,
+                 default_ttl: Optional[float] = 300, sweep_interval: Optional[float] = 60,
+                 sizeof: Optional[Callable[[Any], int]] = None, name: str = "cache"):
+        """
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+            max_bytes: Optional bound on the summed size of cached values
+            default_ttl: Seconds before an entry expires (None = no expiry)
+            sweep_interval: Seconds between background expiry sweeps (None = no sweeper)
+            sizeof: Size estimator used with max_bytes (defaults to pickled length)
+            name: Label used in logs and stats
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sweep_interval = sweep_interval
+        self.sizeof = sizeof or pickled_size
+        self.name = name
+
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._expiry_heap = []  # (expires_at, key), stale items skipped lazily
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._sweeper = None
+        self._stop = threading.Event()
+
+    # --------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = _MISSING) -> None:
+        """Store value; ttl overrides default_ttl (None = never expires)"""
+        ttl = self.default_ttl if ttl is _MISSING else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            if expires_at is not None:
+                heapq.heappush(self._expiry_heap, (expires_at, key))
+
+            self._evict_over_capacity()
+
+        self._ensure_sweeper()
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return False
+            expires_at = entry[1]
+            return expires_at is None or expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sweep(self) -> int:
+        """Drop every expired entry; returns number removed"""
+        now = time.monotonic()
+        removed = 0
+
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expires_at, key = heapq.heappop(self._expiry_heap)
+                entry = self._entries.get(key, _MISSING)
+                # Skip heap items left behind by overwrites or deletes
+                if entry is not _MISSING and entry[1] == expires_at:
+                    self._remove(key)
+                    removed += 1
+
+            self.expirations += removed
+
+            # Compact the heap when stale items dominate
+            if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+                self._expiry_heap = [
+                    (entry[1], key) for key, entry in self._entries.items() if entry[1] is not None
+                ]
+                heapq.heapify(self._expiry_heap)
+
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'size': len(self._entries),
+            'bytes': self._bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+    def close(self) -> None:
+        """Stop the background sweeper"""
+        self._stop.set()
+
+    # --------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict_over_capacity(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or
+            (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _ensure_sweeper(self) -> None:
+        if self.sweep_interval is None or self._sweeper is not None:
+            return
+
+        with self._lock:
+            if self._sweeper is not None:
+                return
+
+            # The thread only holds a weak reference so an unused cache can be collected
+            self._sweeper = threading.Thread(
+                target=_sweep_loop,
+                args=(weakref.ref(self), self._stop, self.sweep_interval),
+                name=f"{self.name}-sweeper",
+                daemon=True
+            )
+            self._sweeper.start()
+
+
+def _sweep_loop(cache_ref, stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        cache = cache_ref()
+        if cache is None:
+            return
+
+        try:
+            removed = cache.sweep()
+            if removed:
+                logger.debug(f"{cache.name}: swept {removed} expired entries")
+        except Exception as e:
+            logger.error(f"{cache.name}: expiry sweep failed: {e}")
+        finally:
+            del cache
@@ -242,9 +242,213 @@ class ELORatingSystem:
             'sos_rank': 'tough' if np.mean(opponent_ratings) > 1600 else 'average' if np.mean(opponent_ratings) > 1400 else 'easy'
         }
     
-    def simulate_season(self, schedule, n_simulations=10000):
+    def simulate_season(self, schedule, n_simulations=10000, conferences=None,
+                        playoff_spots=8, chunk_size=2000, random_state=None,
+                        dynamic=False, margin_std=12.0):
         """
         Simulate remaining season using ELO ratings
+        
+        Win probabilities are computed once per scheduled game and outcomes
+        are drawn as an (n_simulations, n_games) uniform matrix, processed in
+        chunks of `chunk_size` simulations to keep memory bounded.
+        
+        With `dynamic=True` ratings update after every simulated game, as in
+        update_ratings. Each simulation keeps its own row of an
+        (n_simulations, n_teams) rating matrix and the schedule is processed
+        one game-day at a time, updating all simulations at once.
+        
+        Args:
+            schedule: List of {'team1_id', 'team2_id', 'is_team1_home', 'league'}
+            n_simulations: Number of Monte Carlo seasons
+            conferences: Optional {team_id: conference}; seeds are ranked within
+                each conference (whole league if omitted)
+            playoff_spots: Seeds that count as a playoff berth
+            chunk_size: Simulations drawn per chunk
+            random_state: Seed or np.random.Generator for reproducible runs
+            dynamic: Update ratings after each simulated game ("hot" projections)
+            margin_std: Std dev of simulated point margins feeding the MOV multiplier
+        """
+        logger.info(f"Simulating season with {len(schedule)} games, {n_simulations} iterations")
+        
+        rng = np.random.default_rng(random_state)
+        team_ids, team1_idx, team2_idx, ratings, home_adj = self._schedule_arrays(schedule)
+        n_teams = len(team_ids)
+        n_games = len(team1_idx)
+        
+        if dynamic:
+            game_days = self._schedule_game_days(schedule, team1_idx, team2_idx)
+        else:
+            team1_win_prob = self.calculate_expected_score(
+                ratings[team1_idx] + home_adj, ratings[team2_idx]
+            )
+        
+        # Wins per (simulation, team)
+        wins = np.empty((n_simulations, n_teams), dtype=np.int32)
+        
+        for chunk_start in range(0, n_simulations, chunk_size):
+            n_chunk = min(chunk_size, n_simulations - chunk_start)
+            
+            if dynamic:
+                team1_won = self._simulate_dynamic_chunk(
+                    n_chunk, ratings, team1_idx, team2_idx, home_adj, game_days, margin_std, rng
+                )
+            else:
+                team1_won = rng.random((n_chunk, n_games)) < team1_win_prob
+            winners = np.where(team1_won, team1_idx, team2_idx)
+            
+            # Scatter-add wins: offset each simulation row into its own team block
+            flat = winners + (np.arange(n_chunk) * n_teams)[:, None]
+            wins[chunk_start:chunk_start + n_chunk] = np.bincount(
+                flat.ravel(), minlength=n_chunk * n_teams
+            ).reshape(n_chunk, n_teams)
+        
+        seeds, group_sizes = self._simulated_seeds(wins, team_ids, conferences, rng)
+        
+        # Calculate statistics
+        p10, median, p90 = np.percentile(wins, [10, 50, 90], axis=0)
+        mean_wins = wins.mean(axis=0)
+        std_wins = wins.std(axis=0)
+        min_wins = wins.min(axis=0)
+        max_wins = wins.max(axis=0)
+        
+        results = {}
+        
+        for col, team_id in enumerate(team_ids):
+            team_seeds = seeds[:, col]
+            seed_counts = np.bincount(team_seeds, minlength=group_sizes[col])
+            
+            results[team_id] = {
+                'mean_wins': float(mean_wins[col]),
+                'median_wins': float(median[col]),
+                'std_wins': float(std_wins[col]),
+                'min_wins': int(min_wins[col]),
+                'max_wins': int(max_wins[col]),
+                'win_distribution': {
+                    '10th_percentile': float(p10[col]),
+                    '90th_percentile': float(p90[col])
+                },
+                'win_histogram': np.bincount(wins[:, col], minlength=int(max_wins[col]) + 1).tolist(),
+                'seed_histogram': seed_counts.tolist(),
+                'playoff_probability': float((team_seeds < playoff_spots).mean())
+            }
+        
+        return results
+    
+    def _schedule_arrays(self, schedule):
+        """
+        Convert schedule into integer team indices, starting ratings and
+        signed home adjustments (positive when team1 is home)
+        """
+        team_index = {team_id: idx for idx, team_id in enumerate(self.ratings.keys())}
+        
+        for game in schedule:
+            for team_id in (game['team1_id'], game['team2_id']):
+                if team_id not in team_index:
+                    self.get_rating(team_id)
+                    team_index[team_id] = len(team_index)
+        
+        team_ids = list(team_index.keys())
+        ratings = np.array([self.ratings[team_id] for team_id in team_ids], dtype=np.float64)
+        
+        team1_idx = np.array([team_index[g['team1_id']] for g in schedule], dtype=np.intp)
+        team2_idx = np.array([team_index[g['team2_id']] for g in schedule], dtype=np.intp)
+        
+        # Signed home adjustment in favour of team1
+        home_adj = np.array([
+            self.home_advantage.get(g.get('league', 'nba'), 100) * (1 if g.get('is_team1_home', True) else -1)
+            for g in schedule
+        ], dtype=np.float64)
+        
+        return team_ids, team1_idx, team2_idx, ratings, home_adj
+    
+    def _schedule_game_days(self, schedule, team1_idx, team2_idx):
+        """
+        Split schedule into consecutive batches of game indices in which no
+        team plays twice, starting a new batch whenever the game 'date' changes
+        """
+        game_days = []
+        current, teams_playing, current_date = [], set(), None
+        
+        for game_idx, game in enumerate(schedule):
+            teams = (team1_idx[game_idx], team2_idx[game_idx])
+            date = game.get('date')
+            
+            if current and (date != current_date or teams_playing.intersection(teams)):
+                game_days.append(np.array(current, dtype=np.intp))
+                current, teams_playing = [], set()
+            
+            current.append(game_idx)
+            teams_playing.update(teams)
+            current_date = date
+        
+        if current:
+            game_days.append(np.array(current, dtype=np.intp))
+        
+        return game_days
+    
+    def _simulate_dynamic_chunk(self, n_chunk, ratings, team1_idx, team2_idx, home_adj,
+                                game_days, margin_std, rng):
+        """
+        Simulate a chunk of seasons with ratings updated after every game
+        
+        Returns boolean (n_chunk, n_games) matrix of team1 wins.
+        """
+        n_games = len(team1_idx)
+        sim_ratings = np.tile(ratings, (n_chunk, 1))
+        team1_won = np.empty((n_chunk, n_games), dtype=bool)
+        log_cap = np.log(15 + 1)
+        
+        for day in game_days:
+            t1 = team1_idx[day]
+            t2 = team2_idx[day]
+            
+            rating_diff = sim_ratings[:, t1] + home_adj[day] - sim_ratings[:, t2]
+            expected1 = 1 / (1 + 10 ** (-rating_diff / 400))
+            won = rng.random(expected1.shape) < expected1
+            
+            # Simulated winning margin around the ELO spread (~25 points = 1 point)
+            margin = np.abs(rng.normal(np.abs(rating_diff) / 25, margin_std))
+            margin = np.maximum(np.rint(margin), 1)
+            mov_multiplier = np.clip(np.log(margin + 1) / log_cap * 2, 1.0, 2.5)
+            
+            change1 = self.k_factor * mov_multiplier * (won - expected1)
+            
+            # No team repeats within a day, so fancy-index updates do not collide
+            sim_ratings[:, t1] += change1
+            sim_ratings[:, t2] -= change1
+            team1_won[:, day] = won
+        
+        return team1_won
+    
+    def _simulated_seeds(self, wins, team_ids, conferences, rng):
+        """
+        Rank teams by simulated wins (0 = top seed), ties broken at random
+        """
+        seeds = np.zeros(wins.shape, dtype=np.intp)
+        group_sizes = np.zeros(len(team_ids), dtype=np.intp)
+        
+        if conferences:
+            groups = {}
+            for col, team_id in enumerate(team_ids):
+                groups.setdefault(conferences.get(team_id), []).append(col)
+            groups = [np.array(cols) for cols in groups.values()]
+        else:
+            groups = [np.arange(len(team_ids))]
+        
+        for cols in groups:
+            # Random fraction < 1 only reorders teams tied on wins
+            keys = wins[:, cols] + rng.random((wins.shape[0], len(cols)))
+            order = np.argsort(-keys, axis=1)
+            group_seeds = np.empty_like(order)
+            np.put_along_axis(group_seeds, order, np.broadcast_to(np.arange(len(cols)), order.shape), axis=1)
+            seeds[:, cols] = group_seeds
+            group_sizes[cols] = len(cols)
+        
+        return seeds, group_sizes
+    
+    def _simulate_season_loop(self, schedule, n_simulations=10000):
+        """
+        Reference per-game Python loop, kept for benchmarking simulate_season
         """
         logger.info(f"Simulating season with {len(schedule)} games, {n_simulations} iterations")
         
@@ -0,0 +1,228 @@
+"""
+Event Bus
+Asyncio pub/sub with a bounded queue per subscriber, so a slow consumer
+loses or coalesces its own messages instead of stalling the publisher
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from itertools import count
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+COALESCE_LATEST = "coalesce_latest"
+
+
+class SubscriptionClosed(Exception):
+    """Raised by Subscription.get() once the subscription is closed and drained"""
+
+
+@dataclass
+class ChannelConfig:
+    """
+    Delivery policy for one channel
+
+    drop_oldest: every message is queued; a full queue evicts its oldest
+    coalesce_latest: a pending message with the same key(message) is
+        replaced in place, e.g. only the latest odds per event matter
+    """
+    policy: str = DROP_OLDEST
+    key: Optional[Callable[[Any], Any]] = None
+
+
+class Subscription:
+    """A subscriber's bounded queue across one or more channels"""
+
+    def __init__(self, bus: 'EventBus', channels: Tuple[str, ...], maxsize: int, name: str):
+        self.bus = bus
+        self.channels = channels
+        self.maxsize = maxsize
+        self.name = name
+        self.closed = False
+
+        self._pending: 'OrderedDict[Any, Tuple[float, str, Any]]' = OrderedDict()
+        self._ready = asyncio.Event()
+        self._seq = count()
+
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._lags = deque(maxlen=1000)
+
+    def offer(self, channel: str, message: Any) -> None:
+        """Queue without blocking, applying the channel's overflow policy"""
+        if self.closed:
+            return
+
+        config = self.bus.channel(channel)
+        if config.policy == COALESCE_LATEST and config.key is not None:
+            key = (channel, config.key(message))
+            if key in self._pending:
+                # Keep the original enqueue time so lag reflects the oldest unseen update
+                enqueued, _, _ = self._pending[key]
+                self._pending[key] = (enqueued, channel, message)
+                self.coalesced += 1
+                return
+        else:
+            key = next(self._seq)
+
+        self._pending[key] = (time.perf_counter(), channel, message)
+        if len(self._pending) > self.maxsize:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._ready.set()
+
+    async def get(self) -> Tuple[str, Any]:
+        """Next (channel, message), waiting if the queue is empty"""
+        while not self._pending:
+            if self.closed:
+                raise SubscriptionClosed(self.name)
+            self._ready.clear()
+            await self._ready.wait()
+
+        _, (enqueued, channel, message) = self._pending.popitem(last=False)
+        self._lags.append(time.perf_counter() - enqueued)
+        self.delivered += 1
+        return channel, message
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[str, Any]:
+        try:
+            return await self.get()
+        except SubscriptionClosed:
+            raise StopAsyncIteration
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+        self.closed = True
+        self._ready.set()
+
+    def stats(self) -> Dict[str, Any]:
+        lags_ms = np.array(self._lags) * 1000
+        oldest = next(iter(self._pending.values()), None)
+        return {
+            'channels': list(self.channels),
+            'depth': len(self._pending),
+            'maxsize': self.maxsize,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'lag_ms': (time.perf_counter() - oldest[0]) * 1000 if oldest else 0.0,
+            'avg_delivery_lag_ms': float(lags_ms.mean()) if len(lags_ms) else 0.0,
+            'p95_delivery_lag_ms': float(np.percentile(lags_ms, 95)) if len(lags_ms) else 0.0
+        }
+
+
+class EventBus:
+    """
+    Fan-out pub/sub on one event loop
+
+    publish() never blocks or runs subscriber code: it offers the message to
+    every subscriber's queue (thread-safe, hopping onto the bus loop when
+    called from another thread). Callback subscribers each consume in their
+    own task, so one slow callback only backs up its own queue.
+    """
+
+    def __init__(self, default_maxsize: int = 256):
+        self.default_maxsize = default_maxsize
+        self.channels: Dict[str, ChannelConfig] = {}
+        self.subscriptions: List[Subscription] = []
+        self.published: Dict[str, int] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Dict[Subscription, asyncio.Task] = {}
+        self._waiting: List[Tuple[Subscription, Callable]] = []
+        self._names = count(1)
+
+    def configure(self, channel: str, policy: str = DROP_OLDEST,
+                  key: Optional[Callable[[Any], Any]] = None) -> None:
+        if policy not in (DROP_OLDEST, COALESCE_LATEST):
+            raise ValueError(f"unknown policy {policy}")
+        self.channels[channel] = ChannelConfig(policy, key)
+
+    def channel(self, channel: str) -> ChannelConfig:
+        return self.channels.get(channel) or ChannelConfig()
+
+    def subscribe(self, channels: Union[str, Iterable[str]], maxsize: Optional[int] = None,
+                  name: Optional[str] = None) -> Subscription:
+        """Queue subscription for async consumers (iterate it or await get())"""
+        channels = (channels,) if isinstance(channels, str) else tuple(channels)
+        subscription = Subscription(self, channels, maxsize or self.default_maxsize,
+                                    name or f"subscriber-{next(self._names)}")
+        self.subscriptions.append(subscription)
+        self._bind_loop()
+        return subscription
+
+    def subscribe_callback(self, channel: str, callback: Callable[[Any], Union[None, Awaitable[None]]],
+                           maxsize: Optional[int] = None) -> Subscription:
+        """Run callback(message) for each message in a dedicated consumer task"""
+        name = f"{getattr(callback, '__name__', 'callback')}-{next(self._names)}"
+        subscription = self.subscribe(channel, maxsize, name=name)
+        self._waiting.append((subscription, callback))
+        self._start_consumers()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        task = self._tasks.pop(subscription, None)
+        if task is not None:
+            task.cancel()
+
+    def publish(self, channel: str, message: Any) -> None:
+        self.published[channel] = self.published.get(channel, 0) + 1
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if self._loop is not None and running is not self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._fan_out, channel, message)
+        else:
+            self._fan_out(channel, message)
+
+    def _fan_out(self, channel: str, message: Any) -> None:
+        self._bind_loop()
+        for subscription in self.subscriptions:
+            if channel in subscription.channels:
+                subscription.offer(channel, message)
+        self._start_consumers()
+
+    def _bind_loop(self) -> None:
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+    def _start_consumers(self) -> None:
+        # Callback subscribers registered outside a loop start on first use inside one
+        if not self._waiting or self._loop is None or not self._loop.is_running():
+            return
+        waiting, self._waiting = self._waiting, []
+        for subscription, callback in waiting:
+            self._tasks[subscription] = self._loop.create_task(self._consume(subscription, callback))
+
+    async def _consume(self, subscription: Subscription, callback: Callable) -> None:
+        async for _, message in subscription:
+            try:
+                result = callback(message)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error in subscriber {subscription.name}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'published': dict(self.published),
+            'channels': {name: config.policy for name, config in self.channels.items()},
+            'subscribers': {subscription.name: subscription.stats() for subscription in self.subscriptions}
+        }
@@ -6,11 +6,154 @@ Backtest betting strategies on historical data
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+from functools import partial
+import heapq
+import os
+import tempfile
 import logging
 from typing import List, Dict, Callable
 
 logger = logging.getLogger(__name__)
 
+# Optional JIT for the bankroll recursion
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _bankroll_path(fixed_stakes, bankroll_fractions, returns, starting_bankroll):
+    """
+    Bankroll after each bet when stake = fixed + fraction * current bankroll
+    
+    `returns` is profit per unit staked (payout multiplier on a win, -1 on a loss).
+    """
+    path = np.empty(len(returns))
+    bankroll = starting_bankroll
+    
+    for i in range(len(returns)):
+        stake = fixed_stakes[i] + bankroll_fractions[i] * bankroll
+        bankroll += stake * returns[i]
+        path[i] = bankroll
+    
+    return path
+
+
+def bankroll_path(fixed_stakes, bankroll_fractions, returns, starting_bankroll):
+    """
+    Vectorized bankroll path; falls back to the cumulative loop only when
+    fixed and bankroll-proportional stakes are mixed
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    fixed_stakes = np.asarray(fixed_stakes, dtype=np.float64)
+    bankroll_fractions = np.asarray(bankroll_fractions, dtype=np.float64)
+    
+    if not bankroll_fractions.any():
+        return starting_bankroll + np.cumsum(fixed_stakes * returns)
+    if not fixed_stakes.any():
+        return starting_bankroll * np.cumprod(1 + bankroll_fractions * returns)
+    
+    return _bankroll_path(fixed_stakes, bankroll_fractions, returns, float(starting_bankroll))
+
+
+def longest_run(flags):
+    """
+    Length of the longest run of True values
+    """
+    flags = np.asarray(flags, dtype=np.int8)
+    if not flags.any():
+        return 0
+    
+    edges = np.diff(np.concatenate(([0], flags, [0])))
+    return int((np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)).max())
+
+
+def american_payout(odds):
+    """
+    Profit per unit staked on a win for American odds (scalar or array)
+    """
+    odds = np.asarray(odds, dtype=np.float64)
+    return np.where(odds > 0, odds / 100, 100 / np.abs(odds))
+
+def _share_frame(df, directory):
+    """
+    Save DataFrame columns as .npy files that workers can memory-map
+    
+    Object columns holding only strings are stored as fixed-width unicode
+    arrays. Any other object column (None, dates, mixed values) cannot be
+    mapped without changing its values, so it is returned as-is and
+    shipped to each worker once.
+    
+    Returns:
+        (columns, kept) where kept maps column name to its original values
+    """
+    kept = {}
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if values.dtype == object:
+            if not all(isinstance(value, str) for value in values):
+                kept[name] = values
+                continue
+            values = values.astype(str)
+        np.save(Path(directory) / f"{name}.npy", values, allow_pickle=False)
+    
+    return list(df.columns), kept
+
+
+def _load_shared_frame(directory, columns, kept=None):
+    kept = kept or {}
+    return pd.DataFrame({
+        name: kept[name] if name in kept else np.load(Path(directory) / f"{name}.npy", mmap_mode='r')
+        for name in columns
+    })
+
+
+def _bind_params(strategy, **params):
+    return partial(strategy, **params)
+
+
+def vectorized_template(strategy):
+    """
+    Picklable strategy_template for search_parameters from a vectorized strategy
+    
+    Example: vectorized_template(kelly_strategy_vectorized)(kelly_fraction=0.5)
+    """
+    return partial(_bind_params, strategy)
+
+
+# Per-process state for parameter search workers, set once by the pool initializer
+_SEARCH_WORKER = {}
+
+
+def _init_search_worker(directory, columns, kept, starting_bankroll, strategy_template, metric, prune_cutoff):
+    data = _load_shared_frame(directory, columns, kept)
+    _SEARCH_WORKER.update({
+        'simulator': HistoricalSimulator(starting_bankroll),
+        'data': data,
+        'screen_data': data[data['date'] <= prune_cutoff] if prune_cutoff is not None else None,
+        'strategy_template': strategy_template,
+        'metric': metric
+    })
+
+
+def _score_params(args):
+    params, screen = args
+    state = _SEARCH_WORKER
+    data = state['screen_data'] if screen else state['data']
+    strategy = state['strategy_template'](**params)
+    return state['simulator'].score_strategy(strategy, data, state['metric'])
+
+
 class HistoricalSimulator:
     def __init__(self, starting_bankroll=10000):
         self.starting_bankroll = starting_bankroll
@@ -97,6 +240,159 @@ class HistoricalSimulator:
         
         return self.results
     
+    def run_simulation_vectorized(self, strategy, historical_data, start_date=None, end_date=None):
+        """
+        Columnar backtest; produces the same result structure as run_simulation
+        
+        Args:
+            strategy: Vectorized callable taking the (date-sorted) DataFrame and
+                returning a dict of columns, each a scalar or per-row array:
+                'bet_type', 'pick', 'odds', 'stake' (fixed amount) and/or
+                'bankroll_fraction' (share of current bankroll), and 'prop_id'
+                for prop bets. Rows with no positive stake are skipped.
+            historical_data: DataFrame with historical games and odds
+            start_date: Start date for simulation
+            end_date: End date for simulation
+        """
+        logger.info(f"Starting vectorized simulation from {start_date} to {end_date}")
+        
+        # Filter data by date range
+        if start_date:
+            historical_data = historical_data[historical_data['date'] >= start_date]
+        if end_date:
+            historical_data = historical_data[historical_data['date'] <= end_date]
+        
+        data = historical_data.sort_values('date', kind='stable').reset_index(drop=True)
+        bets = self.prepare_bets(strategy, data)
+        
+        path = bankroll_path(bets['fixed_stakes'], bets['bankroll_fractions'], bets['returns'], self.starting_bankroll)
+        previous = np.concatenate(([self.starting_bankroll], path[:-1]))
+        stakes = bets['fixed_stakes'] + bets['bankroll_fractions'] * previous
+        profits = path - previous
+        
+        rows = bets['rows']
+        bet_df = pd.DataFrame({
+            'date': data['date'].to_numpy()[rows],
+            'game_id': data['game_id'].to_numpy()[rows],
+            'matchup': data['matchup'].to_numpy()[rows],
+            'bet_type': bets['bet_type'],
+            'pick': bets['pick'],
+            'odds': bets['odds'],
+            'stake': stakes,
+            'result': np.where(bets['won'], 'win', 'loss'),
+            'profit': profits,
+            'bankroll': path
+        })
+        bet_history = bet_df.to_dict('records')
+        
+        # Daily results cover every date, carrying bankroll forward on days without bets
+        dates, day_index = np.unique(data['date'].to_numpy(), return_inverse=True)
+        bet_days = day_index[rows]
+        bets_placed = np.bincount(bet_days, minlength=len(dates))
+        day_profit = np.bincount(bet_days, weights=profits, minlength=len(dates))
+        
+        last_bet = np.full(len(dates), -1)
+        last_bet[bet_days] = np.arange(len(rows))
+        last_bet = np.maximum.accumulate(last_bet)
+        day_bankroll = np.where(last_bet >= 0, path[np.maximum(last_bet, 0)] if len(path) else 0, self.starting_bankroll)
+        
+        daily_results = [
+            {
+                'date': date,
+                'bets_placed': int(placed),
+                'profit': float(profit),
+                'bankroll': float(bankroll),
+                'roi': (profit / self.starting_bankroll) * 100 if placed else 0
+            }
+            for date, placed, profit, bankroll in zip(dates, bets_placed, day_profit, day_bankroll)
+        ]
+        
+        bankroll = float(path[-1]) if len(path) else self.starting_bankroll
+        performance = self._calculate_performance(bet_history, daily_results)
+        
+        self.results = {
+            'bet_history': bet_history,
+            'daily_results': daily_results,
+            'performance': performance,
+            'final_bankroll': bankroll,
+            'total_profit': bankroll - self.starting_bankroll,
+            'roi': ((bankroll - self.starting_bankroll) / self.starting_bankroll) * 100
+        }
+        
+        logger.info(f"Simulation complete. Final bankroll: ${bankroll:.2f} ({self.results['roi']:.2f}% ROI)")
+        
+        return self.results
+    
+    def prepare_bets(self, strategy, data):
+        """
+        Evaluate a vectorized strategy and resolve every bet with array ops
+        
+        Returns per-bet arrays (in data row order): rows, bet_type, pick, odds,
+        fixed_stakes, bankroll_fractions, won and returns (profit per unit staked).
+        """
+        n_rows = len(data)
+        decision = strategy(data)
+        
+        def column(key, default):
+            value = decision.get(key, default)
+            value = value.to_numpy() if isinstance(value, pd.Series) else np.asarray(value)
+            return np.broadcast_to(value, (n_rows,))
+        
+        fixed = np.nan_to_num(column('stake', 0.0).astype(np.float64))
+        fractions = np.nan_to_num(column('bankroll_fraction', 0.0).astype(np.float64))
+        rows = np.flatnonzero((fixed > 0) | (fractions > 0))
+        
+        bet_type = column('bet_type', None)[rows]
+        pick = column('pick', None)[rows]
+        odds = column('odds', np.nan)[rows].astype(np.float64)
+        prop_id = column('prop_id', None)[rows]
+        
+        won = self._resolve_bets(data.iloc[rows], bet_type, pick, prop_id)
+        returns = np.where(won, american_payout(odds), -1.0)
+        
+        return {
+            'rows': rows,
+            'bet_type': bet_type,
+            'pick': pick,
+            'odds': odds,
+            'fixed_stakes': fixed[rows],
+            'bankroll_fractions': fractions[rows],
+            'won': won,
+            'returns': returns
+        }
+    
+    def _resolve_bets(self, games, bet_type, pick, prop_id):
+        """
+        Array version of _execute_bet's win/loss rules
+        """
+        won = np.zeros(len(games), dtype=bool)
+        
+        moneyline = bet_type == 'moneyline'
+        if moneyline.any():
+            won[moneyline] = games['winner'].to_numpy()[moneyline] == pick[moneyline]
+        
+        spread = bet_type == 'spread'
+        if spread.any():
+            margin = (games['favorite_score'] - games['underdog_score']).to_numpy()[spread]
+            line = games['spread'].to_numpy()[spread]
+            on_favorite = games['favorite'].to_numpy()[spread] == pick[spread]
+            won[spread] = np.where(on_favorite, margin > line, -margin > -line)
+        
+        total = bet_type == 'total'
+        if total.any():
+            points = (games['favorite_score'] + games['underdog_score']).to_numpy()[total]
+            line = games['total_line'].to_numpy()[total]
+            won[total] = np.where(pick[total] == 'over', points > line, points < line)
+        
+        prop = bet_type == 'prop'
+        for pid in pd.unique(prop_id[prop]):
+            mask = prop & (prop_id == pid)
+            result_col = f"prop_{pid}_result"
+            if result_col in games:
+                won[mask] = games[result_col].to_numpy()[mask] == 'over'
+        
+        return won
+    
     def _execute_bet(self, bet_decision, game):
         """
         Execute a bet and determine outcome
@@ -166,13 +462,8 @@ class HistoricalSimulator:
         df['win_streak'] = (df['result'] == 'win').cumsum()
         df['loss_streak'] = (df['result'] == 'loss').cumsum()
         
-        max_win_streak = df.groupby((df['result'] != df['result'].shift()).cumsum())['result'].apply(
-            lambda x: (x == 'win').sum()
-        ).max()
-        
-        max_loss_streak = df.groupby((df['result'] != df['result'].shift()).cumsum())['result'].apply(
-            lambda x: (x == 'loss').sum()
-        ).max()
+        max_win_streak = longest_run(df['result'].to_numpy() == 'win')
+        max_loss_streak = longest_run(df['result'].to_numpy() == 'loss')
         
         # Drawdown analysis
         df['cumulative_profit'] = df['profit'].cumsum()
@@ -250,8 +541,6 @@ class HistoricalSimulator:
         """
         logger.info(f"Optimizing parameters. Grid size: {np.prod([len(v) for v in param_grid.values()])}")
         
-        from itertools import product
-        
         best_params = None
         best_score = -float('inf')
         all_results = []
@@ -297,6 +586,129 @@ class HistoricalSimulator:
             'all_results': all_results
         }
     
+    def score_strategy(self, strategy, historical_data, metric='roi'):
+        """
+        Scalar score of a vectorized strategy without building bet history
+        
+        Uses the same definitions as run_simulation: 'roi' and 'profit' from
+        the final bankroll, 'sharpe' from annualized daily returns.
+        """
+        data = historical_data.sort_values('date', kind='stable').reset_index(drop=True)
+        bets = self.prepare_bets(strategy, data)
+        path = bankroll_path(bets['fixed_stakes'], bets['bankroll_fractions'], bets['returns'], self.starting_bankroll)
+        final_bankroll = path[-1] if len(path) else self.starting_bankroll
+        
+        if metric == 'sharpe':
+            if not len(path):
+                return 0.0
+            
+            _, day_index = np.unique(data['date'].to_numpy(), return_inverse=True)
+            profits = np.diff(np.concatenate(([self.starting_bankroll], path)))
+            daily_returns = np.bincount(day_index[bets['rows']], weights=profits,
+                                        minlength=day_index.max() + 1) / self.starting_bankroll
+            
+            std = daily_returns.std(ddof=1) if len(daily_returns) > 1 else 0
+            return float(daily_returns.mean() / std * np.sqrt(252)) if std > 0 else 0.0
+        
+        if metric == 'profit':
+            return float(final_bankroll - self.starting_bankroll)
+        
+        return float((final_bankroll - self.starting_bankroll) / self.starting_bankroll * 100)
+    
+    def search_parameters(self, strategy_template, param_grid, historical_data, metric='roi',
+                          search='grid', n_iter=100, n_workers=None, top_k=5,
+                          prune_fraction=None, prune_quantile=0.5, random_state=None):
+        """
+        Parallel grid or random search over vectorized strategy parameters
+        
+        Historical data is written once to memory-mapped column files that every
+        worker process maps read-only. Workers return only scalar scores; the
+        top_k parameter sets are re-run in this process for full results.
+        
+        Args:
+            strategy_template: Picklable callable (module-level function or
+                functools.partial) mapping params to a vectorized strategy
+            param_grid: {param_name: list of values}
+            historical_data: DataFrame with historical games and odds
+            metric: 'roi', 'sharpe' or 'profit'
+            search: 'grid' for every combination, 'random' for n_iter samples
+            n_iter: Number of combinations for random search
+            n_workers: Worker processes (defaults to CPU count, 1 runs in-process)
+            top_k: Number of best parameter sets to return with full results
+            prune_fraction: If set, first score every combination on this
+                leading fraction of dates and drop the worst
+            prune_quantile: Share of combinations dropped by the pruning pass
+            random_state: Seed for random search
+        """
+        param_names = list(param_grid.keys())
+        combos = list(product(*param_grid.values()))
+        
+        if search == 'random' and n_iter < len(combos):
+            rng = np.random.default_rng(random_state)
+            combos = [combos[i] for i in rng.choice(len(combos), size=n_iter, replace=False)]
+        
+        candidates = [dict(zip(param_names, values)) for values in combos]
+        logger.info(f"Searching {len(candidates)} parameter sets ({search})")
+        
+        prune_cutoff = None
+        if prune_fraction:
+            dates = np.sort(historical_data['date'].unique())
+            prune_cutoff = dates[max(int(len(dates) * prune_fraction) - 1, 0)]
+        
+        n_workers = n_workers or os.cpu_count() or 1
+        pruned = 0
+        
+        with tempfile.TemporaryDirectory(prefix='backtest_') as directory:
+            columns, kept = _share_frame(historical_data, directory)
+            init_args = (directory, columns, kept, self.starting_bankroll, strategy_template, metric, prune_cutoff)
+            
+            if n_workers == 1:
+                _init_search_worker(*init_args)
+                run = lambda tasks: list(map(_score_params, tasks))
+                executor = None
+            else:
+                executor = ProcessPoolExecutor(n_workers, initializer=_init_search_worker, initargs=init_args)
+                run = lambda tasks: list(executor.map(
+                    _score_params, tasks, chunksize=max(1, len(tasks) // (n_workers * 4))
+                ))
+            
+            try:
+                if prune_cutoff is not None and len(candidates) > top_k:
+                    screen_scores = np.array(run([(params, True) for params in candidates]))
+                    threshold = np.quantile(screen_scores, prune_quantile)
+                    keep = np.flatnonzero(screen_scores >= threshold)
+                    # Never prune below the number of results we were asked for
+                    if len(keep) < top_k:
+                        keep = np.argsort(-screen_scores)[:top_k]
+                    pruned = len(candidates) - len(keep)
+                    candidates = [candidates[i] for i in keep]
+                
+                scores = run([(params, False) for params in candidates])
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+                _SEARCH_WORKER.clear()
+        
+        all_results = [{'params': params, 'score': score} for params, score in zip(candidates, scores)]
+        best = heapq.nlargest(top_k, all_results, key=lambda r: r['score'])
+        
+        top_results = [
+            dict(entry, result=self.run_simulation_vectorized(strategy_template(**entry['params']), historical_data))
+            for entry in best
+        ]
+        
+        best_params = best[0]['params'] if best else None
+        best_score = best[0]['score'] if best else -float('inf')
+        logger.info(f"Search complete. Best params: {best_params} (score: {best_score:.2f}), pruned {pruned}")
+        
+        return {
+            'best_params': best_params,
+            'best_score': best_score,
+            'all_results': all_results,
+            'top_results': top_results,
+            'pruned': pruned
+        }
+    
     def monte_carlo_simulation(self, strategy, historical_data, n_simulations=1000):
         """
         Run Monte Carlo simulation with random sampling
@@ -342,6 +754,117 @@ class HistoricalSimulator:
             'analysis': analysis
         }
 
+    def monte_carlo_bootstrap(self, strategy, historical_data, n_simulations=1000, block_size=1,
+                              ruin_fraction=0.5, chunk_size=250, random_state=None):
+        """
+        Block bootstrap Monte Carlo over precomputed bet outcomes
+        
+        The vectorized strategy is evaluated once. Each day's bets are folded
+        into an affine bankroll map (bankroll -> a * bankroll + b), so resampled
+        seasons are replayed one day at a time for a whole chunk of simulations.
+        Days are drawn in blocks of `block_size` consecutive dates to keep
+        intra-day (and short-range) correlation. Drawdown is measured at day close.
+        
+        Args:
+            strategy: Vectorized strategy (see run_simulation_vectorized)
+            historical_data: DataFrame with historical games and odds
+            n_simulations: Number of bootstrap seasons
+            block_size: Consecutive dates per bootstrap block
+            ruin_fraction: Ruin when bankroll falls to this share of the start
+            chunk_size: Simulations processed at once (bounds memory)
+            random_state: Seed for reproducible runs
+        """
+        logger.info(f"Running {n_simulations} bootstrap simulations (block size {block_size})")
+        
+        rng = np.random.default_rng(random_state)
+        data = historical_data.sort_values('date', kind='stable').reset_index(drop=True)
+        bets = self.prepare_bets(strategy, data)
+        
+        _, day_index = np.unique(data['date'].to_numpy(), return_inverse=True)
+        n_days = int(day_index.max()) + 1 if len(day_index) else 0
+        day_scale, day_shift = self._daily_bankroll_maps(bets, day_index[bets['rows']], n_days)
+        
+        n_blocks = -(-n_days // block_size)
+        block_offsets = np.arange(block_size)
+        ruin_level = self.starting_bankroll * ruin_fraction
+        
+        final_bankroll = np.empty(n_simulations)
+        max_drawdown = np.empty(n_simulations)
+        ruined = np.empty(n_simulations, dtype=bool)
+        
+        for chunk_start in range(0, n_simulations, chunk_size):
+            n_chunk = min(chunk_size, n_simulations - chunk_start)
+            
+            # (n_chunk, n_days) matrix of resampled day indices, built from block starts
+            starts = rng.integers(0, max(n_days - block_size + 1, 1), size=(n_chunk, n_blocks))
+            days = np.minimum(starts[:, :, None] + block_offsets, n_days - 1).reshape(n_chunk, -1)[:, :n_days]
+            
+            bankroll = np.full(n_chunk, float(self.starting_bankroll))
+            peak = bankroll.copy()
+            drawdown = np.zeros(n_chunk)
+            low = bankroll.copy()
+            
+            for step in range(days.shape[1]):
+                day = days[:, step]
+                bankroll = day_scale[day] * bankroll + day_shift[day]
+                np.maximum(peak, bankroll, out=peak)
+                np.minimum(drawdown, bankroll - peak, out=drawdown)
+                np.minimum(low, bankroll, out=low)
+            
+            chunk = slice(chunk_start, chunk_start + n_chunk)
+            final_bankroll[chunk] = bankroll
+            max_drawdown[chunk] = drawdown / self.starting_bankroll * 100
+            ruined[chunk] = low <= ruin_level
+        
+        roi = (final_bankroll - self.starting_bankroll) / self.starting_bankroll * 100
+        
+        analysis = {
+            'mean_roi': float(roi.mean()),
+            'median_roi': float(np.median(roi)),
+            'std_roi': float(roi.std(ddof=1)) if n_simulations > 1 else 0.0,
+            'min_roi': float(roi.min()),
+            'max_roi': float(roi.max()),
+            'profit_probability': float((roi > 0).mean() * 100),
+            'percentile_5': float(np.quantile(roi, 0.05)),
+            'percentile_95': float(np.quantile(roi, 0.95)),
+            'var_95': float(np.quantile(final_bankroll, 0.05)),  # Value at Risk
+            'expected_final_bankroll': float(final_bankroll.mean()),
+            'mean_max_drawdown': float(max_drawdown.mean()),
+            'drawdown_percentile_5': float(np.quantile(max_drawdown, 0.05)),
+            'ruin_probability': float(ruined.mean() * 100)
+        }
+        
+        logger.info(f"Bootstrap complete. Mean ROI: {analysis['mean_roi']:.2f}%, Ruin Prob: {analysis['ruin_probability']:.2f}%")
+        
+        return {
+            'simulations': {
+                'final_bankroll': final_bankroll,
+                'roi': roi,
+                'max_drawdown': max_drawdown,
+                'ruined': ruined
+            },
+            'analysis': analysis
+        }
+    
+    def _daily_bankroll_maps(self, bets, bet_days, n_days):
+        """
+        Fold each day's bets into bankroll -> scale * bankroll + shift
+        
+        A bet staking fixed + fraction * B with return r maps B to
+        (1 + fraction * r) * B + fixed * r; consecutive bets compose.
+        """
+        day_scale = np.ones(n_days)
+        day_shift = np.zeros(n_days)
+        
+        bet_scale = 1 + bets['bankroll_fractions'] * bets['returns']
+        bet_shift = bets['fixed_stakes'] * bets['returns']
+        
+        for day, scale, shift in zip(bet_days, bet_scale, bet_shift):
+            day_scale[day] *= scale
+            day_shift[day] = day_shift[day] * scale + shift
+        
+        return day_scale, day_shift
+
 # Example strategies
 
 def kelly_strategy(game, bankroll, kelly_fraction=0.25):
@@ -405,5 +928,52 @@ def value_bet_strategy(game, bankroll, min_edge=0.03):
         'stake': stake
     }
 
+# Vectorized versions of the example strategies for run_simulation_vectorized
+
+def kelly_strategy_vectorized(games, kelly_fraction=0.25):
+    """
+    Example: Kelly Criterion betting strategy over all games at once
+    """
+    edge = 0.05  # 5% edge (would come from model)
+    odds = -110
+    
+    decimal_odds = 1 + (100 / abs(odds))
+    kelly = edge / (decimal_odds - 1)
+    
+    return {
+        'bet_type': 'spread',
+        'pick': games['favorite'],
+        'odds': odds,
+        'bankroll_fraction': min(kelly * kelly_fraction, 0.05)  # Max 5% of bankroll
+    }
+
+def flat_bet_strategy_vectorized(games, unit_size=100):
+    """
+    Example: Flat betting strategy over all games at once
+    """
+    return {
+        'bet_type': 'moneyline',
+        'pick': games['favorite'],
+        'odds': -150,
+        'stake': unit_size
+    }
+
+def value_bet_strategy_vectorized(games, min_edge=0.03):
+    """
+    Example: Value betting over all games at once
+    """
+    model_prob = np.full(len(games), 0.60)  # Would come from model predictions
+    odds = -110
+    
+    implied_prob = abs(odds) / (abs(odds) + 100)
+    edge = model_prob - implied_prob
+    
+    return {
+        'bet_type': 'spread',
+        'pick': games['favorite'],
+        'odds': odds,
+        'bankroll_fraction': np.where(edge >= min_edge, 0.02, 0.0)  # 2% of bankroll
+    }
+
 # Export
 simulator = HistoricalSimulator()
@@ -0,0 +1,144 @@
+"""
+Inference Executor
+Runs heavy model and simulation work off the event loop with bounded queues
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Raised instead of queueing when an executor's backlog is full"""
+
+    def __init__(self, pool: str, pending: int, retry_after: int = 1):
+        super().__init__(f"{pool} executor saturated ({pending} pending)")
+        self.pool = pool
+        self.pending = pending
+        self.retry_after = retry_after
+
+
+class _BoundedPool:
+    """Executor plus an admission counter covering queued and running tasks"""
+
+    def __init__(self, name: str, factory: Callable[[], Executor], capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        # Created on first use so idle services don't start workers
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._factory()
+        return self._executor
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                raise ExecutorSaturated(self.name, self.pending)
+            self.pending += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending': self.pending,
+            'capacity': self.capacity,
+            'completed': self.completed,
+            'rejected': self.rejected
+        }
+
+
+class InferenceExecutor:
+    """
+    Dedicated bounded thread pool for CPU-bound inference
+
+    Model scoring (NumPy/XGBoost/LightGBM/PyTorch) and the vectorised Monte
+    Carlo paths release the GIL in their hot loops, so threads are enough.
+    The pool admits at most workers + queue_size tasks; beyond that run()
+    raises ExecutorSaturated so callers can shed load with a 503.
+    """
+
+    def __init__(self, max_threads: Optional[int] = None, thread_queue_size: int = 64):
+        """
+        Args:
+            max_threads: Inference threads (defaults to CPU count)
+            thread_queue_size: Tasks allowed to wait for a thread
+        """
+        self.max_threads = max_threads or os.cpu_count() or 4
+
+        self.threads = _BoundedPool(
+            'inference-threads',
+            lambda: ThreadPoolExecutor(self.max_threads, thread_name_prefix='inference'),
+            self.max_threads + thread_queue_size
+        )
+
+    @classmethod
+    def from_env(cls) -> 'InferenceExecutor':
+        return cls(
+            max_threads=int(os.getenv('INFERENCE_THREADS', 0)) or None,
+            thread_queue_size=int(os.getenv('INFERENCE_THREAD_QUEUE', 64))
+        )
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on an inference thread
+
+        Raises:
+            ExecutorSaturated: the pool's backlog is full
+        """
+        pool = self.threads
+        pool.acquire()
+        try:
+            future = pool.executor.submit(functools.partial(fn, *args, **kwargs))
+        except Exception:
+            pool.release()
+            raise
+
+        # The slot follows the thread's work, not the awaiting request: a
+        # cancelled request leaves the work running, so it stays admitted
+        future.add_done_callback(lambda _: pool.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        self.threads.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'threads': {**self.threads.stats(), 'workers': self.max_threads}
+        }
+
+
+_inference_executor: Optional[InferenceExecutor] = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Process-wide executor configured from INFERENCE_* environment variables"""
+    global _inference_executor
+    if _inference_executor is None:
+        _inference_executor = InferenceExecutor.from_env()
+    return _inference_executor
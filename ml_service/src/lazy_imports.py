@@ -0,0 +1,32 @@
+"""
+Lazy Imports
+Defers heavy ML libraries (torch, scipy, xgboost, ...) until the feature that
+needs them runs, so the API process binds its port without paying for them
+"""
+
+import functools
+import importlib
+import importlib.util
+import logging
+from types import ModuleType
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def module_available(name: str) -> bool:
+    """Whether a module is installed, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def optional_import(name: str) -> Optional[ModuleType]:
+    """Import a module on first use; None if it is missing or fails to import"""
+    try:
+        return importlib.import_module(name)
+    except Exception as e:
+        logger.warning(f"{name} unavailable: {e}")
+        return None
@@ -7,21 +7,137 @@ Detects line movements, arbitrage, and best available odds
 import os
 import asyncio
 import aiohttp
+import random
 import time
 from datetime import datetime, timedelta
 import logging
-from collections import defaultdict
+from collections import defaultdict, deque
 import numpy as np
 
+try:
+    from .caching import TTLCache
+except ImportError:
+    from caching import TTLCache
+
 logger = logging.getLogger(__name__)
 
+SOURCE_URLS = {
+    'the_odds_api': 'https://api.the-odds-api.com/v4/sports',
+    'sportsdata': 'https://api.sportsdata.io/v3',
+    'rapidapi': 'https://api-basketball.p.rapidapi.com'
+}
+
+# Per-request timeout (seconds) for each source; retries get a fresh timeout
+SOURCE_TIMEOUTS = {
+    'the_odds_api': 8.0,
+    'sportsdata': 10.0,
+    'rapidapi': 10.0
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+MARKETS = ('spread', 'moneyline', 'total')
+GAME_INFO = ('game_id', 'home_team', 'away_team', 'commence_time')
+
+
+class LineHistory:
+    """
+    Line history for one game stored as deltas
+    
+    Each entry holds only the consensus fields and best-odds sides that
+    changed; entries past max_entries are folded into a base snapshot.
+    snapshots() replays them into full {'timestamp', 'consensus',
+    'best_odds'} records.
+    """
+    
+    def __init__(self, max_entries=100):
+        self.max_entries = max_entries
+        self.base = {'consensus': {}, 'best_odds': {}}
+        self.current = {'consensus': {}, 'best_odds': {}}
+        self.deltas = deque()
+    
+    def __len__(self):
+        return len(self.deltas)
+    
+    def record(self, timestamp, consensus, best_odds):
+        """Append the change since the last record; returns False if nothing moved"""
+        delta = {
+            'consensus': {key: value for key, value in consensus.items()
+                          if key not in self.current['consensus'] or self.current['consensus'][key] != value},
+            'best_odds': {}
+        }
+        for market, sides in best_odds.items():
+            previous = self.current['best_odds'].get(market, {})
+            moved = {side: quote for side, quote in sides.items() if previous.get(side) != quote}
+            if moved:
+                delta['best_odds'][market] = moved
+        
+        if not delta['consensus'] and not delta['best_odds']:
+            return False
+        
+        self._apply(self.current, delta)
+        self.deltas.append((timestamp, delta))
+        if len(self.deltas) > self.max_entries:
+            _, oldest = self.deltas.popleft()
+            self._apply(self.base, oldest)
+        return True
+    
+    def snapshots(self, since=None):
+        """
+        Full records replayed from the deltas, oldest first
+        
+        With since, the state carried into the window is emitted first,
+        stamped at since, so moves are measured from the window start.
+        """
+        state = {'consensus': dict(self.base['consensus']),
+                 'best_odds': {market: dict(sides) for market, sides in self.base['best_odds'].items()}}
+        carried = bool(self.base['consensus'])
+        records = []
+        
+        for timestamp, delta in self.deltas:
+            if since is not None and timestamp <= since:
+                self._apply(state, delta)
+                carried = True
+                continue
+            if since is not None and carried and not records:
+                records.append(self._record(since, state))
+            self._apply(state, delta)
+            records.append(self._record(timestamp, state))
+        
+        if since is not None and carried and not records:
+            records.append(self._record(since, state))
+        return records
+    
+    @staticmethod
+    def _apply(state, delta):
+        state['consensus'].update(delta['consensus'])
+        for market, sides in delta['best_odds'].items():
+            state['best_odds'][market] = {**state['best_odds'].get(market, {}), **sides}
+    
+    @staticmethod
+    def _record(timestamp, state):
+        return {
+            'timestamp': timestamp,
+            'consensus': dict(state['consensus']),
+            'best_odds': {market: dict(sides) for market, sides in state['best_odds'].items()}
+        }
+
+
 class LiveOddsAggregator:
-    def __init__(self):
+    def __init__(self, base_urls=None, timeouts=None, max_retries=2, retry_backoff=0.25):
         self.api_keys = {
             'the_odds_api': os.getenv('ODDS_API_KEY'),
             'sportsdata': os.getenv('SPORTSDATA_API_KEY'),
             'rapidapi': os.getenv('RAPID_API_KEY')
         }
+        self.base_urls = {**SOURCE_URLS, **(base_urls or {})}
+        self.timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        
+        # One keep-alive session per aggregator, created on first fetch
+        self._session = None
+        self._session_loop = None
         
         # Sportsbook mappings
         self.sportsbooks = [
@@ -30,11 +146,16 @@ class LiveOddsAggregator:
         ]
         
         # Cache for odds data
-        self.odds_cache = {}
         self.cache_ttl = 30  # 30 seconds
+        self.odds_cache = TTLCache(max_entries=256, default_ttl=self.cache_ttl, name="odds_cache")
+        
+        # Per-game state for each (sport, markets) feed: bookmaker quotes plus
+        # derived best odds / consensus, updated in place as polls arrive
+        self.games = defaultdict(dict)
+        self.last_poll = {}
         
         # Line movement tracking
-        self.line_history = defaultdict(list)
+        self.line_history = defaultdict(LineHistory)
         
         # WebSocket connections for real-time feeds
         self.ws_connections = {}
@@ -48,10 +169,9 @@ class LiveOddsAggregator:
         cache_key = f"{sport}_{','.join(markets)}"
         
         # Check cache
-        if cache_key in self.odds_cache:
-            cached = self.odds_cache[cache_key]
-            if time.time() - cached['timestamp'] < self.cache_ttl:
-                return cached['data']
+        cached = self.odds_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Fetch from all sources in parallel
         tasks = [
@@ -71,47 +191,144 @@ class LiveOddsAggregator:
             if result:
                 all_odds.extend(result)
         
-        # Aggregate and normalize
-        aggregated = self._aggregate_odds(all_odds)
+        # Apply only what changed since this feed's last poll
+        games = self.games[cache_key]
+        changed = self._apply_odds(cache_key, all_odds)
+        aggregated = list(games.values())
         
         # Cache result
-        self.odds_cache[cache_key] = {
-            'data': aggregated,
-            'timestamp': time.time()
-        }
+        self.odds_cache.set(cache_key, aggregated)
         
         # Track line movements
-        self._track_line_movements(aggregated)
+        self._track_line_movements([games[game_key] for game_key in changed])
         
         return aggregated
     
+    # ------------------------------------------------------------------
+    # HTTP session
+    # ------------------------------------------------------------------
+    
+    def _get_session(self):
+        """
+        Long-lived session with a pooled keep-alive connector, so repeated
+        polls reuse TCP/TLS connections and cached DNS lookups
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
+        
+        if self._session is not None and not self._session.closed:
+            # Sessions are bound to their event loop; the old one cannot be reused here
+            logger.debug("Event loop changed, replacing odds HTTP session")
+            self._discard_session(self._session, self._session_loop)
+        
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=10,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        self._session_loop = loop
+        return self._session
+    
+    @staticmethod
+    def _discard_session(session, loop):
+        """Release a session that belongs to another event loop"""
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        
+        # Its sockets can only be closed on the loop that opened them, which has
+        # stopped; detach so the session is marked closed and the pool is dropped
+        logger.warning("Odds HTTP session outlived its event loop; call close() before the loop ends")
+        session.detach()
+    
+    async def close(self):
+        """Close the pooled session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+    
+    async def _get_json(self, source, url, params=None, headers=None):
+        """
+        GET a JSON payload with the source's timeout, retrying transient
+        failures (connection errors, timeouts, 429/5xx) with jittered backoff
+        
+        Returns:
+            Decoded JSON, or None if the request ultimately failed
+        """
+        session = self._get_session()
+        timeout = aiohttp.ClientTimeout(total=self.timeouts[source])
+        
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with session.get(url, params=params, headers=headers, timeout=timeout) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    if response.status not in RETRY_STATUSES:
+                        logger.warning(f"{source} returned {response.status} for {url}")
+                        return None
+                    error = f"HTTP {response.status}"
+                    retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = repr(e)
+            
+            if attempt == self.max_retries:
+                logger.error(f"{source} failed after {attempt + 1} attempts: {error}")
+                return None
+            
+            # Full jitter keeps concurrent market fetches from retrying in lockstep
+            delay = random.uniform(0, self.retry_backoff * 2 ** attempt)
+            if retry_after is not None and retry_after.isdigit():
+                # A wait longer than the source's own budget would stall the whole poll
+                if float(retry_after) > self.timeouts[source]:
+                    logger.warning(f"{source} {error}, Retry-After {retry_after}s exceeds budget; skipping this poll")
+                    return None
+                delay = max(delay, float(retry_after))
+            logger.debug(f"{source} {error}, retry {attempt + 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+    
+    # ------------------------------------------------------------------
+    # Sources
+    # ------------------------------------------------------------------
+    
     async def _fetch_the_odds_api(self, sport, markets):
         """
-        Fetch from The Odds API
+        Fetch from The Odds API, one request per market issued concurrently
         """
         try:
-            base_url = 'https://api.the-odds-api.com/v4/sports'
+            url = f"{self.base_urls['the_odds_api']}/{sport}/odds"
+            
+            def params(market):
+                return {
+                    'apiKey': self.api_keys['the_odds_api'],
+                    'regions': 'us',
+                    'markets': market,
+                    'oddsFormat': 'american',
+                    'bookmakers': ','.join(self.sportsbooks)
+                }
+            
+            payloads = await asyncio.gather(*[
+                self._get_json('the_odds_api', url, params=params(market))
+                for market in markets
+            ])
+            
+            all_games = []
+            for market, data in zip(markets, payloads):
+                if data is not None:
+                    all_games.extend(self._parse_the_odds_api(data, market))
+            
+            return all_games
             
-            async with aiohttp.ClientSession() as session:
-                all_games = []
-                
-                for market in markets:
-                    url = f"{base_url}/{sport}/odds"
-                    params = {
-                        'apiKey': self.api_keys['the_odds_api'],
-                        'regions': 'us',
-                        'markets': market,
-                        'oddsFormat': 'american',
-                        'bookmakers': ','.join(self.sportsbooks)
-                    }
-                    
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            all_games.extend(self._parse_the_odds_api(data, market))
-                
-                return all_games
-                
         except Exception as e:
             logger.error(f"The Odds API error: {e}")
             return []
@@ -129,17 +346,11 @@ class LiveOddsAggregator:
             else:
                 return []
             
-            base_url = f'https://api.sportsdata.io/v3/{endpoint}/odds/json/GameOdds'
+            url = f"{self.base_urls['sportsdata']}/{endpoint}/odds/json/GameOdds"
+            headers = {'Ocp-Apim-Subscription-Key': self.api_keys['sportsdata']}
             
-            async with aiohttp.ClientSession() as session:
-                headers = {'Ocp-Apim-Subscription-Key': self.api_keys['sportsdata']}
-                
-                async with session.get(base_url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_sportsdata_api(data)
-            
-            return []
+            data = await self._get_json('sportsdata', url, headers=headers)
+            return self._parse_sportsdata_api(data) if data is not None else []
             
         except Exception as e:
             logger.error(f"SportsData API error: {e}")
@@ -154,21 +365,15 @@ class LiveOddsAggregator:
             if 'nba' not in sport:
                 return []
             
-            url = "https://api-basketball.p.rapidapi.com/odds"
-            
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'X-RapidAPI-Key': self.api_keys['rapidapi'],
-                    'X-RapidAPI-Host': 'api-basketball.p.rapidapi.com'
-                }
-                params = {'league': '12', 'season': '2025'}  # NBA
-                
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_rapidapi_odds(data)
+            url = f"{self.base_urls['rapidapi']}/odds"
+            headers = {
+                'X-RapidAPI-Key': self.api_keys['rapidapi'],
+                'X-RapidAPI-Host': 'api-basketball.p.rapidapi.com'
+            }
+            params = {'league': '12', 'season': '2025'}  # NBA
             
-            return []
+            data = await self._get_json('rapidapi', url, params=params, headers=headers)
+            return self._parse_rapidapi_odds(data) if data is not None else []
             
         except Exception as e:
             logger.error(f"RapidAPI error: {e}")
@@ -247,49 +452,67 @@ class LiveOddsAggregator:
         # Implementation depends on specific API structure
         return []
     
-    def _aggregate_odds(self, all_odds):
+    def _apply_odds(self, state_key, all_odds):
         """
-        Aggregate odds from multiple sources
+        Merge one poll into the per-game state of one feed
+        
+        Quotes are grouped per game and book, then diffed against the stored
+        state; best odds and consensus are recomputed only for games whose
+        quotes changed. Games and books missing from the poll are dropped,
+        so the state always mirrors the feed's latest poll. Each
+        (sport, markets) feed has its own state, so polling another sport
+        or market set doesn't discard this one.
+        
+        Returns:
+            Keys of games that were added or changed
         """
         # Group by game
-        games_map = defaultdict(lambda: {
-            'bookmakers': {},
-            'best_odds': {},
-            'market_consensus': {}
-        })
-        
+        incoming = {}
         for odds_data in all_odds:
             game_key = f"{odds_data['home_team']}_{odds_data['away_team']}"
-            game = games_map[game_key]
+            game = incoming.get(game_key)
+            if game is None:
+                game = incoming[game_key] = {
+                    'info': {field: odds_data.get(field) for field in GAME_INFO},
+                    'bookmakers': {}
+                }
             
-            # Add basic info
-            if 'home_team' not in game:
-                game.update({
-                    'game_id': odds_data.get('game_id'),
-                    'home_team': odds_data['home_team'],
-                    'away_team': odds_data['away_team'],
-                    'commence_time': odds_data.get('commence_time')
-                })
+            # Store odds by market type
+            book = game['bookmakers'].setdefault(odds_data.get('bookmaker', 'unknown'), {})
+            for market in MARKETS:
+                if market in odds_data:
+                    book[market] = odds_data[market]
+        
+        games = self.games[state_key]
+        for game_key in [game_key for game_key in games if game_key not in incoming]:
+            del games[game_key]
+        
+        changed = []
+        quote_changes = 0
+        for game_key, fresh in incoming.items():
+            game = games.get(game_key)
+            if game is not None and game['bookmakers'] == fresh['bookmakers'] and \
+                    all(game[field] == value for field, value in fresh['info'].items()):
+                continue
             
-            # Add bookmaker odds
-            bookmaker = odds_data.get('bookmaker', 'unknown')
-            if bookmaker not in game['bookmakers']:
-                game['bookmakers'][bookmaker] = {}
+            previous = game['bookmakers'] if game is not None else {}
+            for book, quotes in fresh['bookmakers'].items():
+                stored = previous.get(book, {})
+                quote_changes += sum(stored.get(market) != value for market, value in quotes.items())
             
-            # Store odds by market type
-            if 'spread' in odds_data:
-                game['bookmakers'][bookmaker]['spread'] = odds_data['spread']
-            if 'moneyline' in odds_data:
-                game['bookmakers'][bookmaker]['moneyline'] = odds_data['moneyline']
-            if 'total' in odds_data:
-                game['bookmakers'][bookmaker]['total'] = odds_data['total']
-        
-        # Calculate best odds and consensus for each game
-        for game_key, game in games_map.items():
-            game['best_odds'] = self._find_best_odds(game['bookmakers'])
-            game['market_consensus'] = self._calculate_consensus(game['bookmakers'])
-        
-        return list(games_map.values())
+            # Replace rather than mutate, so previously returned results stay intact
+            games[game_key] = {
+                'bookmakers': fresh['bookmakers'],
+                'best_odds': self._find_best_odds(fresh['bookmakers']),
+                'market_consensus': self._calculate_consensus(fresh['bookmakers']),
+                **fresh['info']
+            }
+            changed.append(game_key)
+        
+        self.last_poll[state_key] = {'games': len(incoming), 'changed_games': len(changed),
+                                     'quote_changes': quote_changes}
+        logger.debug(f"Odds poll {state_key}: {len(changed)}/{len(incoming)} games changed, {quote_changes} quotes")
+        return changed
     
     def _find_best_odds(self, bookmakers):
         """
@@ -355,16 +578,7 @@ class LiveOddsAggregator:
         
         for game in games:
             game_key = f"{game['home_team']}_{game['away_team']}"
-            
-            self.line_history[game_key].append({
-                'timestamp': timestamp,
-                'consensus': game['market_consensus'],
-                'best_odds': game['best_odds']
-            })
-            
-            # Keep last 100 entries
-            if len(self.line_history[game_key]) > 100:
-                self.line_history[game_key] = self.line_history[game_key][-100:]
+            self.line_history[game_key].record(timestamp, game['market_consensus'], game['best_odds'])
     
     def get_line_movement(self, game_id, lookback_minutes=60):
         """
@@ -374,13 +588,7 @@ class LiveOddsAggregator:
             return []
         
         cutoff_time = datetime.now() - timedelta(minutes=lookback_minutes)
-        
-        recent_history = [
-            entry for entry in self.line_history[game_id]
-            if entry['timestamp'] > cutoff_time
-        ]
-        
-        return recent_history
+        return self.line_history[game_id].snapshots(since=cutoff_time)
     
     def detect_steam_moves(self, game_id, threshold=1.0):
         """
@@ -0,0 +1,186 @@
+"""
+Micro-Batching Inference Scheduler
+Coalesces concurrent single-row requests into vectorized model calls
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .inference_executor import ExecutorSaturated, InferenceExecutor
+except ImportError:
+    from inference_executor import ExecutorSaturated, InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects requests for up to max_wait_ms or max_batch_size rows, runs one
+    batched predict in an executor and resolves each caller's future
+
+    predict_fn receives a list of items and must return one result per item,
+    in order. While a batch runs, the next one keeps filling.
+    """
+
+    def __init__(self, predict_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, max_concurrent_batches: int = 2,
+                 max_queue_size: Optional[int] = None, executor: Optional[InferenceExecutor] = None,
+                 name: str = "model"):
+        """
+        Args:
+            predict_fn: Batched prediction callable run off the event loop
+            max_batch_size: Rows per model call
+            max_wait_ms: Longest a request waits for its batch to fill
+            max_concurrent_batches: Batches allowed in the executor at once
+            max_queue_size: Queued requests before submit() raises ExecutorSaturated
+            executor: InferenceExecutor for predict_fn (None = the loop's default executor)
+            name: Label used in logs and stats
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_concurrent_batches = max_concurrent_batches
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+        self.name = name
+
+        self._loop = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batch_tasks = set()
+
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+        self.rejected = 0
+        self._queue_delays = deque(maxlen=1000)
+        self._batch_sizes = deque(maxlen=1000)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        if self.max_queue_size is not None and self._queue.qsize() >= self.max_queue_size:
+            self.rejected += 1
+            raise ExecutorSaturated(self.name, self._queue.qsize())
+
+        future = loop.create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    def _ensure_worker(self, loop) -> None:
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+
+        # Queues and semaphores belong to one event loop; rebuild them for a new one
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued before waiting on the clock
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            # The loop only keeps weak references to tasks; hold in-flight batches here
+            task = self._loop.create_task(self._execute(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _execute(self, batch: List[tuple]) -> None:
+        started = time.perf_counter()
+        items = [item for item, _, _ in batch]
+
+        try:
+            if self.executor is not None:
+                results = await self.executor.run(self.predict_fn, items)
+            else:
+                results = await self._loop.run_in_executor(None, self.predict_fn, items)
+            if len(results) != len(items):
+                raise ValueError(f"{self.name}: predict_fn returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"{self.name}: batch of {len(items)} failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+        self.batches += 1
+        self.rows += len(batch)
+        self._batch_sizes.append(len(batch))
+        self._queue_delays.extend(started - enqueued for _, _, enqueued in batch)
+
+    def stats(self) -> Dict[str, Any]:
+        delays_ms = np.array(self._queue_delays) * 1000
+        sizes = np.array(self._batch_sizes)
+        return {
+            'name': self.name,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'batches': self.batches,
+            'rows': self.rows,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'avg_batch_size': float(sizes.mean()) if len(sizes) else 0.0,
+            'avg_batch_fill': float(sizes.mean() / self.max_batch_size) if len(sizes) else 0.0,
+            'avg_queue_delay_ms': float(delays_ms.mean()) if len(delays_ms) else 0.0,
+            'p95_queue_delay_ms': float(np.percentile(delays_ms, 95)) if len(delays_ms) else 0.0
+        }
+
+
+_batchers: Dict[str, MicroBatcher] = {}
+
+
+def get_batcher(name: str, predict_fn: Callable[[List[Any]], List[Any]],
+                max_batch_size: int = 64, max_wait_ms: float = 5.0, **kwargs) -> MicroBatcher:
+    """
+    Process-wide batcher for a model
+
+    MICROBATCH_<NAME>_SIZE and MICROBATCH_<NAME>_WAIT_MS override the
+    defaults per model.
+    """
+    if name not in _batchers:
+        prefix = f"MICROBATCH_{name.upper()}"
+        _batchers[name] = MicroBatcher(
+            predict_fn,
+            max_batch_size=int(os.getenv(f"{prefix}_SIZE", max_batch_size)),
+            max_wait_ms=float(os.getenv(f"{prefix}_WAIT_MS", max_wait_ms)),
+            name=name,
+            **kwargs
+        )
+    return _batchers[name]
+
+
+def batcher_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: batcher.stats() for name, batcher in _batchers.items()}
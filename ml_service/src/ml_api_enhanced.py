@@ -18,15 +18,36 @@ import logging
 try:
     from advanced_ml_engine import AdvancedMLEngine, EnsembleOrchestrator
     from model_evaluation_framework import EvaluationAPI, EliteBacktester
-    from realtime_analytics_engine import RealTimeAnalyticsAPI
 except ImportError:
     # Fallback for when modules aren't available
     AdvancedMLEngine = None
     EvaluationAPI = None
-    RealTimeAnalyticsAPI = None
+
+try:
+    from .realtime_analytics_engine import RealTimeAnalyticsAPI, realtime_api
+except ImportError:
+    try:
+        from realtime_analytics_engine import RealTimeAnalyticsAPI, realtime_api
+    except ImportError:
+        RealTimeAnalyticsAPI = None
+
+try:
+    from .inference_executor import ExecutorSaturated, get_inference_executor
+    from .model_registry import model_registry
+except ImportError:
+    from inference_executor import ExecutorSaturated, get_inference_executor
+    from model_registry import model_registry
 
 logger = logging.getLogger(__name__)
 
+# Engine calls are CPU-bound; run them on the shared inference pool
+inference_executor = get_inference_executor()
+
+
+def get_engine():
+    """One AdvancedMLEngine per process instead of one per request"""
+    return model_registry.shared("advanced_ml_engine", AdvancedMLEngine)
+
 # Create router
 router = APIRouter(prefix="/api/v2", tags=["ML Elite v4.0"])
 
@@ -425,13 +446,14 @@ async def get_ensemble_prediction(request: EnsemblePredictionRequest):
     try:
         # Initialize engine
         if AdvancedMLEngine:
-            engine = AdvancedMLEngine()
+            engine = get_engine()
         else:
             # Mock response for demonstration
             return generate_mock_ensemble_response(request)
         
         # Get ensemble prediction
-        result = engine.get_ensemble_prediction(
+        result = await inference_executor.run(
+            engine.get_ensemble_prediction,
             player_id=request.player_id,
             stat_type=request.stat_type,
             line=request.line,
@@ -464,6 +486,8 @@ async def get_ensemble_prediction(request: EnsemblePredictionRequest):
             timestamp=datetime.now()
         )
         
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         logger.error(f"Ensemble prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -478,8 +502,9 @@ async def find_value_bets(request: ValueBetRequest):
     """
     try:
         if AdvancedMLEngine:
-            engine = AdvancedMLEngine()
-            bets = engine.find_value_bets(
+            engine = get_engine()
+            bets = await inference_executor.run(
+                engine.find_value_bets,
                 date=request.date or datetime.now().strftime("%Y-%m-%d"),
                 min_edge=request.min_edge
             )
@@ -497,6 +522,8 @@ async def find_value_bets(request: ValueBetRequest):
             }
         )
         
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         logger.error(f"Value bets error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -561,7 +588,8 @@ async def get_live_prediction(request: LivePredictionRequest):
     """
     try:
         if RealTimeAnalyticsAPI:
-            api = RealTimeAnalyticsAPI()
+            # Shared instance instead of a new engine per request
+            api = realtime_api
             result = api.get_live_prediction(
                 player_id=request.player_id,
                 stat_type=request.stat_type,
@@ -588,7 +616,8 @@ async def get_correlations(player_ids: Optional[List[str]] = Query(None)):
     """
     try:
         if RealTimeAnalyticsAPI:
-            api = RealTimeAnalyticsAPI()
+            # Shared instance instead of a new engine per request
+            api = realtime_api
             # Would fetch actual player stats
             mock_stats = {pid: np.random.randn(20).tolist() for pid in (player_ids or ['player1', 'player2'])}
             result = api.get_correlations(mock_stats)
@@ -0,0 +1,548 @@
+"""
+Flat Model Artifacts
+Tree ensembles and scalers stored as flat NumPy arrays that every worker
+memory-maps read-only, so the OS page cache holds one copy per host
+
+Layout, next to the pickle it replaces:
+    models/<group>/<name>.npy   node or parameter array (np.load mmap_mode='r')
+    models/<group>/<name>.json  format, objective, classes, base margin, ...
+
+Trees are exported from the native XGBoost JSON / LightGBM dump and scored
+with vectorized NumPy traversal, so serving workers import neither library.
+
+Usage:
+    python src/model_artifacts.py export [models_dir]
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODELS_PATH = Path(__file__).parent.parent / "models"
+FORMAT_VERSION = 1
+
+ALIGNMENT = 8
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_LIGHTGBM_MISSING = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+
+
+# ============================================
+# Column blobs
+# ============================================
+
+def pack_columns(columns: Dict[str, np.ndarray]) -> tuple:
+    """
+    Lay out arrays back to back in one uint8 buffer, each 8-byte aligned
+
+    Returns:
+        (blob, layout) where layout maps name -> [dtype, offset, length]
+    """
+    layout, chunks, offset = {}, [], 0
+    for name, array in columns.items():
+        array = np.ascontiguousarray(array)
+        layout[name] = [array.dtype.str, offset, len(array)]
+        chunks.append(array.tobytes())
+        padding = -array.nbytes % ALIGNMENT
+        chunks.append(b'\0' * padding)
+        offset += array.nbytes + padding
+    return np.frombuffer(b''.join(chunks), dtype=np.uint8), layout
+
+
+def unpack_columns(blob: np.ndarray, layout: Dict[str, list]) -> Dict[str, np.ndarray]:
+    """Zero-copy typed views into a (possibly memory-mapped) blob"""
+    columns = {}
+    for name, (dtype, offset, length) in layout.items():
+        dtype = np.dtype(dtype)
+        columns[name] = blob[offset:offset + length * dtype.itemsize].view(dtype)
+    return columns
+
+
+# ============================================
+# Runtime models
+# ============================================
+
+class FlatTreeEnsemble:
+    """
+    Gradient-boosted trees evaluated over flat node columns
+
+    Nodes are laid out so a right child directly follows its left sibling and
+    leaves point at themselves with an infinite threshold; traversal is a
+    fixed number of vectorized steps, idx = left[idx] + goes_right.
+    Exposes the predict / predict_proba / feature_importances_ surface the
+    service uses from the sklearn wrappers.
+
+    Rows are scored ROW_CHUNK at a time so the per-step index arrays stay in
+    cache. This beats the native XGBoost predictor on small batches but the
+    model call is ~1.6x slower at 1000 rows (~1.1x for the whole batch
+    endpoint, see benchmarks/bench_prop_batch.py); ModelRegistry(
+    prefer_flat=False) keeps the native models where large batches dominate.
+    """
+
+    ROW_CHUNK = 128
+
+    def __init__(self, blob: np.ndarray, meta: Dict[str, Any]):
+        self.blob = blob
+        self.meta = meta
+        self.columns = unpack_columns(blob, meta['columns'])
+        self.roots = np.asarray(meta['roots'], dtype=np.int32)
+        self.n_features_in_ = meta['n_features']
+        self.max_depth = meta['max_depth']
+        self.base_margin = np.asarray(meta['base_margin'], dtype=np.float64)
+        self.feature_importances_ = np.asarray(meta['feature_importances']) \
+            if meta.get('feature_importances') is not None else None
+        if meta.get('classes') is not None:
+            self.classes_ = np.asarray(meta['classes'])
+
+        # Tree -> output column, as a matrix so margins are one matmul
+        self._tree_output = np.zeros((len(self.roots), len(self.base_margin)))
+        self._tree_output[np.arange(len(self.roots)), meta['tree_output']] = 1.0
+
+    def raw_margin(self, X) -> np.ndarray:
+        threshold = self.columns['threshold']
+        # Thresholds are float32 for XGBoost, which also compares in float32;
+        # clipping keeps infinite inputs from stepping past a leaf
+        X = np.asarray(X, dtype=threshold.dtype)
+        X = np.clip(X, np.finfo(X.dtype).min, np.finfo(X.dtype).max)
+        slow = self.meta['zero_missing'] or np.isnan(X).any()
+
+        leaves = np.empty((len(X), len(self.roots)), dtype=self.columns['value'].dtype)
+        for start in range(0, len(X), self.ROW_CHUNK):
+            self._leaf_values(X[start:start + self.ROW_CHUNK], slow, leaves[start:start + self.ROW_CHUNK])
+        return leaves @ self._tree_output + self.base_margin
+
+    def _leaf_values(self, X: np.ndarray, slow: bool, out: np.ndarray) -> None:
+        """Leaf value of every tree for each row of X, written into out"""
+        n_rows, n_features = X.shape
+        values = X.ravel()
+        row_base = (np.arange(n_rows, dtype=np.int32) * n_features)[:, None]
+
+        feature, threshold, left = self.columns['feature'], self.columns['threshold'], self.columns['left']
+        goes_right_op = np.greater_equal if self.meta['decision'] == 'lt' else np.greater
+
+        # Indices come from the exporter, so take() can skip bounds checks
+        # (mode='clip'), which also lets it write into out= unbuffered
+        idx = np.broadcast_to(self.roots, out.shape).copy()
+        position = np.empty_like(idx)
+        x = np.empty(out.shape, dtype=X.dtype)
+        cut = np.empty_like(x)
+        goes_right = np.empty(out.shape, dtype=bool)
+        for _ in range(self.max_depth):
+            np.take(feature, idx, out=position, mode='clip')
+            position += row_base
+            np.take(values, position, out=x, mode='clip')
+            np.take(threshold, idx, out=cut, mode='clip')
+            if not slow:
+                goes_right_op(x, cut, out=goes_right)
+            else:
+                goes_right = self._goes_right_missing(x, cut, idx, goes_right_op)
+            np.take(left, idx, out=idx, mode='clip')
+            idx += goes_right
+
+        np.take(self.columns['value'], idx, out=out, mode='clip')
+
+    def _goes_right_missing(self, x, cut, idx, goes_right_op) -> np.ndarray:
+        missing = np.take(self.columns['missing'], idx)
+        is_nan = np.isnan(x)
+        # LightGBM treats NaN as 0.0 on splits without a missing direction
+        x = np.where(is_nan & (missing == MISSING_NONE), 0, x)
+        use_default = np.where(missing == MISSING_ZERO, is_nan | (x == 0), is_nan & (missing == MISSING_NAN))
+        with np.errstate(invalid='ignore'):
+            goes_right = goes_right_op(x, cut)
+        return np.where(use_default, ~np.take(self.columns['default_left'], idx), goes_right)
+
+    def _transform(self, margin: np.ndarray) -> np.ndarray:
+        transform = self.meta['transform']
+        if transform == 'sigmoid':
+            return 1.0 / (1.0 + np.exp(-margin))
+        if transform == 'softmax':
+            exp = np.exp(margin - margin.max(axis=1, keepdims=True))
+            return exp / exp.sum(axis=1, keepdims=True)
+        return margin
+
+    def predict_proba(self, X) -> np.ndarray:
+        proba = self._transform(self.raw_margin(X))
+        if proba.shape[1] == 1:
+            return np.column_stack([1 - proba[:, 0], proba[:, 0]])
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        if getattr(self, 'classes_', None) is None:
+            return self._transform(self.raw_margin(X))[:, 0]
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class FlatStandardScaler:
+    """StandardScaler.transform over memory-mapped mean_/scale_ columns"""
+
+    def __init__(self, blob: np.ndarray, meta: Dict[str, Any]):
+        self.blob = blob
+        self.meta = meta
+        columns = unpack_columns(blob, meta['columns'])
+        self.mean_, self.scale_, self.var_ = columns['mean'], columns['scale'], columns['var']
+        self.with_mean = meta['with_mean']
+        self.with_std = meta['with_std']
+        self.n_features_in_ = meta['n_features']
+        self.n_samples_seen_ = meta['n_samples_seen']
+
+    def transform(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if self.with_mean:
+            X = X - self.mean_
+        if self.with_std:
+            X = X / self.scale_
+        return X
+
+    def inverse_transform(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if self.with_std:
+            X = X * self.scale_
+        if self.with_mean:
+            X = X + self.mean_
+        return X
+
+
+FLAT_TYPES = {'trees': FlatTreeEnsemble, 'standard_scaler': FlatStandardScaler}
+
+
+def load_flat_artifact(path: Path) -> Any:
+    """Memory-map <name>.npy read-only and wrap it per its <name>.json sidecar"""
+    path = Path(path)
+    with open(path.with_suffix('.json')) as f:
+        meta = json.load(f)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported flat artifact version {meta.get('format_version')}")
+
+    blob = np.load(path, mmap_mode='r')
+    if 'blob_crc32' in meta and zlib.crc32(blob) != meta['blob_crc32']:
+        raise ValueError(f"{path}: blob does not match its .json sidecar (export in progress?)")
+    return FLAT_TYPES[meta['type']](blob, meta)
+
+
+def file_sha1(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def flat_artifact_current(path: Path) -> bool:
+    """Whether <name>.npy was exported from the <name>.pkl next to it (True if there is none)"""
+    path = Path(path)
+    source = path.with_suffix('.pkl')
+    if not source.exists():
+        return True
+    try:
+        with open(path.with_suffix('.json')) as f:
+            return json.load(f).get('source_sha1') == file_sha1(source)
+    except (OSError, ValueError):
+        return False
+
+
+def mapped_bytes(model: Any) -> int:
+    """Bytes of a model backed by a shared read-only mapping"""
+    blob = getattr(model, 'blob', None)
+    return blob.nbytes if isinstance(blob, np.memmap) else 0
+
+
+def process_memory() -> Dict[str, int]:
+    """Rss / Pss / shared / private bytes of this process (Linux only)"""
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared_clean',
+              'Private_Clean': 'private_clean', 'Private_Dirty': 'private_dirty'}
+    memory = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in fields:
+                    memory[fields[key]] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return memory
+
+
+# ============================================
+# Export
+# ============================================
+# Both flatteners produce per-tree node lists in the library's own numbering:
+# (feature, threshold, left, right, default_left, missing, value), feature -1
+# for leaves. _layout renumbers them for traversal.
+
+def _xgboost_trees(model) -> tuple:
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw('json'))['learner']
+    gbm = learner['gradient_booster']
+    if gbm['name'] != 'gbtree':
+        raise ValueError(f"unsupported XGBoost booster {gbm['name']}")
+
+    trees = gbm['model']['trees']
+    best_iteration = getattr(model, 'best_iteration', None)
+    if best_iteration is not None:
+        per_round = max(1, len(trees) // max(1, booster.num_boosted_rounds()))
+        trees = trees[:(best_iteration + 1) * per_round]
+
+    tree_nodes = []
+    for tree in trees:
+        if any(tree['split_type']):
+            raise ValueError("categorical splits are not supported")
+        nodes = []
+        for i, left in enumerate(tree['left_children']):
+            condition = tree['split_conditions'][i]
+            if left == -1:
+                nodes.append((-1, 0.0, -1, -1, True, MISSING_NAN, condition))
+            else:
+                nodes.append((tree['split_indices'][i], condition, left, tree['right_children'][i],
+                              bool(tree['default_left'][i]), MISSING_NAN, 0.0))
+        tree_nodes.append(nodes)
+
+    objective = learner['objective']['name']
+    meta = {
+        'kind': 'xgboost',
+        'decision': 'lt',
+        'threshold_dtype': '<f4',
+        'objective': objective,
+        'transform': 'softmax' if objective.startswith('multi:') else
+                     'sigmoid' if objective.startswith('binary:') else 'identity',
+        'tree_output': [int(t) for t in gbm['model']['tree_info'][:len(trees)]],
+        'n_outputs': max(1, int(learner['learner_model_param']['num_class']))
+    }
+    return tree_nodes, meta
+
+
+def _lightgbm_trees(model) -> tuple:
+    dump = model.booster_.dump_model()
+
+    def add(nodes, node) -> int:
+        index = len(nodes)
+        nodes.append(None)
+        if 'leaf_value' in node:
+            nodes[index] = (-1, 0.0, -1, -1, True, MISSING_NAN, node['leaf_value'])
+            return index
+        if node['decision_type'] != '<=':
+            raise ValueError(f"unsupported LightGBM split {node['decision_type']}")
+        left = add(nodes, node['left_child'])
+        right = add(nodes, node['right_child'])
+        nodes[index] = (node['split_feature'], node['threshold'], left, right,
+                        bool(node['default_left']), _LIGHTGBM_MISSING[node['missing_type']], 0.0)
+        return index
+
+    tree_nodes = []
+    for tree in dump['tree_info']:
+        nodes = []
+        add(nodes, tree['tree_structure'])
+        tree_nodes.append(nodes)
+
+    objective = dump['objective'].split()[0]
+    n_outputs = max(1, int(dump['num_class']))
+    meta = {
+        'kind': 'lightgbm',
+        'decision': 'le',
+        'threshold_dtype': '<f8',
+        'objective': objective,
+        'transform': 'softmax' if objective.startswith('multiclass') else
+                     'sigmoid' if objective in ('binary', 'cross_entropy') else 'identity',
+        'tree_output': [i % n_outputs for i in range(len(tree_nodes))],
+        'n_outputs': n_outputs
+    }
+    return tree_nodes, meta
+
+
+def _layout(tree_nodes: List[list], threshold_dtype: str) -> tuple:
+    """Renumber trees breadth-first with sibling pairs adjacent and self-looping leaves"""
+    rows, roots, max_depth = [], [], 0
+
+    for nodes in tree_nodes:
+        root = len(rows)
+        roots.append(root)
+        order, depth = [0], {0: 0}
+        position = {0: root}
+        for local in order:
+            feature, _, left, right, *_ = nodes[local]
+            if feature >= 0:
+                for child in (left, right):
+                    position[child] = root + len(order)
+                    depth[child] = depth[local] + 1
+                    order.append(child)
+        max_depth = max(max_depth, max(depth.values()))
+
+        for local in order:
+            feature, threshold, left, _, default_left, missing, value = nodes[local]
+            if feature < 0:
+                rows.append((0, np.inf, position[local], True, MISSING_NAN, value))
+            else:
+                rows.append((feature, threshold, position[left], default_left, missing, 0.0))
+
+    feature, threshold, left, default_left, missing, value = zip(*rows)
+    columns = {
+        'feature': np.array(feature, dtype=np.int32),
+        'threshold': np.array(threshold, dtype=threshold_dtype),
+        'left': np.array(left, dtype=np.int32),
+        'default_left': np.array(default_left, dtype=bool),
+        'missing': np.array(missing, dtype=np.uint8),
+        'value': np.array(value, dtype=np.float64)
+    }
+    return columns, roots, max_depth
+
+
+def _reference_margin(model, X: np.ndarray) -> np.ndarray:
+    if hasattr(model, 'get_booster'):
+        margin = model.predict(X, output_margin=True)
+    else:
+        margin = model.predict(X, raw_score=True)
+    return np.asarray(margin, dtype=np.float64).reshape(len(X), -1)
+
+
+def flatten_trees(model, samples: int = 512, tolerance: float = 1e-4) -> FlatTreeEnsemble:
+    """
+    Convert a fitted XGBoost / LightGBM sklearn model into a FlatTreeEnsemble
+
+    The base margin is recovered against the library's own raw output and the
+    result is checked on random inputs (including NaNs) before it is returned.
+    """
+    if hasattr(model, 'get_booster'):
+        tree_nodes, meta = _xgboost_trees(model)
+    elif hasattr(model, 'booster_'):
+        tree_nodes, meta = _lightgbm_trees(model)
+    else:
+        raise TypeError(f"cannot flatten {type(model).__name__}")
+
+    columns, roots, max_depth = _layout(tree_nodes, meta.pop('threshold_dtype'))
+    blob, layout = pack_columns(columns)
+    n_features = int(model.n_features_in_)
+    meta.update({
+        'type': 'trees',
+        'format_version': FORMAT_VERSION,
+        'estimator': type(model).__name__,
+        'n_features': n_features,
+        'roots': roots,
+        'max_depth': max_depth,
+        'zero_missing': bool((columns['missing'] == MISSING_ZERO).any()),
+        'columns': layout,
+        'classes': model.classes_.tolist() if hasattr(model, 'classes_') else None,
+        'feature_importances': np.asarray(model.feature_importances_, dtype=float).tolist()
+        if hasattr(model, 'feature_importances_') else None,
+        'base_margin': [0.0] * meta['n_outputs']
+    })
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(samples, n_features)) * 3
+    X[rng.random(X.shape) < 0.02] = np.nan
+
+    expected = _reference_margin(model, X)
+    meta['base_margin'] = np.median(expected - FlatTreeEnsemble(blob, meta).raw_margin(X), axis=0).tolist()
+    flat = FlatTreeEnsemble(blob, meta)
+
+    for rows in (X, np.nan_to_num(X)):
+        error = np.abs(flat.raw_margin(rows) - _reference_margin(model, rows)).max()
+        if error > tolerance:
+            raise ValueError(f"flattened {type(model).__name__} differs from the original by {error:.2e}")
+    return flat
+
+
+def flatten_scaler(scaler) -> FlatStandardScaler:
+    if type(scaler).__name__ != 'StandardScaler':
+        raise TypeError(f"cannot flatten {type(scaler).__name__}")
+
+    n_features = int(scaler.n_features_in_)
+    blob, layout = pack_columns({
+        'mean': np.asarray(scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features), dtype=np.float64),
+        'scale': np.asarray(scaler.scale_ if scaler.scale_ is not None else np.ones(n_features), dtype=np.float64),
+        'var': np.asarray(scaler.var_ if scaler.var_ is not None else np.ones(n_features), dtype=np.float64)
+    })
+    return FlatStandardScaler(blob, {
+        'type': 'standard_scaler',
+        'format_version': FORMAT_VERSION,
+        'with_mean': bool(scaler.with_mean),
+        'with_std': bool(scaler.with_std),
+        'n_features': n_features,
+        'n_samples_seen': int(np.max(scaler.n_samples_seen_)),
+        'columns': layout
+    })
+
+
+def save_flat_artifact(flat: Any, path: Path) -> None:
+    """
+    Write <name>.npy and <name>.json next to the pickle at path
+
+    Each file is written to a temp file and renamed into place. The sidecar
+    records the blob's CRC and the source pickle's hash, so a reader that
+    catches the pair mid-replace, or a pickle retrained after the export,
+    is detected instead of served.
+    """
+    path = Path(path)
+    meta = dict(flat.meta, blob_crc32=zlib.crc32(flat.blob))
+    if path.with_suffix('.pkl').exists():
+        meta['source_sha1'] = file_sha1(path.with_suffix('.pkl'))
+
+    npy, sidecar = path.with_suffix('.npy'), path.with_suffix('.json')
+    tmp_npy, tmp_sidecar = npy.with_name(f".{npy.name}.tmp"), sidecar.with_name(f".{sidecar.name}.tmp")
+    try:
+        with open(tmp_npy, 'wb') as f:
+            np.save(f, flat.blob)
+        with open(tmp_sidecar, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_npy, npy)
+        os.replace(tmp_sidecar, sidecar)
+    finally:
+        for tmp in (tmp_npy, tmp_sidecar):
+            tmp.unlink(missing_ok=True)
+
+
+def remove_flat_artifact(path: Path) -> bool:
+    """Delete the .npy/.json pair for path; True if anything was removed"""
+    removed = False
+    for stale in (Path(path).with_suffix('.npy'), Path(path).with_suffix('.json')):
+        if stale.exists():
+            stale.unlink()
+            removed = True
+    return removed
+
+
+def export_flat_artifacts(models_path: Path = MODELS_PATH) -> Dict[str, str]:
+    """
+    Write a flat .npy/.json pair next to every convertible *.pkl
+
+    Returns:
+        {relative pickle path: 'exported' or the reason it was skipped}
+    """
+    try:
+        from .model_registry import load_artifact_file
+    except ImportError:
+        from model_registry import load_artifact_file
+
+    models_path = Path(models_path)
+    results = {}
+    for path in sorted(models_path.rglob('*.pkl')):
+        name = path.relative_to(models_path).as_posix()
+        try:
+            model = load_artifact_file(path)
+            flat = flatten_scaler(model) if type(model).__name__ == 'StandardScaler' else flatten_trees(model)
+            save_flat_artifact(flat, path)
+            results[name] = 'exported'
+            logger.info(f"Exported {name} -> {path.with_suffix('.npy').name}")
+        except Exception as e:
+            results[name] = str(e)
+            # An older export would otherwise keep being served in place of the new pickle
+            if remove_flat_artifact(path):
+                logger.warning(f"Skipped {name}: {e}; removed its stale flat export")
+            else:
+                logger.warning(f"Skipped {name}: {e}")
+    return results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+    if len(sys.argv) < 2 or sys.argv[1] != 'export':
+        print(__doc__)
+        sys.exit(1)
+    for name, result in export_flat_artifacts(Path(sys.argv[2]) if len(sys.argv) > 2 else MODELS_PATH).items():
+        print(f"{name}: {result}")
@@ -0,0 +1,550 @@
+"""
+Model Registry
+Loads every model artifact once per process, warms it up and hands out shared handles
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .lazy_imports import module_available, optional_import
+    from .model_artifacts import flat_artifact_current, load_flat_artifact, mapped_bytes, process_memory
+    from .prop_inference import PropEnsemble, build_prop_features, score_props
+except ImportError:
+    from lazy_imports import module_available, optional_import
+    from model_artifacts import flat_artifact_current, load_flat_artifact, mapped_bytes, process_memory
+    from prop_inference import PropEnsemble, build_prop_features, score_props
+
+logger = logging.getLogger(__name__)
+
+# Imported by load_artifact_file, which runs in the background loader thread
+JOBLIB_AVAILABLE = module_available('joblib')
+TORCH_AVAILABLE = module_available('torch')
+
+MODELS_PATH = Path(__file__).parent.parent / "models"
+WARMUP_ROWS = 8
+
+
+@dataclass
+class ModelHandle:
+    """A loaded artifact shared by every request; treat model as read-only"""
+    name: str
+    path: Path
+    model: Any
+    version: str
+    loaded_at: datetime = field(default_factory=datetime.now)
+    warmup_ms: Optional[float] = None
+    mapped_bytes: int = 0
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'path': str(self.path),
+            'type': type(self.model).__name__,
+            'version': self.version,
+            'loaded_at': self.loaded_at.isoformat(),
+            'warmup_ms': self.warmup_ms,
+            'mapped_bytes': self.mapped_bytes
+        }
+
+
+def load_artifact_file(path: Path) -> Any:
+    """Deserialize one artifact by extension"""
+    if path.suffix == '.npy':
+        return load_flat_artifact(path)
+    if path.suffix == '.pth':
+        if not TORCH_AVAILABLE:
+            raise ImportError("PyTorch is required to load .pth artifacts")
+        return optional_import('torch').load(path, map_location='cpu')
+    if JOBLIB_AVAILABLE:
+        return optional_import('joblib').load(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _freeze(model: Any) -> None:
+    # Fitted parameters (scaler means, coefficients) become read-only so a
+    # handler can't mutate state shared with other requests
+    for value in getattr(model, '__dict__', {}).values():
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+
+
+def _warm_up(model: Any, rows: int = WARMUP_ROWS) -> bool:
+    """Run a synthetic batch through an estimator to trigger lazy initialization"""
+    n_features = getattr(model, 'n_features_in_', None)
+    if n_features is None:
+        return False
+
+    X = np.zeros((rows, n_features))
+    if hasattr(model, 'predict'):
+        model.predict(X)
+    if hasattr(model, 'predict_proba'):
+        model.predict_proba(X)
+    if hasattr(model, 'transform'):
+        model.transform(X)
+    return True
+
+
+class ModelGeneration:
+    """
+    One immutable set of loaded artifacts
+
+    Requests hold a lease on the generation they started with; a retired
+    generation is dropped once its last lease is released.
+    """
+
+    def __init__(self, version: str, fingerprint: str, handles: Dict[str, ModelHandle],
+                 failures: Dict[str, str], prop_ensemble: PropEnsemble):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.handles = handles
+        self.failures = failures
+        self.prop_ensemble = prop_ensemble
+        self.loaded_at = datetime.now()
+        self.retired_at: Optional[datetime] = None
+
+        self.refs = 0
+        self.served = 0
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at.isoformat(),
+            'retired_at': self.retired_at.isoformat() if self.retired_at else None,
+            'in_flight': self.refs,
+            'served': self.served,
+            'prop_ensemble': self.prop_ensemble.version
+        }
+
+
+class GenerationLease:
+    """Pins a generation for the lifetime of a request; usable as a context manager"""
+
+    def __init__(self, registry: 'ModelRegistry', generation: ModelGeneration):
+        self.registry = registry
+        self.generation = generation
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.registry._release(self.generation)
+
+    def __enter__(self) -> ModelGeneration:
+        return self.generation
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of model artifacts under models/
+
+    - start() loads every *.pkl / *.pth once and runs a warm-up batch; a flat
+      <name>.npy export (model_artifacts) is memory-mapped in place of
+      <name>.pkl so workers share one copy through the page cache. Flat
+      trees score small batches faster but large ones slower than the native
+      models; prefer_flat=False (MODEL_FLAT_ARTIFACTS=0) loads the pickles
+    - ready is False until that finishes (readiness), independent of liveness
+    - get(name) returns the shared model, e.g. get('player_props/xgboost_model')
+    - acquire() leases the current generation so a hot reload never swaps
+      models out from under an in-flight request
+    - watch() polls models/ and training_summary.json and reloads in the
+      background when they change
+    - load_artifact(path) memoizes ad-hoc loads by path and mtime
+    """
+
+    PATTERNS = ('*.npy', '*.pkl', '*.pth')
+    SUMMARY_FILE = "training_summary.json"
+
+    def __init__(self, models_path: Path = MODELS_PATH, prefer_flat: bool = True):
+        self.models_path = Path(models_path)
+        self.prefer_flat = prefer_flat
+        self.current: Optional[ModelGeneration] = None
+        self.retired: List[ModelGeneration] = []
+        self.reloads = 0
+        self.reload_failures = 0
+        self.reload_error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.ready_at: Optional[datetime] = None
+        self.start_error: Optional[str] = None
+
+        self._artifact_cache: Dict[str, tuple] = {}
+        self._shared: Dict[str, Any] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._rejected_fingerprint: Optional[str] = None
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self.current is not None
+
+    @property
+    def handles(self) -> Dict[str, ModelHandle]:
+        return self.current.handles if self.current else {}
+
+    @property
+    def failures(self) -> Dict[str, str]:
+        return self.current.failures if self.current else {}
+
+    # --------------------------------------------------------
+    # Loading
+    # --------------------------------------------------------
+
+    def start(self) -> 'ModelRegistry':
+        """Load and warm up every artifact; safe to call more than once"""
+        with self._build_lock:
+            if self.current is None:
+                self.started_at = datetime.now()
+                try:
+                    generation = self._build_generation()
+                except Exception as e:
+                    # Kept for status(); the watcher retries while current is None
+                    self.start_error = f"{type(e).__name__}: {e}"
+                    logger.exception("Model registry failed to start")
+                    raise
+                self._swap(generation)
+                self.start_error = None
+                self.ready_at = datetime.now()
+        return self
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Load a new generation in the calling thread and swap it in atomically
+
+        Returns True if a new generation went live. A generation in which an
+        artifact that is loaded now fails to load is rejected, so a bad
+        export never replaces a working model; that set of files is not
+        retried until it changes again (or force=True).
+        """
+        with self._build_lock:
+            fingerprint = self.fingerprint()
+            if not force and self.current is not None and fingerprint in (
+                    self.current.fingerprint, self._rejected_fingerprint):
+                return False
+
+            try:
+                generation = self._build_generation()
+            except Exception as e:
+                return self._reject(fingerprint, str(e))
+
+            if self.current is not None:
+                regressed = sorted(name for name in generation.failures if name in self.current.handles)
+                if regressed:
+                    return self._reject(fingerprint, f"{', '.join(regressed)} no longer load")
+
+            self._swap(generation)
+            self.reloads += 1
+            self.reload_error = None
+            self._rejected_fingerprint = None
+            return True
+
+    def _reject(self, fingerprint: str, error: str) -> bool:
+        self.reload_failures += 1
+        self.reload_error = error
+        self._rejected_fingerprint = fingerprint
+        logger.error(f"Model reload failed, keeping {self.current.version if self.current else None}: {error}")
+        return False
+
+    def _build_generation(self) -> ModelGeneration:
+        start = time.perf_counter()
+        fingerprint = self.fingerprint()
+        summary_version = self._summary_version()
+
+        handles, failures = self._load_handles(summary_version)
+        prop_ensemble = PropEnsemble.from_artifacts(
+            scaler=self._model(handles, 'player_props/scaler'),
+            xgboost=self._model(handles, 'player_props/xgboost_model'),
+            lstm_checkpoint=self._model(handles, 'player_props/lstm_model')
+        )
+        self._warm_up(handles, prop_ensemble)
+
+        version = f"{summary_version or 'untracked'}#{fingerprint[:8]}"
+        shared = sum(handle.mapped_bytes for handle in handles.values())
+        logger.info(
+            f"Built model generation {version}: {len(handles)} artifacts "
+            f"({shared / 1024:.0f} KB memory-mapped), "
+            f"{len(failures)} failed, {time.perf_counter() - start:.2f}s"
+        )
+        return ModelGeneration(version, fingerprint, handles, failures, prop_ensemble)
+
+    def _load_handles(self, summary_version: Optional[str]):
+        handles: Dict[str, ModelHandle] = {}
+        failures: Dict[str, str] = {}
+
+        for path in self._artifact_paths():
+            name = path.relative_to(self.models_path).with_suffix('').as_posix()
+            if path.suffix == '.npy' and not self.prefer_flat and path.with_suffix('.pkl').exists():
+                path = path.with_suffix('.pkl')
+            elif path.suffix == '.npy' and not flat_artifact_current(path):
+                logger.warning(f"{name}: flat export does not match {path.with_suffix('.pkl').name}, loading the pickle")
+                path = path.with_suffix('.pkl')
+            try:
+                model = load_artifact_file(path)
+            except Exception as e:
+                failures[name] = str(e)
+                logger.warning(f"Could not load {name}: {e}")
+                continue
+
+            _freeze(model)
+            handles[name] = ModelHandle(
+                name=name,
+                path=path,
+                model=model,
+                version=summary_version or datetime.fromtimestamp(path.stat().st_mtime).isoformat(),
+                mapped_bytes=mapped_bytes(model)
+            )
+            logger.info(f"Loaded {name} ({type(model).__name__})")
+
+        return handles, failures
+
+    @staticmethod
+    def _model(handles: Dict[str, ModelHandle], name: str) -> Any:
+        handle = handles.get(name)
+        return handle.model if handle is not None else None
+
+    @staticmethod
+    def _warm_up(handles: Dict[str, ModelHandle], prop_ensemble: PropEnsemble) -> None:
+        for handle in handles.values():
+            start = time.perf_counter()
+            try:
+                if _warm_up(handle.model):
+                    handle.warmup_ms = round((time.perf_counter() - start) * 1000, 2)
+            except Exception as e:
+                logger.warning(f"Warm-up failed for {handle.name}: {e}")
+
+        # The prop ensemble wraps torch modules that have no n_features_in_
+        props = [{'player_name': 'warmup', 'stat_type': stat, 'line': 10.0}
+                 for stat in ('points', 'rebounds', 'assists')]
+        try:
+            score_props(props, build_prop_features(props), prop_ensemble)
+        except Exception as e:
+            logger.warning(f"Warm-up failed for prop ensemble {prop_ensemble.version}: {e}")
+
+    def _artifact_paths(self) -> List[Path]:
+        # One file per artifact name, flat exports first
+        paths = {}
+        for pattern in self.PATTERNS:
+            for path in self.models_path.rglob(pattern):
+                paths.setdefault(path.with_suffix(''), path)
+        return sorted(paths.values())
+
+    def _summary_version(self) -> Optional[str]:
+        try:
+            with open(self.models_path / self.SUMMARY_FILE) as f:
+                return json.load(f).get('timestamp')
+        except (OSError, ValueError):
+            return None
+
+    def fingerprint(self) -> str:
+        """Hash of artifact names, sizes and mtimes plus the training summary"""
+        # Every file, not just the preferred one per name, so a retrained
+        # pickle behind a flat export or a rewritten sidecar still counts
+        paths = {path for pattern in self.PATTERNS + ('*.json',) for path in self.models_path.rglob(pattern)}
+        digest = hashlib.sha1()
+        for path in sorted(paths):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            digest.update(f"{path.relative_to(self.models_path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()
+
+    # --------------------------------------------------------
+    # Generations
+    # --------------------------------------------------------
+
+    def _swap(self, generation: ModelGeneration) -> None:
+        with self._lock:
+            previous = self.current
+            self.current = generation
+
+            if previous is not None:
+                previous.retired_at = datetime.now()
+                if previous.refs > 0:
+                    self.retired.append(previous)
+
+        logger.info(
+            f"Model generation {generation.version} is live"
+            + (f" (replaced {previous.version}, {previous.refs} requests draining)" if previous else "")
+        )
+
+    def acquire(self) -> GenerationLease:
+        """
+        Lease the current generation; release it (or leave the with block) when done
+
+        Raises:
+            RuntimeError: no generation is loaded yet (startup running or failed)
+        """
+        with self._lock:
+            generation = self.current
+            if generation is None:
+                raise RuntimeError(
+                    "Models are not loaded" + (f": {self.start_error}" if self.start_error else "")
+                )
+            generation.refs += 1
+            generation.served += 1
+        return GenerationLease(self, generation)
+
+    def _release(self, generation: ModelGeneration) -> None:
+        with self._lock:
+            generation.refs -= 1
+            if generation.refs == 0 and generation in self.retired:
+                self.retired.remove(generation)
+                logger.info(f"Model generation {generation.version} drained and released")
+
+    # --------------------------------------------------------
+    # Watching
+    # --------------------------------------------------------
+
+    def watch(self, interval: float = 30.0) -> None:
+        """Poll for new artifacts in a daemon thread"""
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=_watch_loop,
+                args=(weakref.ref(self), self._stop, interval),
+                name="model-registry-watcher",
+                daemon=True
+            )
+            self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        self._watcher = None
+
+    # --------------------------------------------------------
+    # Access
+    # --------------------------------------------------------
+
+    def get(self, name: str, default: Any = None) -> Any:
+        handle = self.handles.get(name)
+        return handle.model if handle is not None else default
+
+    @property
+    def prop_ensemble(self) -> PropEnsemble:
+        """Current PropEnsemble; loads the registry on first use if startup hasn't run"""
+        if self.current is None:
+            self.start()
+        return self.current.prop_ensemble
+
+    def load_artifact(self, path, loader: Optional[Callable[[Path], Any]] = None) -> Any:
+        """Load an artifact outside models/ once, reloading only if the file changes"""
+        path = Path(path).resolve()
+        mtime = path.stat().st_mtime
+
+        # Deserialize under a per-path lock so leases and other loads aren't held up
+        with self._key_lock(f"artifact:{path}"):
+            cached = self._artifact_cache.get(str(path))
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+            model = (loader or load_artifact_file)(path)
+            self._artifact_cache[str(path)] = (mtime, model)
+            return model
+
+    def shared(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Process-wide instance of a service object, created on first use"""
+        with self._key_lock(f"shared:{name}"):
+            if name not in self._shared:
+                self._shared[name] = factory()
+            return self._shared[name]
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'ready_at': self.ready_at.isoformat() if self.ready_at else None,
+            'start_error': self.start_error,
+            'models': {name: handle.describe() for name, handle in self.handles.items()},
+            'failed': self.failures,
+            'prop_ensemble': self.current.prop_ensemble.version if self.current else None,
+            'generations': self.generations(),
+            'memory': self.memory()
+        }
+
+    def memory(self) -> Dict[str, Any]:
+        """
+        Memory-mapped artifact bytes and this worker's footprint
+
+        Mapped bytes live in the shared page cache instead of each worker's
+        heap; the pickles they replace approximate the private copy every
+        worker would otherwise hold. pss splits shared pages across workers.
+        """
+        mapped = [handle for handle in self.handles.values() if handle.mapped_bytes]
+        replaced = [handle.path.with_suffix('.pkl') for handle in mapped]
+        return {
+            'mapped_artifacts': len(mapped),
+            'mapped_bytes': sum(handle.mapped_bytes for handle in mapped),
+            'saved_per_worker_bytes': sum(path.stat().st_size for path in replaced if path.exists()),
+            'process': process_memory()
+        }
+
+    def generations(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'current': self.current.describe() if self.current else None,
+                'draining': [generation.describe() for generation in self.retired],
+                'reloads': self.reloads,
+                'reload_failures': self.reload_failures,
+                'last_reload_error': self.reload_error
+            }
+
+    def names(self) -> List[str]:
+        return sorted(self.handles)
+
+
+def _watch_loop(registry_ref, stop: threading.Event, interval: float) -> None:
+    pending = None
+
+    while not stop.wait(interval):
+        registry = registry_ref()
+        if registry is None:
+            return
+
+        try:
+            if registry.current is None:
+                # Retry a failed startup; an in-progress one has no error yet
+                if registry.start_error is not None:
+                    registry.start()
+                continue
+
+            fingerprint = registry.fingerprint()
+            if fingerprint == registry.current.fingerprint:
+                pending = None
+            elif fingerprint != pending:
+                # Wait one more poll so half-written artifacts settle before loading
+                pending = fingerprint
+            else:
+                pending = None
+                registry.reload()
+        except Exception as e:
+            logger.error(f"Model watcher failed: {e}")
+        finally:
+            del registry
+
+
+# Export singleton
+model_registry = ModelRegistry(prefer_flat=os.getenv('MODEL_FLAT_ARTIFACTS', '1') != '0')
@@ -14,6 +14,11 @@ import joblib
 import json
 from datetime import datetime, timedelta
 
+try:
+    from .model_registry import model_registry
+except ImportError:
+    from model_registry import model_registry
+
 class NBAGamePredictionModel:
     def __init__(self):
         self.model_spread = None
@@ -312,10 +317,11 @@ class NBAGamePredictionModel:
         """
         Load trained models
         """
-        self.model_spread = joblib.load(f'{path}/spread_model.pkl')
-        self.model_total = joblib.load(f'{path}/total_model.pkl')
-        self.model_winner = joblib.load(f'{path}/winner_model.pkl')
-        self.scaler = joblib.load(f'{path}/scaler.pkl')
+        # Served from the process-wide registry; disk is only read when a file changes
+        self.model_spread = model_registry.load_artifact(f'{path}/spread_model.pkl')
+        self.model_total = model_registry.load_artifact(f'{path}/total_model.pkl')
+        self.model_winner = model_registry.load_artifact(f'{path}/winner_model.pkl')
+        self.scaler = model_registry.load_artifact(f'{path}/scaler.pkl')
         
         with open(f'{path}/metadata.json', 'r') as f:
             metadata = json.load(f)
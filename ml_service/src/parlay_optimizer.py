@@ -11,14 +11,148 @@ import numpy as np
 import pandas as pd
 from itertools import combinations
 from scipy.stats import norm
+import heapq
+import math
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+class CorrelationIndex:
+    """
+    Pairwise leg correlations for one slate, built once
+    
+    Each leg maps to an integer position; correlations are held in a dense
+    float32 matrix using the same rules as ParlayOptimizer.get_correlation
+    (pair order follows the slate order).
+    """
+    
+    SAME_SLATE_CORRELATION = 0.05
+    
+    def __init__(self, bets, pair_correlations):
+        self.bets = list(bets)
+        self.win_prob = np.array([bet['win_probability'] for bet in self.bets], dtype=float)
+        odds = np.array([bet['odds'] for bet in self.bets], dtype=float)
+        self.decimal_odds = np.where(odds > 0, odds / 100 + 1, 100 / np.abs(odds) + 1)
+        self._positions = {id(bet): i for i, bet in enumerate(self.bets)}
+        self.matrix = self._build_matrix(pair_correlations)
+        # Python rows for O(k) incremental updates on small parlays
+        self.rows = self.matrix.astype(float).tolist()
+    
+    def _build_matrix(self, pair_correlations):
+        n_bets = len(self.bets)
+        
+        game_codes = pd.factorize(pd.Series([bet['game_id'] for bet in self.bets], dtype=object))[0]
+        date_codes = pd.factorize(pd.Series([bet.get('date') for bet in self.bets], dtype=object), use_na_sentinel=False)[0]
+        type_codes, bet_types = pd.factorize(pd.Series([bet['bet_type'] for bet in self.bets], dtype=object))
+        
+        type_table = np.zeros((len(bet_types), len(bet_types)), dtype=np.float32)
+        for (type1, type2), corr in pair_correlations.items():
+            if type1 in bet_types and type2 in bet_types:
+                type_table[bet_types.get_loc(type1), bet_types.get_loc(type2)] = corr
+        
+        same_game = game_codes[:, None] == game_codes[None, :]
+        same_date = date_codes[:, None] == date_codes[None, :]
+        
+        matrix = np.where(
+            same_game,
+            type_table[type_codes[:, None], type_codes[None, :]],
+            np.where(same_date, self.SAME_SLATE_CORRELATION, 0.0)
+        ).astype(np.float32)
+        
+        # Pairs are defined for i < j in slate order; mirror the upper triangle
+        upper = np.triu(matrix, 1)
+        matrix = upper + upper.T
+        
+        return matrix if n_bets else np.zeros((0, 0), dtype=np.float32)
+    
+    def indices(self, bets):
+        """
+        Integer positions of legs from this slate
+        """
+        return [self._positions[id(bet)] for bet in bets]
+    
+    def average_correlation(self, legs):
+        """
+        Mean pairwise correlation over leg positions
+        """
+        legs = np.asarray(legs, dtype=np.intp)
+        if len(legs) < 2:
+            return 0.0
+        block = self.matrix[np.ix_(legs, legs)]
+        return float(np.triu(block, 1).sum() / (len(legs) * (len(legs) - 1) / 2))
+    
+    def parlay(self, legs=()):
+        """
+        Incremental parlay state starting from the given leg positions
+        """
+        parlay = ParlayAccumulator(self)
+        for leg in legs:
+            parlay.add(leg)
+        return parlay
+
+
+class ParlayAccumulator:
+    """
+    Running probability product and correlation sum for a parlay
+    
+    Adding or removing one leg costs O(k) instead of recomputing all pairs.
+    """
+    
+    def __init__(self, index):
+        self.index = index
+        self.legs = []
+        self.prob_product = 1.0
+        self.decimal_product = 1.0
+        self.corr_sum = 0.0
+    
+    def add(self, leg):
+        row = self.index.rows[leg]
+        self.corr_sum += sum(row[other] for other in self.legs)
+        self.prob_product *= self.index.win_prob[leg]
+        self.decimal_product *= self.index.decimal_odds[leg]
+        self.legs.append(leg)
+        return self
+    
+    def remove(self, leg):
+        self.legs.remove(leg)
+        row = self.index.rows[leg]
+        self.corr_sum -= sum(row[other] for other in self.legs)
+        self.decimal_product /= self.index.decimal_odds[leg]
+        
+        if self.index.win_prob[leg] > 0:
+            self.prob_product /= self.index.win_prob[leg]
+        else:
+            self.prob_product = float(np.prod(self.index.win_prob[self.legs]))
+        return self
+    
+    @property
+    def average_correlation(self):
+        n_pairs = len(self.legs) * (len(self.legs) - 1) / 2
+        return self.corr_sum / n_pairs if n_pairs else 0.0
+    
+    @property
+    def probability(self):
+        """
+        Same adjustment as ParlayOptimizer.calculate_parlay_probability
+        """
+        if not self.legs:
+            return 0.0
+        return min(self.prob_product * (1 + self.average_correlation * 0.5), 0.95)
+    
+    @property
+    def expected_value(self):
+        """
+        EV of a 100 unit stake
+        """
+        return 100 * (self.probability * self.decimal_product - 1)
+
+
 class ParlayOptimizer:
     def __init__(self, max_legs=10, min_legs=2):
         self.max_legs = max_legs
         self.min_legs = min_legs
+        self.last_search_stats = {}
         
         # Correlation matrix for common bet types
         # Positive correlation = bets likely to hit together
@@ -45,7 +179,7 @@ class ParlayOptimizer:
             decimal_odds.append(decimal)
         
         # Parlay odds = product of all decimal odds
-        parlay_decimal = np.prod(decimal_odds)
+        parlay_decimal = math.prod(decimal_odds)
         
         # Convert back to American
         if parlay_decimal >= 2.0:
@@ -105,13 +239,22 @@ class ParlayOptimizer:
         
         return 0.0
     
-    def calculate_parlay_probability(self, bets):
+    def build_correlation_index(self, bets):
+        """
+        Build a CorrelationIndex for a slate of candidate legs
+        """
+        return CorrelationIndex(bets, self.correlation_matrix)
+    
+    def calculate_parlay_probability(self, bets, correlation_index=None):
         """
         Calculate probability of parlay hitting accounting for correlations
         """
         if len(bets) == 0:
             return 0.0
         
+        if correlation_index is not None:
+            return correlation_index.parlay(correlation_index.indices(bets)).probability
+        
         # Start with independent probability
         independent_prob = np.prod([bet['win_probability'] for bet in bets])
         
@@ -133,71 +276,104 @@ class ParlayOptimizer:
         
         return min(adjusted_prob, 0.95)  # Cap at 95%
     
-    def optimize_parlay(self, available_bets, target_legs=None, min_ev=0, max_risk=1000):
+    def optimize_parlay(self, available_bets, target_legs=None, min_ev=0, max_risk=1000,
+                        top_n=20, time_budget=None, beam_width=None, correlation_index=None):
         """
-        Find optimal parlay combination
+        Find optimal parlay combinations
+        
+        Branch-and-bound search over leg subsets, ranked by EV * Sharpe ratio.
+        Legs are explored in order of decreasing edge (win probability * decimal
+        odds) and a subtree is pruned when an upper bound on the score of any
+        parlay it can still produce cannot beat the current top_n.
+        
+        Args:
+            available_bets: Candidate legs with 'odds', 'win_probability',
+                'game_id', 'bet_type' and optional 'date'
+            target_legs: Exact number of legs (default: min_legs..max_legs)
+            min_ev: Minimum EV per 100 staked
+            max_risk: Bankroll used for Kelly stake sizing
+            top_n: Number of parlays to return
+            time_budget: Seconds before returning the best parlays found so far
+            beam_width: If set, keep only this many partial parlays per depth
+                (approximate, much faster on very large slates)
+            correlation_index: Prebuilt CorrelationIndex for available_bets
         """
         logger.info(f"Optimizing parlay from {len(available_bets)} available bets")
         
+        n_bets = len(available_bets)
         if target_legs is None:
-            target_legs = range(self.min_legs, min(self.max_legs, len(available_bets)) + 1)
+            sizes = range(self.min_legs, min(self.max_legs, n_bets) + 1)
         else:
-            target_legs = [target_legs]
-        
-        best_parlays = []
-        
-        for num_legs in target_legs:
-            # Generate all combinations
-            for combo in combinations(available_bets, num_legs):
-                parlay = list(combo)
-                
-                # Calculate parlay odds
-                individual_odds = [bet['odds'] for bet in parlay]
-                parlay_odds, parlay_decimal = self.calculate_parlay_odds(individual_odds)
-                
-                # Calculate probability
-                parlay_prob = self.calculate_parlay_probability(parlay)
-                
-                # Calculate EV
-                stake = 100  # Standard unit
-                parlay_ev = self.calculate_ev(stake, parlay_odds, parlay_prob)
-                
-                # Skip if below minimum EV
-                if parlay_ev < min_ev:
-                    continue
-                
-                # Calculate Kelly Criterion stake
-                kelly_fraction = self.calculate_kelly(parlay_odds, parlay_prob)
-                optimal_stake = kelly_fraction * max_risk
-                
-                # Calculate metrics
-                roi = (parlay_ev / stake) * 100
-                
-                # Risk-adjusted score
-                variance = parlay_prob * (1 - parlay_prob)
-                sharpe_ratio = parlay_ev / np.sqrt(variance * stake) if variance > 0 else 0
-                
-                parlay_result = {
-                    'legs': parlay,
-                    'num_legs': num_legs,
-                    'odds': parlay_odds,
-                    'decimal_odds': parlay_decimal,
-                    'probability': parlay_prob,
-                    'expected_value': parlay_ev,
-                    'roi': roi,
-                    'kelly_stake': optimal_stake,
-                    'sharpe_ratio': sharpe_ratio,
-                    'score': parlay_ev * sharpe_ratio  # Combined score
-                }
-                
-                best_parlays.append(parlay_result)
-        
-        # Sort by score (EV * Sharpe ratio)
-        best_parlays.sort(key=lambda x: x['score'], reverse=True)
-        
-        logger.info(f"Found {len(best_parlays)} viable parlays")
-        
-        return best_parlays[:20]  # Return top 20
+            sizes = [target_legs] if target_legs <= n_bets else []
+        
+        if n_bets == 0 or not sizes:
+            self.last_search_stats = {'nodes': 0, 'complete': True, 'mode': 'exact'}
+            return []
+        
+        if correlation_index is None:
+            correlation_index = self.build_correlation_index(available_bets)
+        
+        search = _ParlaySearch(self, available_bets, correlation_index, min(sizes), max(sizes),
+                               min_ev, top_n, time_budget)
+        
+        if beam_width:
+            search.run_beam(beam_width)
+        else:
+            search.run()
+        
+        self.last_search_stats = {
+            'nodes': search.nodes,
+            'complete': search.complete,
+            'mode': 'beam' if beam_width else 'exact'
+        }
+        
+        best_parlays = [
+            self._build_parlay_result(
+                [available_bets[i] for i in sorted(search.order[list(legs)])],
+                prob, max_risk
+            )
+            for _, _, legs, prob in sorted(search.heap, reverse=True)
+        ]
+        
+        logger.info(f"Found {len(best_parlays)} viable parlays ({search.nodes} nodes searched)")
+        
+        return best_parlays
+    
+    def _build_parlay_result(self, parlay, parlay_prob, max_risk):
+        """
+        Full metrics for a selected parlay
+        """
+        # Calculate parlay odds
+        individual_odds = [bet['odds'] for bet in parlay]
+        parlay_odds, parlay_decimal = self.calculate_parlay_odds(individual_odds)
+        
+        # Calculate EV
+        stake = 100  # Standard unit
+        parlay_ev = self.calculate_ev(stake, parlay_odds, parlay_prob)
+        
+        # Calculate Kelly Criterion stake
+        kelly_fraction = self.calculate_kelly(parlay_odds, parlay_prob)
+        optimal_stake = kelly_fraction * max_risk
+        
+        # Calculate metrics
+        roi = (parlay_ev / stake) * 100
+        
+        # Risk-adjusted score
+        variance = parlay_prob * (1 - parlay_prob)
+        sharpe_ratio = parlay_ev / np.sqrt(variance * stake) if variance > 0 else 0
+        
+        return {
+            'legs': parlay,
+            'num_legs': len(parlay),
+            'odds': parlay_odds,
+            'decimal_odds': parlay_decimal,
+            'probability': parlay_prob,
+            'expected_value': parlay_ev,
+            'roi': roi,
+            'kelly_stake': optimal_stake,
+            'sharpe_ratio': sharpe_ratio,
+            'score': parlay_ev * sharpe_ratio  # Combined score
+        }
     
     def calculate_kelly(self, odds, win_probability):
         """
@@ -214,7 +390,7 @@ class ParlayOptimizer:
         # Use fractional Kelly (25%) for safety
         return max(0, kelly * 0.25)
     
-    def generate_round_robin(self, bets, ways):
+    def generate_round_robin(self, bets, ways, correlation_index=None):
         """
         Generate round robin combinations
         Example: 5 team round robin by 3s creates all 3-leg parlays
@@ -224,12 +400,28 @@ class ParlayOptimizer:
         if ways > len(bets):
             return []
         
+        index = correlation_index or self.build_correlation_index(bets)
+        positions = index.indices(bets)
+        parlay = index.parlay()
         round_robin_parlays = []
         
-        for combo in combinations(bets, ways):
-            parlay = self.optimize_parlay(list(combo), target_legs=ways)
-            if parlay:
-                round_robin_parlays.append(parlay[0])
+        # Depth-first over combinations, adding/removing one leg at a time
+        def visit(start):
+            if len(parlay.legs) == ways:
+                # Cheap EV check before building the full result
+                if parlay.expected_value >= -1e-9:
+                    legs = [index.bets[i] for i in parlay.legs]
+                    result = self._build_parlay_result(legs, parlay.probability, max_risk=1000)
+                    if result['expected_value'] >= 0:
+                        round_robin_parlays.append(result)
+                return
+            
+            for i in range(start, len(positions) - (ways - len(parlay.legs)) + 1):
+                parlay.add(positions[i])
+                visit(i + 1)
+                parlay.remove(positions[i])
+        
+        visit(0)
         
         return round_robin_parlays
     
@@ -268,14 +460,16 @@ class ParlayOptimizer:
             logger.warning(f"Conflicting bets detected: {conflicts}")
         
         # Calculate enhanced correlation
-        sgp_correlation = self._calculate_sgp_correlation(game_bets)
+        index = self.build_correlation_index(game_bets)
+        sgp_correlation = self._calculate_sgp_correlation(game_bets, index)
         
         # Adjust probabilities
         for bet in game_bets:
             bet['win_probability'] *= (1 - sgp_correlation * 0.3)
+        index.win_prob *= (1 - sgp_correlation * 0.3)
         
         # Optimize
-        optimal = self.optimize_parlay(game_bets)
+        optimal = self.optimize_parlay(game_bets, correlation_index=index)
         
         return {
             'optimal_parlay': optimal[0] if optimal else None,
@@ -299,21 +493,200 @@ class ParlayOptimizer:
         
         return conflicts
     
-    def _calculate_sgp_correlation(self, bets):
+    def _calculate_sgp_correlation(self, bets, correlation_index=None):
         """
         Calculate overall correlation for same-game parlay
         """
         if len(bets) < 2:
             return 0.0
         
-        correlations = []
+        index = correlation_index or self.build_correlation_index(bets)
+        return index.average_correlation(index.indices(bets))
+
+class _ParlaySearch:
+    """
+    Branch-and-bound state for ParlayOptimizer.optimize_parlay
+    
+    For a parlay with hit probability p and decimal odds D (100 unit stake),
+    EV = 100 * (p * D - 1) and score = EV * Sharpe = 1000 * (p * D - 1)^2 / sqrt(p * (1 - p)).
+    Adding legs multiplies p * D by each leg's edge (p_j * d_j), so the best
+    reachable numerator uses the highest remaining edges; the denominator is
+    bounded by the extreme probabilities reachable from the partial parlay.
+    """
+    
+    CHECK_EVERY = 64
+    
+    def __init__(self, optimizer, bets, correlation_index, min_size, max_size, min_ev, top_n, time_budget):
+        win_prob = np.array([bet['win_probability'] for bet in bets], dtype=float)
+        decimal = np.array([optimizer.calculate_parlay_odds([bet['odds']])[1] for bet in bets], dtype=float)
+        
+        # Explore legs from highest to lowest edge
+        self.order = np.argsort(-(win_prob * decimal), kind='stable')
+        self.win_prob = win_prob[self.order]
+        self.decimal = decimal[self.order]
+        self.edge = self.win_prob * self.decimal
+        positions = np.asarray(correlation_index.indices(bets), dtype=np.intp)[self.order]
+        self.corr = correlation_index.matrix[np.ix_(positions, positions)].astype(float)
+        
+        off_diag = self.corr[np.triu_indices(len(bets), 1)]
+        self.corr_max = off_diag.max() if len(off_diag) else 0.0
+        self.corr_min = off_diag.min() if len(off_diag) else 0.0
+        
+        # Prefix sums of log edges give the product of any run of consecutive edges
+        self.log_edge_cumsum = np.concatenate(([0.0], np.cumsum(np.log(np.maximum(self.edge, 1e-300)))))
+        
+        # Smallest-probability products for bounding how far p can fall
+        self.low_prob_prod = np.concatenate(([1.0], np.cumprod(np.sort(self.win_prob))))
+        
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_ev = min_ev
+        self.top_n = top_n
+        self.deadline = time.perf_counter() + time_budget if time_budget else None
+        
+        self.heap = []
+        self.nodes = 0
+        self.complete = True
+        self._counter = 0
+    
+    def threshold(self):
+        return self.heap[0][0] if len(self.heap) >= self.top_n else -np.inf
+    
+    def probability(self, size, prob_product, corr_sum):
+        n_pairs = size * (size - 1) / 2
+        avg_corr = corr_sum / n_pairs if n_pairs else 0
+        return min(prob_product * (1 + avg_corr * 0.5), 0.95)
+    
+    def score(self, prob, decimal_product):
+        variance = prob * (1 - prob)
+        if variance <= 0:
+            return 0.0
+        return 1000 * (prob * decimal_product - 1) ** 2 / np.sqrt(variance)
+    
+    def offer(self, legs, prob_product, decimal_product, corr_sum):
+        """
+        Score a complete parlay and keep it if it makes the top_n
+        """
+        prob = self.probability(len(legs), prob_product, corr_sum)
+        ev = 100 * (prob * decimal_product - 1)
+        if ev < self.min_ev:
+            return
+        
+        score = self.score(prob, decimal_product)
+        if score <= self.threshold():
+            return
+        
+        self._counter += 1
+        entry = (score, self._counter, tuple(legs), prob)
+        if len(self.heap) < self.top_n:
+            heapq.heappush(self.heap, entry)
+        else:
+            heapq.heapreplace(self.heap, entry)
+    
+    def child_bounds(self, legs, prob_product, decimal_product, corr_sum):
+        """
+        Running state and score upper bound for every child of a partial parlay
         
-        for i in range(len(bets)):
-            for j in range(i + 1, len(bets)):
-                corr = self.get_correlation(bets[i], bets[j])
-                correlations.append(corr)
+        A child adds one later leg j; the bound covers every parlay that
+        extends the child with legs after j.
+        """
+        children = np.arange(legs[-1] + 1, len(self.edge))
+        child_prob = prob_product * self.win_prob[children]
+        child_decimal = decimal_product * self.decimal[children]
+        child_corr = corr_sum + self.corr[np.ix_(children, legs)].sum(axis=1)
+        
+        size = len(legs) + 1
+        bounds = np.full(len(children), -np.inf)
+        
+        for final_size in range(max(size, self.min_size), self.max_size + 1):
+            extra = final_size - size
+            valid = children + extra < len(self.edge)
+            if not valid.any():
+                break
+            
+            n_pairs = final_size * (final_size - 1) / 2
+            new_pairs = n_pairs - size * (size - 1) / 2
+            corr_hi = 1 + 0.5 * (child_corr + new_pairs * self.corr_max) / n_pairs if n_pairs else 1
+            corr_lo = 1 + 0.5 * (child_corr + new_pairs * self.corr_min) / n_pairs if n_pairs else 1
+            
+            # Best p * D: the next `extra` edges after each child are the largest ones left
+            ends = np.minimum(children + 1 + extra, len(self.edge))
+            best_edges = np.exp(self.log_edge_cumsum[ends] - self.log_edge_cumsum[children + 1])
+            edge_hi = child_prob * child_decimal * best_edges * corr_hi
+            
+            numerator = np.maximum(edge_hi - 1, 0 if self.min_ev >= 0 else 1)
+            
+            p_hi = np.minimum(child_prob * corr_hi, 0.95)
+            p_lo = np.minimum(child_prob * self.low_prob_prod[extra] * corr_lo, 0.95)
+            min_variance = np.minimum(p_hi * (1 - p_hi), p_lo * (1 - p_lo))
+            
+            with np.errstate(divide='ignore'):
+                bound = np.where(min_variance > 0, 1000 * numerator ** 2 / np.sqrt(np.maximum(min_variance, 0)), np.inf)
+            
+            reachable = valid & (100 * (edge_hi - 1) >= self.min_ev)
+            bounds = np.where(reachable, np.maximum(bounds, bound), bounds)
+        
+        return children, child_prob, child_decimal, child_corr, bounds
+    
+    def out_of_time(self):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % self.CHECK_EVERY == 0 and time.perf_counter() > self.deadline:
+            self.complete = False
+        return not self.complete
+    
+    def run(self):
+        for leg in range(len(self.edge)):
+            if not self.complete:
+                break
+            self._descend([leg], self.win_prob[leg], self.decimal[leg], 0.0)
+    
+    def _descend(self, legs, prob_product, decimal_product, corr_sum):
+        if self.out_of_time():
+            return
+        
+        if len(legs) >= self.min_size:
+            self.offer(legs, prob_product, decimal_product, corr_sum)
+        
+        if len(legs) >= self.max_size or legs[-1] + 1 >= len(self.edge):
+            return
         
-        return np.mean(correlations) if correlations else 0.0
+        children, probs, decimals, corrs, bounds = self.child_bounds(legs, prob_product, decimal_product, corr_sum)
+        
+        for idx in np.flatnonzero(bounds > self.threshold()):
+            # Threshold rises as the heap fills, so re-check before descending
+            if bounds[idx] > self.threshold():
+                self._descend(legs + [int(children[idx])], probs[idx], decimals[idx], corrs[idx])
+            if not self.complete:
+                return
+    
+    def run_beam(self, beam_width):
+        """
+        Level-by-level search keeping the beam_width most promising partial parlays
+        """
+        beam = [([leg], self.win_prob[leg], self.decimal[leg], 0.0) for leg in range(len(self.edge))]
+        
+        for size in range(1, self.max_size + 1):
+            if size >= self.min_size:
+                for node in beam:
+                    self.offer(*node)
+            if size == self.max_size:
+                break
+            
+            candidates = []
+            for legs, *state in beam:
+                if self.out_of_time():
+                    break
+                if legs[-1] + 1 >= len(self.edge):
+                    continue
+                children, probs, decimals, corrs, bounds = self.child_bounds(legs, *state)
+                for idx in np.flatnonzero(bounds > self.threshold()):
+                    candidates.append((bounds[idx], legs + [int(children[idx])], probs[idx], decimals[idx], corrs[idx]))
+            
+            top = heapq.nlargest(beam_width, candidates, key=lambda c: c[0])
+            beam = [node[1:] for node in top]
+            
+            if not beam or not self.complete:
+                break
 
 # Export singleton
 parlay_optimizer = ParlayOptimizer()
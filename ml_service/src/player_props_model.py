@@ -16,6 +16,11 @@ import joblib
 import json
 from datetime import datetime
 
+try:
+    from .model_registry import model_registry
+except ImportError:
+    from model_registry import model_registry
+
 class PlayerPropsDataset(Dataset):
     """Custom dataset for player props"""
     def __init__(self, X, y):
@@ -382,13 +387,16 @@ class PlayerPropsPredictor:
         self.feature_columns = metadata['feature_columns']
         self.sequence_length = metadata['sequence_length']
         
-        # Load scaler
-        self.scaler = joblib.load(f'{model_dir}/scaler.pkl')
+        # Load scaler (shared through the registry; disk is only read when the file changes)
+        self.scaler = model_registry.load_artifact(f'{model_dir}/scaler.pkl')
         
         # Initialize and load model
         input_size = len(self.feature_columns)
         self.model = PlayerPropsModel(input_size).to(self.device)
-        self.model.load_state_dict(torch.load(f'{model_dir}/model.pth', map_location=self.device))
+        state_dict = model_registry.load_artifact(
+            f'{model_dir}/model.pth', loader=lambda p: torch.load(p, map_location='cpu')
+        )
+        self.model.load_state_dict(state_dict)
         self.model.eval()
         
         print(f"Model loaded from {model_dir}")
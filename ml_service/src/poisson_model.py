@@ -4,14 +4,124 @@ Statistical models for predicting game scores and totals
 """
 
 import numpy as np
-from scipy.stats import poisson, skellam
+from scipy.stats import poisson
 import pandas as pd
+from functools import lru_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Lambdas are rounded to this many decimals before hitting the distribution cache
+LAMBDA_PRECISION = 2
+
+
+class ScoreDistribution:
+    """
+    Precomputed score, margin and total distributions for one matchup
+    
+    PMFs are built once; every spread/total probability is then a CDF lookup.
+    Arrays are read-only because instances are shared through the LRU cache.
+    """
+    
+    def __init__(self, lambda1, lambda2, max_score):
+        self.lambda1 = lambda1
+        self.lambda2 = lambda2
+        self.max_score = max_score
+        
+        self.scores = np.arange(0, max_score + 1)
+        self.team1_pmf = poisson.pmf(self.scores, lambda1)
+        self.team2_pmf = poisson.pmf(self.scores, lambda2)
+        
+        # Margin (team1 - team2) runs from -max_score to +max_score
+        self.margin_pmf = np.convolve(self.team1_pmf, self.team2_pmf[::-1])
+        # Total runs from 0 to 2 * max_score
+        self.total_pmf = np.convolve(self.team1_pmf, self.team2_pmf)
+        
+        # CDFs carry a leading zero so P(X <= k) = cdf[k - min_value + 1]
+        self.team1_cdf = self._cdf(self.team1_pmf)
+        self.team2_cdf = self._cdf(self.team2_pmf)
+        self.margin_cdf = self._cdf(self.margin_pmf)
+        self.total_cdf = self._cdf(self.total_pmf)
+        
+        for array in (self.scores, self.team1_pmf, self.team2_pmf, self.margin_pmf, self.total_pmf,
+                      self.team1_cdf, self.team2_cdf, self.margin_cdf, self.total_cdf):
+            array.setflags(write=False)
+        
+        self._team_dists = {}
+    
+    @staticmethod
+    def _cdf(pmf):
+        return np.concatenate(([0.0], np.cumsum(pmf)))
+    
+    @staticmethod
+    def _prob_greater(cdf, min_value, lines):
+        """
+        P(X > line) for scalar or array lines
+        """
+        idx = np.floor(np.asarray(lines, dtype=float)).astype(int) - min_value + 1
+        return 1.0 - cdf[np.clip(idx, 0, len(cdf) - 1)]
+    
+    def win_probability(self):
+        """
+        P(team1 score > team2 score)
+        """
+        return float(self._prob_greater(self.margin_cdf, -self.max_score, 0))
+    
+    def cover_probability(self, spread):
+        """
+        P(team1 - team2 > spread); accepts a scalar or an array of alt lines
+        """
+        prob = self._prob_greater(self.margin_cdf, -self.max_score, spread)
+        return float(prob) if np.ndim(prob) == 0 else prob
+    
+    def over_probability(self, total_line):
+        """
+        P(team1 + team2 > total_line); accepts a scalar or an array of alt lines
+        """
+        prob = self._prob_greater(self.total_cdf, 0, total_line)
+        return float(prob) if np.ndim(prob) == 0 else prob
+    
+    def team_distribution(self, team=1):
+        """
+        Serializable per-team score distribution, converted to lists once per instance
+        """
+        if team not in self._team_dists:
+            pmf = self.team1_pmf if team == 1 else self.team2_pmf
+            lambda_param = self.lambda1 if team == 1 else self.lambda2
+            self._team_dists[team] = {
+                'scores': tuple(self.scores.tolist()),
+                'probabilities': tuple(pmf.tolist()),
+                'mean': lambda_param,
+                'std': float(np.sqrt(lambda_param))
+            }
+        
+        return dict(self._team_dists[team])
+
+
+@lru_cache(maxsize=1024)
+def _cached_score_distribution(lambda1, lambda2, max_score):
+    return ScoreDistribution(lambda1, lambda2, max_score)
+
+
+def get_score_distribution(lambda1, lambda2, max_score=200):
+    """
+    Shared ScoreDistribution keyed by the rounded lambda pair
+    """
+    return _cached_score_distribution(
+        round(float(lambda1), LAMBDA_PRECISION),
+        round(float(lambda2), LAMBDA_PRECISION),
+        int(max_score)
+    )
+
+
+# Quantiles reported by simulate_game / simulate_slate
+SIMULATION_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
 class PoissonModel:
-    def __init__(self):
+    def __init__(self, random_state=None):
+        # Reused across simulations; seed for reproducible runs
+        self.rng = np.random.default_rng(random_state)
         self.league_avg_scoring = {
             'nba': 110.0,  # Points per team per game
             'nfl': 23.0,
@@ -31,19 +141,14 @@ class PoissonModel:
         logger.info(f"Predicting {league} game score")
         
         # Calculate expected scoring rates
-        team1_lambda = self._calculate_lambda(team1_stats, team2_stats, league, is_home=True)
-        team2_lambda = self._calculate_lambda(team2_stats, team1_stats, league, is_home=False)
+        team1_lambda, team2_lambda = self._matchup_lambdas(team1_stats, team2_stats, league)
         
         # Most likely scores
         team1_score = int(team1_lambda)
         team2_score = int(team2_lambda)
         
         # Probability distributions
-        team1_dist = self._generate_score_distribution(team1_lambda, max_score=200 if league == 'nba' else 60)
-        team2_dist = self._generate_score_distribution(team2_lambda, max_score=200 if league == 'nba' else 60)
-        
-        # Calculate probabilities
-        win_probability = self._calculate_win_probability(team1_lambda, team2_lambda)
+        distribution = get_score_distribution(team1_lambda, team2_lambda, self._max_score(league))
         
         return {
             'team1_predicted_score': team1_score,
@@ -51,12 +156,27 @@ class PoissonModel:
             'team1_lambda': team1_lambda,
             'team2_lambda': team2_lambda,
             'total_predicted': team1_score + team2_score,
-            'team1_win_probability': win_probability,
-            'team2_win_probability': 1 - win_probability,
-            'team1_score_distribution': team1_dist,
-            'team2_score_distribution': team2_dist
+            'team1_win_probability': distribution.win_probability(),
+            'team2_win_probability': 1 - distribution.win_probability(),
+            'team1_score_distribution': distribution.team_distribution(1),
+            'team2_score_distribution': distribution.team_distribution(2)
         }
     
+    def score_distribution(self, team1_stats, team2_stats, league='nba'):
+        """
+        Cached ScoreDistribution for a matchup (team1 at home)
+        """
+        team1_lambda, team2_lambda = self._matchup_lambdas(team1_stats, team2_stats, league)
+        return get_score_distribution(team1_lambda, team2_lambda, self._max_score(league))
+    
+    def _matchup_lambdas(self, team1_stats, team2_stats, league):
+        team1_lambda = self._calculate_lambda(team1_stats, team2_stats, league, is_home=True)
+        team2_lambda = self._calculate_lambda(team2_stats, team1_stats, league, is_home=False)
+        return team1_lambda, team2_lambda
+    
+    def _max_score(self, league):
+        return 200 if league == 'nba' else 60
+    
     def _calculate_lambda(self, team_stats, opponent_stats, league, is_home):
         """
         Calculate Poisson lambda (expected scoring rate)
@@ -88,36 +208,6 @@ class PoissonModel:
         
         return lambda_value
     
-    def _generate_score_distribution(self, lambda_param, max_score=150):
-        """
-        Generate probability distribution of scores
-        """
-        scores = np.arange(0, max_score + 1)
-        probabilities = poisson.pmf(scores, lambda_param)
-        
-        return {
-            'scores': scores.tolist(),
-            'probabilities': probabilities.tolist(),
-            'mean': lambda_param,
-            'std': np.sqrt(lambda_param)
-        }
-    
-    def _calculate_win_probability(self, lambda1, lambda2):
-        """
-        Calculate probability team1 beats team2 using Skellam distribution
-        """
-        # Skellam distribution models difference of two Poisson variables
-        # P(X1 > X2) = P(X1 - X2 > 0)
-        
-        # Sum probabilities for all positive differences
-        max_diff = 50
-        diffs = np.arange(1, max_diff + 1)
-        
-        # Skellam PMF
-        win_prob = skellam.sf(0, lambda1, lambda2)  # P(X > 0)
-        
-        return float(win_prob)
-    
     def predict_total(self, team1_stats, team2_stats, league='nba'):
         """
         Predict game total (over/under)
@@ -145,37 +235,35 @@ class PoissonModel:
     def calculate_spread_probability(self, team1_stats, team2_stats, spread, league='nba'):
         """
         Calculate probability of covering spread
-        """
-        prediction = self.predict_game_score(team1_stats, team2_stats, league)
         
-        lambda1 = prediction['team1_lambda']
-        lambda2 = prediction['team2_lambda']
+        `spread` may also be an array of alt lines, returning an array of probabilities.
+        """
+        lambda1, lambda2 = self._matchup_lambdas(team1_stats, team2_stats, league)
+        distribution = get_score_distribution(lambda1, lambda2, self._max_score(league))
+        expected_margin = lambda1 - lambda2
         
         # P(Team1 - Team2 > spread)
-        # Using Skellam distribution
-        cover_prob = skellam.sf(spread, lambda1, lambda2)
+        cover_prob = distribution.cover_probability(spread)
         
         return {
             'spread': spread,
-            'cover_probability': float(cover_prob),
-            'expected_margin': lambda1 - lambda2,
-            'fair_spread': lambda1 - lambda2
+            'cover_probability': cover_prob,
+            'expected_margin': expected_margin,
+            'fair_spread': expected_margin
         }
     
     def calculate_total_probability(self, team1_stats, team2_stats, total_line, league='nba'):
         """
         Calculate probability of going over/under total
-        """
-        prediction = self.predict_total(team1_stats, team2_stats, league)
         
-        # Total follows approximately normal distribution (sum of two Poissons)
-        mean_total = prediction['expected_total']
-        std_total = prediction['std_dev']
+        `total_line` may also be an array of alt lines, returning arrays of probabilities.
+        """
+        lambda1, lambda2 = self._matchup_lambdas(team1_stats, team2_stats, league)
+        distribution = get_score_distribution(lambda1, lambda2, self._max_score(league))
+        mean_total = lambda1 + lambda2
         
-        # P(Total > line)
-        from scipy.stats import norm
-        z_score = (total_line - mean_total) / std_total
-        over_prob = 1 - norm.cdf(z_score)
+        # P(Total > line) from the exact distribution of the sum of two Poissons
+        over_prob = distribution.over_probability(total_line)
         
         return {
             'total_line': total_line,
@@ -191,52 +279,89 @@ class PoissonModel:
         """
         logger.info(f"Simulating game {n_simulations} times")
         
-        # Calculate lambdas
-        team1_lambda = self._calculate_lambda(team1_stats, team2_stats, league, is_home=True)
-        team2_lambda = self._calculate_lambda(team2_stats, team1_stats, league, is_home=False)
-        
-        # Generate random scores
-        team1_scores = np.random.poisson(team1_lambda, n_simulations)
-        team2_scores = np.random.poisson(team2_lambda, n_simulations)
-        
-        # Calculate outcomes
-        team1_wins = (team1_scores > team2_scores).sum()
-        ties = (team1_scores == team2_scores).sum()
-        
-        margins = team1_scores - team2_scores
-        totals = team1_scores + team2_scores
+        slate = self.simulate_slate([(team1_stats, team2_stats)], league, n_simulations)
+        margin_q = slate['margin_quantiles'][0]
+        total_q = slate['total_quantiles'][0]
         
         return {
-            'team1_win_pct': (team1_wins / n_simulations) * 100,
-            'team2_win_pct': ((n_simulations - team1_wins - ties) / n_simulations) * 100,
-            'tie_pct': (ties / n_simulations) * 100,
-            'avg_team1_score': team1_scores.mean(),
-            'avg_team2_score': team2_scores.mean(),
-            'avg_margin': margins.mean(),
-            'avg_total': totals.mean(),
+            'team1_win_pct': slate['team1_win_pct'][0] * 100,
+            'team2_win_pct': slate['team2_win_pct'][0] * 100,
+            'tie_pct': slate['tie_pct'][0] * 100,
+            'avg_team1_score': slate['avg_team1_score'][0],
+            'avg_team2_score': slate['avg_team2_score'][0],
+            'avg_margin': slate['margin_mean'][0],
+            'avg_total': slate['total_mean'][0],
             'margin_distribution': {
-                'mean': margins.mean(),
-                'std': margins.std(),
-                'median': np.median(margins),
+                'mean': slate['margin_mean'][0],
+                'std': slate['margin_std'][0],
+                'median': margin_q[2],
                 'percentiles': {
-                    '5th': np.percentile(margins, 5),
-                    '25th': np.percentile(margins, 25),
-                    '75th': np.percentile(margins, 75),
-                    '95th': np.percentile(margins, 95)
+                    '5th': margin_q[0],
+                    '25th': margin_q[1],
+                    '75th': margin_q[3],
+                    '95th': margin_q[4]
                 }
             },
             'total_distribution': {
-                'mean': totals.mean(),
-                'std': totals.std(),
-                'median': np.median(totals),
+                'mean': slate['total_mean'][0],
+                'std': slate['total_std'][0],
+                'median': total_q[2],
                 'percentiles': {
-                    '5th': np.percentile(totals, 5),
-                    '25th': np.percentile(totals, 25),
-                    '75th': np.percentile(totals, 75),
-                    '95th': np.percentile(totals, 95)
+                    '5th': total_q[0],
+                    '25th': total_q[1],
+                    '75th': total_q[3],
+                    '95th': total_q[4]
                 }
             }
         }
+    
+    def simulate_slate(self, matchups, league='nba', n_simulations=10000, quantiles=SIMULATION_QUANTILES):
+        """
+        Monte Carlo simulation of a whole slate in one vectorized pass
+        
+        Args:
+            matchups: List of (team1_stats, team2_stats) pairs, team1 at home
+            league: 'nba', 'nfl', etc.
+            n_simulations: Simulations per game
+            quantiles: Quantile levels for margin and total
+        
+        Returns:
+            Dict of arrays indexed by game; quantile arrays are (n_games, n_quantiles)
+        """
+        logger.info(f"Simulating slate of {len(matchups)} games, {n_simulations} times each")
+        
+        lambdas = np.array(
+            [self._matchup_lambdas(team1, team2, league) for team1, team2 in matchups],
+            dtype=float
+        ).reshape(-1, 2)
+        quantiles = np.asarray(quantiles, dtype=float)
+        
+        # One draw for every game and simulation: (n_games, n_sims) per team
+        team1_scores = self.rng.poisson(lambdas[:, :1], (len(lambdas), n_simulations))
+        team2_scores = self.rng.poisson(lambdas[:, 1:], (len(lambdas), n_simulations))
+        
+        margins = team1_scores - team2_scores
+        totals = team1_scores + team2_scores
+        
+        team1_win_pct = (margins > 0).mean(axis=1)
+        tie_pct = (margins == 0).mean(axis=1)
+        
+        return {
+            'quantiles': quantiles,
+            'team1_lambda': lambdas[:, 0],
+            'team2_lambda': lambdas[:, 1],
+            'team1_win_pct': team1_win_pct,
+            'team2_win_pct': 1 - team1_win_pct - tie_pct,
+            'tie_pct': tie_pct,
+            'avg_team1_score': team1_scores.mean(axis=1),
+            'avg_team2_score': team2_scores.mean(axis=1),
+            'margin_mean': margins.mean(axis=1),
+            'margin_std': margins.std(axis=1),
+            'margin_quantiles': np.quantile(margins, quantiles, axis=1).T,
+            'total_mean': totals.mean(axis=1),
+            'total_std': totals.std(axis=1),
+            'total_quantiles': np.quantile(totals, quantiles, axis=1).T
+        }
 
 # Export singleton
 poisson_model = PoissonModel()
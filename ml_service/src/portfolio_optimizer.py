@@ -15,8 +15,9 @@ class PortfolioOptimizer:
     def __init__(self, total_bankroll=10000, risk_free_rate=0.0):
         self.total_bankroll = total_bankroll
         self.risk_free_rate = risk_free_rate
+        self.last_weights = {}  # Opportunity id -> weight from the last optimization
         
-    def optimize_portfolio(self, opportunities, objective='sharpe', constraints=None):
+    def optimize_portfolio(self, opportunities, objective='sharpe', constraints=None, initial_weights=None):
         """
         Optimize bet allocation across opportunities
         
@@ -24,6 +25,8 @@ class PortfolioOptimizer:
             opportunities: List of betting opportunities with expected returns and risks
             objective: 'sharpe', 'max_return', 'min_variance'
             constraints: Dict of constraints (max_single_bet, max_sport_allocation, etc.)
+            initial_weights: Optional starting weights (e.g. the previous allocation)
+                to warm-start the solver
         """
         logger.info(f"Optimizing portfolio with {len(opportunities)} opportunities")
         
@@ -47,23 +50,30 @@ class PortfolioOptimizer:
         correlation_matrix = self._build_correlation_matrix(opportunities)
         cov_matrix = np.outer(risks, risks) * correlation_matrix
         
-        # Initial weights (equal allocation)
         n = len(opportunities)
-        initial_weights = np.ones(n) / n
         
-        # Define objective function
-        if objective == 'sharpe':
-            obj_func = lambda w: -self._sharpe_ratio(w, returns, cov_matrix)
-        elif objective == 'max_return':
-            obj_func = lambda w: -np.dot(w, returns)
+        # Initial weights (equal allocation unless warm-started)
+        if initial_weights is None:
+            initial_weights = np.ones(n) / n
+        else:
+            initial_weights = self._feasible_weights(
+                initial_weights, constraints['max_single_bet'], constraints['max_total_exposure']
+            )
+        
+        # Objective functions return (value, gradient) so SLSQP skips finite differences
+        if objective == 'max_return':
+            obj_func = lambda w: (-np.dot(w, returns), -returns)
         elif objective == 'min_variance':
-            obj_func = lambda w: np.dot(w, np.dot(cov_matrix, w))
+            def obj_func(w):
+                cov_w = cov_matrix @ w
+                return np.dot(w, cov_w), 2 * cov_w
         else:
-            obj_func = lambda w: -self._sharpe_ratio(w, returns, cov_matrix)
+            obj_func = lambda w: self._negative_sharpe_with_grad(w, returns, cov_matrix)
         
         # Constraints
+        ones = np.ones(n)
         cons = [
-            {'type': 'eq', 'fun': lambda w: np.sum(w) - constraints['max_total_exposure']},  # Total exposure
+            {'type': 'eq', 'fun': lambda w: np.sum(w) - constraints['max_total_exposure'], 'jac': lambda w: ones},  # Total exposure
         ]
         
         # Bounds for each weight
@@ -74,6 +84,7 @@ class PortfolioOptimizer:
             obj_func,
             initial_weights,
             method='SLSQP',
+            jac=True,
             bounds=bounds,
             constraints=cons
         )
@@ -83,6 +94,9 @@ class PortfolioOptimizer:
             return self._fallback_allocation(opportunities, constraints)
         
         optimal_weights = result.x
+        self.last_weights = {
+            opp['id']: weight for opp, weight in zip(opportunities, optimal_weights) if 'id' in opp
+        }
         
         # Calculate portfolio metrics
         portfolio_return = np.dot(optimal_weights, returns)
@@ -123,18 +137,64 @@ class PortfolioOptimizer:
         
         return (portfolio_return - self.risk_free_rate) / portfolio_std
     
+    def _negative_sharpe_with_grad(self, weights, returns, cov_matrix):
+        """
+        Negative Sharpe ratio and its closed-form gradient
+        
+        d/dw [(w.r - rf) / s] = r / s - (w.r - rf) * (C w) / s^3, with s = sqrt(w' C w)
+        """
+        cov_w = cov_matrix @ weights
+        portfolio_std = np.sqrt(np.dot(weights, cov_w))
+        
+        if portfolio_std == 0:
+            return 0.0, np.zeros_like(weights)
+        
+        excess_return = np.dot(weights, returns) - self.risk_free_rate
+        grad = returns / portfolio_std - excess_return * cov_w / portfolio_std ** 3
+        
+        return -excess_return / portfolio_std, -grad
+    
+    def _feasible_weights(self, weights, max_single_bet, total_exposure):
+        """
+        Clip warm-start weights to bounds and rescale towards the exposure target
+        """
+        weights = np.clip(np.asarray(weights, dtype=float), 0, max_single_bet)
+        
+        for _ in range(len(weights) + 1):
+            gap = total_exposure - weights.sum()
+            free = weights < max_single_bet
+            if abs(gap) < 1e-12 or not free.any():
+                break
+            weights[free] += gap / free.sum()
+            weights = np.clip(weights, 0, max_single_bet)
+        
+        return weights
+    
     def _build_correlation_matrix(self, opportunities):
         """
         Build correlation matrix between opportunities
+        
+        Vectorized form of _calculate_correlation: each key is factorized to
+        integer codes and compared pairwise with broadcasting.
         """
         n = len(opportunities)
-        corr_matrix = np.eye(n)
         
-        for i in range(n):
-            for j in range(i + 1, n):
-                corr = self._calculate_correlation(opportunities[i], opportunities[j])
-                corr_matrix[i, j] = corr
-                corr_matrix[j, i] = corr
+        def codes(key):
+            values = pd.Series([opp.get(key) for opp in opportunities], dtype=object)
+            keys = pd.factorize(values, use_na_sentinel=False)[0]
+            return keys[:, None] == keys[None, :]
+        
+        same_game = codes('game_id')
+        same_team = codes('team') | codes('opponent')
+        same_sport = codes('sport')
+        same_date = codes('date')
+        
+        corr_matrix = np.select(
+            [same_game, same_team, same_sport & same_date, ~same_sport],
+            [0.6, 0.3, 0.15, 0.05],
+            default=0.1
+        )
+        np.fill_diagonal(corr_matrix, 1.0)
         
         return corr_matrix
     
@@ -278,8 +338,14 @@ class PortfolioOptimizer:
         # Combine current and new
         all_opportunities = current_positions + new_opportunities
         
+        # Warm-start from current stakes (or the last optimized weights); new
+        # opportunities start at zero and are filled by the exposure rescale
+        previous = dict(self.last_weights)
+        previous.update({p['id']: p['stake'] / self.total_bankroll for p in current_positions if 'stake' in p})
+        initial_weights = [previous.get(opp.get('id'), 0.0) for opp in all_opportunities]
+        
         # Optimize
-        optimal = self.optimize_portfolio(all_opportunities)
+        optimal = self.optimize_portfolio(all_opportunities, initial_weights=initial_weights)
         
         if not optimal:
             return None
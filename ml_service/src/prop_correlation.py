@@ -12,6 +12,11 @@ from scipy.stats import pearsonr, spearmanr
 from sklearn.preprocessing import StandardScaler
 import logging
 
+try:
+    from .caching import TTLCache
+except ImportError:
+    from caching import TTLCache
+
 logger = logging.getLogger(__name__)
 
 class PropCorrelationAnalyzer:
@@ -34,7 +39,8 @@ class PropCorrelationAnalyzer:
             ('rebounds', 'points'): 0.20,  # Big men
         }
         
-        self.correlation_cache = {}
+        # Simulated correlations are stable within a session; refresh every 6 hours
+        self.correlation_cache = TTLCache(max_entries=20000, default_ttl=6 * 3600, name="prop_correlation_cache")
     
     def calculate_historical_correlation(self, player_id, prop1, prop2, games_back=20):
         """
@@ -42,8 +48,9 @@ class PropCorrelationAnalyzer:
         """
         cache_key = f"{player_id}_{prop1}_{prop2}_{games_back}"
         
-        if cache_key in self.correlation_cache:
-            return self.correlation_cache[cache_key]
+        cached = self.correlation_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         try:
             # Fetch historical data (would connect to database in production)
@@ -69,7 +76,7 @@ class PropCorrelationAnalyzer:
                 'strength': self._categorize_correlation(correlation)
             }
             
-            self.correlation_cache[cache_key] = result
+            self.correlation_cache.set(cache_key, result)
             
             return result
             
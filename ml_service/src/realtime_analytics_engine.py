@@ -13,11 +13,10 @@ Advanced real-time prediction system with:
 """
 
 import numpy as np
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Callable, Any
 from dataclasses import dataclass, field
-from collections import deque
+from collections import OrderedDict, deque
 import asyncio
 import json
 import logging
@@ -25,6 +24,11 @@ from enum import Enum
 import threading
 import time
 
+try:
+    from .event_bus import COALESCE_LATEST, EventBus
+except ImportError:
+    from event_bus import COALESCE_LATEST, EventBus
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -149,31 +153,179 @@ class LivePrediction:
         }
 
 
+ODDS_FIELDS = ('moneyline_home', 'moneyline_away', 'spread_home', 'spread_away',
+               'total_over', 'total_under', 'over_under_line')
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_ns(timestamp: datetime) -> int:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def _from_ns(ns: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(ns) // 1000)
+
+
+class OddsWindow:
+    """
+    Columnar view of an event's most recent odds, oldest first
+
+    timestamp is int64 nanoseconds; each name in ODDS_FIELDS is a float64
+    column. Windows from OddsBuffer are views into its ring buffer and are
+    only valid until the event's next update.
+    """
+    
+    __slots__ = ('event_id', 'home_team', 'away_team', 'timestamp', 'books', 'values', '_book_names') + ODDS_FIELDS
+    
+    def __init__(self, event_id: str, home_team: str, away_team: str, timestamp: np.ndarray,
+                 books: np.ndarray, values: np.ndarray, book_names: List[str]):
+        self.event_id = event_id
+        self.home_team = home_team
+        self.away_team = away_team
+        self.timestamp = timestamp
+        self.books = books
+        self.values = values
+        self._book_names = book_names
+        for i, name in enumerate(ODDS_FIELDS):
+            setattr(self, name, values[i])
+    
+    @classmethod
+    def from_odds(cls, odds_history: List[LiveOdds]) -> 'OddsWindow':
+        """Build a window from LiveOdds objects (copies)"""
+        book_names = list(dict.fromkeys(o.book for o in odds_history))
+        first = odds_history[0] if odds_history else None
+        return cls(
+            first.event_id if first else '',
+            first.home_team if first else '',
+            first.away_team if first else '',
+            np.array([_to_ns(o.timestamp) for o in odds_history], dtype=np.int64),
+            np.array([book_names.index(o.book) for o in odds_history], dtype=np.int32),
+            np.array([[getattr(o, name) for o in odds_history] for name in ODDS_FIELDS],
+                     dtype=np.float64).reshape(len(ODDS_FIELDS), len(odds_history)),
+            book_names
+        )
+    
+    def __len__(self) -> int:
+        return len(self.timestamp)
+    
+    def row(self, i: int) -> LiveOdds:
+        return LiveOdds(
+            event_id=self.event_id,
+            timestamp=_from_ns(self.timestamp[i]),
+            home_team=self.home_team,
+            away_team=self.away_team,
+            book=self._book_names[self.books[i]],
+            **{name: float(self.values[j, i]) for j, name in enumerate(ODDS_FIELDS)}
+        )
+    
+    def to_list(self) -> List[LiveOdds]:
+        return [self.row(i) for i in range(len(self))]
+
+
+class _EventRing:
+    """
+    Preallocated ring buffer for one event
+    
+    Every row is written twice, at pos and pos + capacity, so the latest n
+    rows are always one contiguous slice and windows need no copy.
+    """
+    
+    def __init__(self, capacity: int, home_team: str, away_team: str):
+        self.capacity = capacity
+        self.home_team = home_team
+        self.away_team = away_team
+        self.timestamp = np.zeros(2 * capacity, dtype=np.int64)
+        self.books = np.zeros(2 * capacity, dtype=np.int32)
+        self.values = np.zeros((len(ODDS_FIELDS), 2 * capacity), dtype=np.float64)
+        self.head = 0
+        self.count = 0
+    
+    def append(self, timestamp: int, book: int, row: List[float]) -> None:
+        for pos in (self.head, self.head + self.capacity):
+            self.timestamp[pos] = timestamp
+            self.books[pos] = book
+            self.values[:, pos] = row
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+    
+    def window(self, n: Optional[int] = None) -> slice:
+        n = self.count if n is None else min(n, self.count)
+        end = self.head + self.capacity
+        return slice(end - n, end)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.timestamp.nbytes + self.books.nbytes + self.values.nbytes
+
+
 class OddsBuffer:
-    """Efficient buffer for storing odds history"""
+    """
+    Columnar odds history with fixed memory per event
+    
+    Each event keeps its last `capacity` updates in preallocated NumPy
+    columns; at most `max_size` events are tracked, least recently updated
+    evicted first.
+    """
     
-    def __init__(self, max_size: int = 1000):
+    def __init__(self, max_size: int = 1000, capacity: int = 100):
         self.max_size = max_size
-        self.buffer = deque(maxlen=max_size)
-        self.by_event = {}
+        self.capacity = capacity
+        self.by_event: Dict[str, _EventRing] = OrderedDict()
+        self._book_ids: Dict[str, int] = {}
+        self._book_names: List[str] = []
+        
+    def add(self, odds: LiveOdds) -> Optional[str]:
+        """Append an update; returns the event evicted to make room, if any"""
+        evicted = None
+        ring = self.by_event.get(odds.event_id)
+        if ring is None:
+            if len(self.by_event) >= self.max_size:
+                evicted, _ = self.by_event.popitem(last=False)
+            ring = self.by_event[odds.event_id] = _EventRing(self.capacity, odds.home_team, odds.away_team)
+        else:
+            self.by_event.move_to_end(odds.event_id)
         
-    def add(self, odds: LiveOdds):
-        self.buffer.append(odds)
-        if odds.event_id not in self.by_event:
-            self.by_event[odds.event_id] = deque(maxlen=100)
-        self.by_event[odds.event_id].append(odds)
+        book = self._book_ids.get(odds.book)
+        if book is None:
+            book = self._book_ids[odds.book] = len(self._book_names)
+            self._book_names.append(odds.book)
+        
+        ring.append(_to_ns(odds.timestamp), book, [getattr(odds, name) for name in ODDS_FIELDS])
+        return evicted
+    
+    def get_window(self, event_id: str, n: Optional[int] = None) -> Optional[OddsWindow]:
+        """Zero-copy view of the last n updates (all retained if None)"""
+        ring = self.by_event.get(event_id)
+        if ring is None:
+            return None
+        rows = ring.window(n)
+        return OddsWindow(event_id, ring.home_team, ring.away_team, ring.timestamp[rows],
+                          ring.books[rows], ring.values[:, rows], self._book_names)
     
     def get_history(self, event_id: str) -> List[LiveOdds]:
-        return list(self.by_event.get(event_id, []))
+        window = self.get_window(event_id)
+        return window.to_list() if window is not None else []
     
     def get_latest(self, event_id: str) -> Optional[LiveOdds]:
-        history = self.by_event.get(event_id, [])
-        return history[-1] if history else None
+        window = self.get_window(event_id, 1)
+        return window.row(0) if window is not None and len(window) else None
+    
+    def memory_bytes(self) -> int:
+        return sum(ring.nbytes for ring in self.by_event.values())
+
+
+def _as_window(odds_history) -> OddsWindow:
+    return odds_history if isinstance(odds_history, OddsWindow) else OddsWindow.from_odds(list(odds_history))
 
 
 class LineMovementDetector:
     """
     Detect significant line movements and betting patterns
+    
+    Detectors take an OddsWindow (or a list of LiveOdds) and work on its
+    columns.
     """
     
     def __init__(self):
@@ -185,19 +337,29 @@ class LineMovementDetector:
         self.steam_threshold = 3  # Moves across multiple books
         self.reverse_threshold = 0.7  # 70% public on one side
         
-    def detect_line_movement(self, odds_history: List[LiveOdds]) -> Dict:
+    def detect_line_movement(self, odds_history) -> Dict:
         """Detect and classify line movements"""
         if len(odds_history) < 2:
             return {'detected': False}
         
-        first = odds_history[0]
-        latest = odds_history[-1]
+        window = _as_window(odds_history)
+        significant_movements = self.classify_movements(window.values[:, -1] - window.values[:, 0])
         
+        return {
+            'detected': len(significant_movements) > 0,
+            'movements': significant_movements,
+            'time_span': (int(window.timestamp[-1]) - int(window.timestamp[0])) / 60e9,  # minutes
+            'velocity': self._calculate_velocity(window)
+        }
+    
+    def classify_movements(self, first_to_last: np.ndarray) -> List[Dict]:
+        """Significant moves given latest minus first for each of ODDS_FIELDS"""
+        delta = dict(zip(ODDS_FIELDS, first_to_last.tolist()))
         movements = {
-            'moneyline_home': latest.moneyline_home - first.moneyline_home,
-            'moneyline_away': latest.moneyline_away - first.moneyline_away,
-            'spread_home': latest.spread_home - first.spread_home,
-            'total': latest.over_under_line - first.over_under_line
+            'moneyline_home': delta['moneyline_home'],
+            'moneyline_away': delta['moneyline_away'],
+            'spread_home': delta['spread_home'],
+            'total': delta['over_under_line']
         }
         
         significant_movements = []
@@ -232,51 +394,39 @@ class LineMovementDetector:
                                  else 'Sharp action on under'
             })
         
-        return {
-            'detected': len(significant_movements) > 0,
-            'movements': significant_movements,
-            'time_span': (latest.timestamp - first.timestamp).total_seconds() / 60,  # minutes
-            'velocity': self._calculate_velocity(odds_history)
-        }
+        return significant_movements
     
-    def _calculate_velocity(self, odds_history: List[LiveOdds]) -> float:
+    def _calculate_velocity(self, odds_history) -> float:
         """Calculate how fast the line is moving"""
         if len(odds_history) < 3:
             return 0.0
         
-        velocities = []
-        for i in range(1, len(odds_history)):
-            time_diff = (odds_history[i].timestamp - odds_history[i-1].timestamp).total_seconds()
-            if time_diff > 0:
-                price_diff = abs(odds_history[i].spread_home - odds_history[i-1].spread_home)
-                velocities.append(price_diff / (time_diff / 60))  # points per minute
+        window = _as_window(odds_history)
+        minutes = np.diff(window.timestamp) / 60e9
+        moved = minutes > 0
+        if not moved.any():
+            return 0.0
         
-        return np.mean(velocities) if velocities else 0.0
+        # Points per minute between consecutive updates
+        return float(np.mean(np.abs(np.diff(window.spread_home))[moved] / minutes[moved]))
     
-    def detect_steam_move(self, odds_across_books: List[LiveOdds]) -> bool:
+    def detect_steam_move(self, odds_across_books) -> bool:
         """Detect steam moves (simultaneous movement across books)"""
         if len(odds_across_books) < 3:
             return False
         
-        # Check if multiple books moved in same direction
-        movements = []
-        for i in range(len(odds_across_books) - 1):
-            diff = odds_across_books[i+1].spread_home - odds_across_books[i].spread_home
-            movements.append(np.sign(diff))
-        
         # Steam move = all books moving same direction
-        return len(set(movements)) == 1 and movements[0] != 0
+        directions = np.sign(np.diff(_as_window(odds_across_books).spread_home))
+        return bool(directions[0] != 0 and (directions == directions[0]).all())
     
-    def detect_reverse_line_movement(self, odds_history: List[LiveOdds],
+    def detect_reverse_line_movement(self, odds_history,
                                      public_percentages: Dict) -> bool:
         """Detect reverse line movement (line moving against public)"""
         if len(odds_history) < 2:
             return False
         
-        first = odds_history[0]
-        latest = odds_history[-1]
-        
-        spread_movement = latest.spread_home - first.spread_home
+        spread = _as_window(odds_history).spread_home
+        spread_movement = spread[-1] - spread[0]
         
         home_public_pct = public_percentages.get('home', 50)
         
@@ -289,6 +439,119 @@ class LineMovementDetector:
         return False
 
 
+class _MonotonicWindow:
+    """Running max and min of a value over a trailing time horizon"""
+    
+    def __init__(self, horizon_ns: int):
+        self.horizon_ns = horizon_ns
+        self._max = deque()  # (timestamp, value), values decreasing
+        self._min = deque()  # (timestamp, value), values increasing
+    
+    def push(self, timestamp: int, value: float) -> None:
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._max.append((timestamp, value))
+        self._min.append((timestamp, value))
+        
+        cutoff = timestamp - self.horizon_ns
+        while self._max[0][0] < cutoff:
+            self._max.popleft()
+        while self._min[0][0] < cutoff:
+            self._min.popleft()
+    
+    @property
+    def high(self) -> float:
+        return self._max[0][1]
+    
+    @property
+    def low(self) -> float:
+        return self._min[0][1]
+
+
+class StreamingLineDetector:
+    """
+    Incremental line-movement detection for one event, O(1) per tick
+    
+    Fed the event's OddsWindow after every update, it keeps running state
+    instead of rescanning history:
+    - movements: latest minus oldest retained update, read from the ring ends
+    - velocity: sliding mean of per-step spread velocity over the window,
+      maintained as a running sum (same value as detect_line_movement)
+    - velocity_ewma: exponentially weighted per-step velocity
+    - spread_high / spread_low: spread range over the last range_minutes,
+      via monotonic deques
+    """
+    
+    def __init__(self, detector: LineMovementDetector, capacity: int,
+                 ewma_alpha: float = 0.3, range_minutes: float = 15.0):
+        self.detector = detector
+        self.capacity = capacity
+        self.ewma_alpha = ewma_alpha
+        self.velocity_ewma = 0.0
+        self.ticks = 0
+        
+        # Per-step velocities for steps inside the window; None where dt <= 0
+        self._steps = deque()
+        self._velocity_sum = 0.0
+        self._velocity_count = 0
+        self._range = _MonotonicWindow(int(range_minutes * 60e9))
+    
+    def update(self, window: OddsWindow) -> Dict:
+        """Account for the newest row of window and return the detection"""
+        self.ticks += 1
+        timestamp = int(window.timestamp[-1])
+        spread = float(window.spread_home[-1])
+        self._range.push(timestamp, spread)
+        
+        if len(window) >= 2:
+            self._add_step(timestamp - int(window.timestamp[-2]), abs(spread - float(window.spread_home[-2])))
+        # A step leaves the window together with its older endpoint
+        while len(self._steps) > len(window) - 1:
+            self._drop_step()
+        if self.ticks % self.capacity == 0:
+            self._resum()
+        
+        if len(window) < 2:
+            return {'detected': False}
+        
+        significant_movements = self.detector.classify_movements(window.values[:, -1] - window.values[:, 0])
+        return {
+            'detected': len(significant_movements) > 0,
+            'movements': significant_movements,
+            'time_span': (timestamp - int(window.timestamp[0])) / 60e9,  # minutes
+            'velocity': self.velocity if len(window) >= 3 else 0.0,
+            'velocity_ewma': self.velocity_ewma,
+            'spread_high': self._range.high,
+            'spread_low': self._range.low
+        }
+    
+    @property
+    def velocity(self) -> float:
+        return self._velocity_sum / self._velocity_count if self._velocity_count else 0.0
+    
+    def _add_step(self, dt_ns: int, price_diff: float) -> None:
+        if dt_ns <= 0:
+            self._steps.append(None)
+            return
+        velocity = price_diff / (dt_ns / 60e9)  # points per minute
+        self._steps.append(velocity)
+        self._velocity_sum += velocity
+        self._velocity_count += 1
+        self.velocity_ewma += self.ewma_alpha * (velocity - self.velocity_ewma)
+    
+    def _drop_step(self) -> None:
+        velocity = self._steps.popleft()
+        if velocity is not None:
+            self._velocity_sum -= velocity
+            self._velocity_count -= 1
+    
+    def _resum(self) -> None:
+        # Bound floating-point drift of the running sum (amortized O(1))
+        self._velocity_sum = sum(v for v in self._steps if v is not None)
+
+
 class ValueDetector:
     """
     Real-time value bet detection
@@ -705,40 +968,42 @@ class StreamingEngine:
     """
     
     def __init__(self):
-        self.subscribers = {}
+        # Only the newest odds per event matter to a lagging consumer
+        self.bus = EventBus()
+        self.bus.configure('odds', COALESCE_LATEST, key=lambda odds: odds['event_id'])
         self.odds_buffer = OddsBuffer()
+        self.line_trackers: Dict[str, StreamingLineDetector] = {}
         self.predictor = RealTimePredictor()
         self.signal_generator = SignalGenerator()
         self.is_running = False
         logger.info("Streaming engine initialized")
     
     def subscribe(self, channel: str, callback: Callable):
-        """Subscribe to a data channel"""
-        if channel not in self.subscribers:
-            self.subscribers[channel] = []
-        self.subscribers[channel].append(callback)
+        """Subscribe a callback to a data channel; it runs in its own task on the event loop"""
+        return self.bus.subscribe_callback(channel, callback)
     
     def publish(self, channel: str, data: Any):
-        """Publish data to subscribers"""
-        for callback in self.subscribers.get(channel, []):
-            try:
-                callback(data)
-            except Exception as e:
-                logger.error(f"Error in subscriber callback: {e}")
+        """Publish data to subscribers without waiting on them"""
+        self.bus.publish(channel, data)
     
     def process_odds_update(self, odds: LiveOdds):
         """Process incoming odds update"""
-        self.odds_buffer.add(odds)
-        
-        # Check for significant movement
-        history = self.odds_buffer.get_history(odds.event_id)
-        if len(history) >= 2:
-            movement = self.signal_generator.line_detector.detect_line_movement(history)
-            if movement['detected']:
-                self.publish('line_movement', {
-                    'event_id': odds.event_id,
-                    'movement': movement
-                })
+        evicted = self.odds_buffer.add(odds)
+        if evicted is not None:
+            self.line_trackers.pop(evicted, None)
+        
+        # Check for significant movement, updating running state instead of rescanning history
+        tracker = self.line_trackers.get(odds.event_id)
+        if tracker is None:
+            tracker = self.line_trackers[odds.event_id] = StreamingLineDetector(
+                self.signal_generator.line_detector, self.odds_buffer.capacity
+            )
+        movement = tracker.update(self.odds_buffer.get_window(odds.event_id))
+        if movement['detected']:
+            self.publish('line_movement', {
+                'event_id': odds.event_id,
+                'movement': movement
+            })
         
         # Publish updated odds
         self.publish('odds', odds.to_dict())
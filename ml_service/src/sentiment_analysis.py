@@ -16,6 +16,11 @@ from collections import defaultdict
 import numpy as np
 import logging
 
+try:
+    from .caching import TTLCache
+except ImportError:
+    from caching import TTLCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -44,8 +49,8 @@ class SentimentAnalyzer:
         self.bet_keywords = ['bet', 'wager', 'lock', 'pick', 'play', 'parlay', 
                             'spread', 'moneyline', 'over', 'under', 'hammer']
         
-        self.sentiment_cache = {}
         self.cache_expiry = 3600  # 1 hour
+        self.sentiment_cache = TTLCache(max_entries=2000, default_ttl=self.cache_expiry, name="sentiment_cache")
     
     def analyze_twitter_sentiment(self, team_name, player_name=None, hours_back=24):
         """
@@ -254,10 +259,9 @@ class SentimentAnalyzer:
         cache_key = f"{team_name}_{player_name}_{datetime.now().hour}"
         
         # Check cache
-        if cache_key in self.sentiment_cache:
-            cached = self.sentiment_cache[cache_key]
-            if datetime.now().timestamp() - cached['timestamp'] < self.cache_expiry:
-                return cached['data']
+        cached = self.sentiment_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Analyze all platforms
         twitter_sentiment = self.analyze_twitter_sentiment(team_name, player_name)
@@ -299,10 +303,7 @@ class SentimentAnalyzer:
         }
         
         # Cache result
-        self.sentiment_cache[cache_key] = {
-            'data': result,
-            'timestamp': datetime.now().timestamp()
-        }
+        self.sentiment_cache.set(cache_key, result)
         
         return result
     
@@ -0,0 +1,210 @@
+"""
+Cache Serialization
+Pluggable codecs for cached payloads; NumPy arrays are stored as raw buffers
+"""
+
+import json
+import logging
+import struct
+from typing import Any, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    logger.debug("msgpack not available, msgpack codec disabled")
+
+_ALIGNMENT = 8
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _is_float_list(obj: List, min_size: int) -> bool:
+    return len(obj) >= min_size and all(type(x) is float for x in obj)
+
+
+class Codec:
+    """Encode cache payloads to bytes and back"""
+
+    name = "base"
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, raw: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    """Plain JSON; arrays are converted to lists"""
+
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=_json_default).encode('utf-8')
+
+    def decode(self, raw: bytes) -> Any:
+        return json.loads(raw)
+
+
+class BinaryCodec(Codec):
+    """
+    JSON structure header followed by raw array buffers
+
+    Layout: MAGIC | uint32 header length | header | 8-byte aligned buffers
+
+    - ndarrays round-trip as read-only views on the payload (no copy, no parsing)
+    - long lists of floats are packed as float64 buffers and restored as lists
+    - payloads without the magic prefix are decoded as JSON, so entries
+      written by JSONCodec stay readable
+    """
+
+    name = "binary"
+    MAGIC = b'CEB1'
+
+    def __init__(self, min_list_size: int = 64):
+        """
+        Args:
+            min_list_size: Shortest float list worth packing as a buffer
+        """
+        self.min_list_size = min_list_size
+
+    def encode(self, value: Any) -> bytes:
+        buffers = []
+
+        def pack(obj):
+            if isinstance(obj, np.ndarray):
+                if obj.dtype.hasobject:
+                    return pack(obj.tolist())
+                buffers.append(np.require(obj, requirements='C'))
+                return {'__nd__': len(buffers) - 1}
+            if isinstance(obj, dict):
+                return {key: pack(item) for key, item in obj.items()}
+            if isinstance(obj, (list, tuple)):
+                if _is_float_list(obj, self.min_list_size):
+                    buffers.append(np.array(obj, dtype=np.float64))
+                    return {'__fl__': len(buffers) - 1}
+                return [pack(item) for item in obj]
+            if isinstance(obj, np.generic):
+                return obj.item()
+            return obj
+
+        tree = pack(value)
+
+        arrays = []
+        offset = 0
+        for array in buffers:
+            arrays.append([array.dtype.str, list(array.shape), offset])
+            offset = _align(offset + array.nbytes)
+
+        header = json.dumps({'tree': tree, 'arrays': arrays}, default=_json_default).encode('utf-8')
+        prefix = self.MAGIC + struct.pack('<I', len(header)) + header
+        data_start = _align(len(prefix))
+
+        parts = [prefix, b'\0' * (data_start - len(prefix))]
+        written = 0
+        for array, (_, _, array_offset) in zip(buffers, arrays):
+            parts.append(b'\0' * (array_offset - written))
+            parts.append(array.reshape(-1).view(np.uint8))
+            written = array_offset + array.nbytes
+
+        return b''.join(parts)
+
+    def decode(self, raw: bytes) -> Any:
+        if raw[:len(self.MAGIC)] != self.MAGIC:
+            return json.loads(raw)
+
+        (header_len,) = struct.unpack_from('<I', raw, len(self.MAGIC))
+        header_start = len(self.MAGIC) + 4
+        header = json.loads(raw[header_start:header_start + header_len])
+        data_start = _align(header_start + header_len)
+
+        def array_at(index):
+            dtype, shape, offset = header['arrays'][index]
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape, dtype=np.int64))
+            return np.frombuffer(raw, dtype=dtype, count=count, offset=data_start + offset).reshape(shape)
+
+        def unpack(obj):
+            if isinstance(obj, dict):
+                if len(obj) == 1:
+                    if '__nd__' in obj:
+                        return array_at(obj['__nd__'])
+                    if '__fl__' in obj:
+                        return array_at(obj['__fl__']).tolist()
+                return {key: unpack(item) for key, item in obj.items()}
+            if isinstance(obj, list):
+                return [unpack(item) for item in obj]
+            return obj
+
+        return unpack(header['tree'])
+
+
+class MsgpackCodec(Codec):
+    """msgpack with ndarrays carried as extension types"""
+
+    name = "msgpack"
+    NDARRAY_EXT = 42
+
+    def __init__(self):
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("msgpack is required for MsgpackCodec")
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def decode(self, raw: bytes) -> Any:
+        return msgpack.unpackb(raw, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+    def _default(self, obj: Any) -> Any:
+        if isinstance(obj, np.ndarray) and not obj.dtype.hasobject:
+            array = np.require(obj, requirements='C')
+            meta = msgpack.packb([array.dtype.str, list(array.shape)])
+            return msgpack.ExtType(self.NDARRAY_EXT, meta + array.tobytes())
+        return _json_default(obj)
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code != self.NDARRAY_EXT:
+            return msgpack.ExtType(code, data)
+
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(data)
+        dtype, shape = unpacker.unpack()
+        offset = unpacker.tell()
+        return np.frombuffer(data, dtype=np.dtype(dtype), offset=offset).reshape(shape)
+
+
+CODECS: Dict[str, type] = {
+    'json': JSONCodec,
+    'binary': BinaryCodec,
+    'msgpack': MsgpackCodec,
+}
+
+
+def get_codec(name: str = 'binary') -> Codec:
+    """Look up a codec by name, falling back to the binary codec"""
+    codec_cls = CODECS.get(name)
+    if codec_cls is None:
+        logger.error(f"Unknown codec '{name}', expected one of {sorted(CODECS)}; using binary codec")
+        codec_cls = BinaryCodec
+
+    if codec_cls is MsgpackCodec and not MSGPACK_AVAILABLE:
+        logger.warning("msgpack not installed, using binary codec")
+        codec_cls = BinaryCodec
+
+    return codec_cls()
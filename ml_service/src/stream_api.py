@@ -0,0 +1,249 @@
+"""
+Stream API
+WebSocket and server-sent event feeds of the realtime engine's odds and
+line movements, plus the odds feed that publishes aggregated sportsbook
+odds onto its event bus
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+try:
+    from .realtime_analytics_engine import LiveOdds, realtime_api
+except ImportError:
+    from realtime_analytics_engine import LiveOdds, realtime_api
+
+logger = logging.getLogger(__name__)
+
+# Only channels the mounted app publishes to (OddsFeed -> process_odds_update)
+STREAM_CHANNELS = ('odds', 'line_movement')
+STREAM_QUEUE_SIZE = 256
+SSE_HEARTBEAT_SECONDS = 15
+
+ODDS_FEED_INTERVAL = float(os.getenv('ODDS_STREAM_INTERVAL', 30))
+ODDS_FEED_SPORT = os.getenv('ODDS_STREAM_SPORT', 'basketball_nba')
+
+
+# ============================================
+# Odds feed
+# ============================================
+
+def game_to_live_odds(game: Dict[str, Any]) -> Optional[LiveOdds]:
+    """
+    Consensus lines and best prices of an aggregated game as LiveOdds
+
+    Returns None while the game lacks a spread, total or price on either side.
+    """
+    best, consensus = game['best_odds'], game['market_consensus']
+    prices = [best['moneyline']['home']['odds'], best['moneyline']['away']['odds'],
+              best['total']['over']['odds'], best['total']['under']['odds']]
+    if consensus['spread'] is None or consensus['total'] is None or \
+            not all(price is not None and math.isfinite(price) for price in prices):
+        return None
+
+    return LiveOdds(
+        event_id=str(game.get('game_id') or f"{game['home_team']}_{game['away_team']}"),
+        timestamp=datetime.now(timezone.utc),
+        home_team=game['home_team'],
+        away_team=game['away_team'],
+        moneyline_home=prices[0],
+        moneyline_away=prices[1],
+        spread_home=float(consensus['spread']),
+        spread_away=-float(consensus['spread']),
+        total_over=prices[2],
+        total_under=prices[3],
+        over_under_line=float(consensus['total']),
+        book='consensus'
+    )
+
+
+class OddsFeed:
+    """
+    Polls the live odds aggregator and feeds changed games into the streaming
+    engine, which publishes them on the odds and line_movement channels
+
+    The aggregator replaces a game's dict only when its quotes change, so a
+    game is re-published exactly when the identity of its dict changes.
+    """
+
+    def __init__(self, engine, aggregator=None, sport: str = ODDS_FEED_SPORT,
+                 interval: float = ODDS_FEED_INTERVAL):
+        self.engine = engine
+        self.aggregator = aggregator
+        self.sport = sport
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+        self.polls = 0
+        self.published = 0
+        self.errors = 0
+        self._last: Dict[str, Dict] = {}
+
+    def start(self) -> bool:
+        """Start polling on the running loop; False if disabled or no odds source is configured"""
+        if self.interval <= 0 or (self.task is not None and not self.task.done()):
+            return False
+
+        if self.aggregator is None:
+            # aiohttp is only imported once the feed actually runs
+            try:
+                from .live_odds_aggregator import odds_aggregator
+            except ImportError:
+                from live_odds_aggregator import odds_aggregator
+            self.aggregator = odds_aggregator
+
+        if not any(self.aggregator.api_keys.values()):
+            logger.info("No odds API keys configured; odds stream feed disabled")
+            return False
+
+        self.task = asyncio.get_running_loop().create_task(self._run(), name="odds-feed")
+        logger.info(f"Odds stream feed polling {self.sport} every {self.interval}s")
+        return True
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.aggregator is not None and hasattr(self.aggregator, 'close'):
+            await self.aggregator.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Odds feed poll failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def poll_once(self) -> int:
+        """Fetch once and push every new or changed game; returns how many were pushed"""
+        games = await self.aggregator.fetch_all_odds(self.sport)
+        self.polls += 1
+
+        current, pushed = {}, 0
+        for game in games:
+            key = f"{game['home_team']}_{game['away_team']}"
+            current[key] = game
+            if self._last.get(key) is game:
+                continue
+            odds = game_to_live_odds(game)
+            if odds is not None:
+                self.engine.process_odds_update(odds)
+                pushed += 1
+
+        self._last = current
+        self.published += pushed
+        return pushed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.task is not None and not self.task.done(),
+            'sport': self.sport,
+            'interval': self.interval,
+            'polls': self.polls,
+            'published': self.published,
+            'errors': self.errors
+        }
+
+
+odds_feed = OddsFeed(realtime_api.streaming_engine)
+
+
+# ============================================
+# Endpoints
+# ============================================
+
+router = APIRouter(prefix="/api/v2", tags=["Streaming"])
+
+
+def parse_channels(channels: Optional[str]) -> List[str]:
+    requested = [c.strip() for c in (channels or ','.join(STREAM_CHANNELS)).split(',') if c.strip()]
+    unknown = set(requested) - set(STREAM_CHANNELS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown channels: {sorted(unknown)}")
+    return requested
+
+
+@router.websocket("/stream")
+async def stream_websocket(websocket: WebSocket, channels: Optional[str] = None):
+    """
+    Push odds and line movements as they happen
+    
+    Each frame is {"channel": ..., "data": ...}. Odds are coalesced to the
+    latest per event for clients that fall behind; line movements drop
+    their oldest queued messages.
+    """
+    try:
+        requested = parse_channels(channels)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    
+    await websocket.accept()
+    subscription = realtime_api.streaming_engine.bus.subscribe(
+        requested, maxsize=STREAM_QUEUE_SIZE, name=f"ws-{id(websocket):x}"
+    )
+    
+    async def send():
+        async for channel, message in subscription:
+            await websocket.send_text(json.dumps({"channel": channel, "data": message}, default=str))
+    
+    async def receive():
+        # Clients don't send anything; reading notices a close on a quiet channel
+        while (await websocket.receive())['type'] != 'websocket.disconnect':
+            pass
+    
+    tasks = [asyncio.ensure_future(send()), asyncio.ensure_future(receive())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                logger.info(f"Stream {subscription.name} closed: {error!r}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+
+
+@router.get("/stream/sse")
+async def stream_sse(channels: Optional[str] = None):
+    """Server-sent events version of /stream for clients without WebSockets"""
+    subscription = realtime_api.streaming_engine.bus.subscribe(
+        parse_channels(channels), maxsize=STREAM_QUEUE_SIZE
+    )
+    
+    async def events():
+        try:
+            while True:
+                try:
+                    channel, message = await asyncio.wait_for(subscription.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {channel}\ndata: {json.dumps(message, default=str)}\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/stream/stats")
+async def stream_stats():
+    """Queue depth, drops, coalescing and delivery lag per stream subscriber"""
+    return {**realtime_api.streaming_engine.bus.stats(), 'odds_feed': odds_feed.stats()}
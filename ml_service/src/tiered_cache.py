@@ -0,0 +1,345 @@
+"""
+Tiered Response Cache
+In-process L1 in front of Redis L2 with request coalescing,
+stale-while-revalidate and a circuit breaker around Redis
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+try:
+    from .caching import TTLCache
+    from .serialization import Codec, JSONCodec
+except ImportError:
+    from caching import TTLCache
+    from serialization import Codec, JSONCodec
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    closed    -> calls pass through
+    open      -> calls are skipped until reset_timeout has elapsed
+    half_open -> a single trial call decides between closed and open
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = "redis"):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit '{self.name}' closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            reopen = self._trial_in_flight
+            self._trial_in_flight = False
+
+            if reopen or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                logger.warning(
+                    f"Circuit '{self.name}' opened after {self.failures} failures; "
+                    f"bypassing for {self.reset_timeout}s"
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'trips': self.trips
+        }
+
+
+class TieredCache:
+    """
+    Two-tier cache for API responses
+
+    - L1: bounded in-process TTLCache, checked first and never blocks
+    - L2: Redis shared across workers, guarded by a CircuitBreaker
+    - get_or_compute coalesces concurrent misses for the same key into one computation
+    - Entries stay servable for stale_ttl seconds after expiry while a single
+      background refresh recomputes them
+    """
+
+    def __init__(self, client=None, l1: Optional[TTLCache] = None, default_ttl: float = 300,
+                 stale_ttl: float = 60, breaker: Optional[CircuitBreaker] = None,
+                 codec: Optional[Codec] = None, name: str = "api"):
+        """
+        Args:
+            client: Redis client (None = L1 only)
+            l1: In-process cache (defaults to a 10k-entry TTLCache)
+            default_ttl: Seconds a value is considered fresh
+            stale_ttl: Extra seconds a value may be served while it is refreshed
+            breaker: Circuit breaker guarding Redis calls
+            codec: Serializer for Redis payloads (defaults to JSON)
+            name: Label used in logs and stats
+        """
+        self.client = client
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self.l1 = l1 if l1 is not None else TTLCache(max_entries=10000, name=f"{name}-l1")
+        self.breaker = breaker or CircuitBreaker(name=f"{name}-redis")
+        self.codec = codec or JSONCodec()
+
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refreshing = set()
+        self._refresh_tasks = set()
+
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.redis_errors = 0
+
+    # --------------------------------------------------------
+    # Synchronous API
+    # --------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return a fresh value, or None
+
+        There is no compute function here to revalidate with, so a stale
+        entry counts as a miss and the caller recomputes and set()s it.
+        """
+        value, fresh = self._lookup_l1(key)
+        if not fresh and self._redis_available():
+            # Another worker may already have refreshed the shared copy
+            value, fresh = self._lookup_l2(key)
+        if value is _MISSING or not fresh:
+            self.misses += 1
+            return None
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None,
+            stale_ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+
+        self._set_l1(key, value, ttl, stale_ttl)
+        self._set_l2(key, value, ttl, stale_ttl)
+
+    def delete(self, key: str) -> None:
+        self.l1.delete(key)
+        self._redis_call(lambda: self.client.delete(key))
+
+    # --------------------------------------------------------
+    # Async API
+    # --------------------------------------------------------
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Union[Any, Awaitable[Any]]],
+                             ttl: Optional[float] = None, stale_ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value for key, computing it at most once across
+        concurrent callers on a miss
+
+        compute may be a plain callable or a coroutine function.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+
+        value, fresh = self._lookup_l1(key)
+        if value is _MISSING:
+            # Only the leader for a key touches Redis or computes
+            value, fresh = await self._single_flight(
+                key, lambda: self._load(key, compute, ttl, stale_ttl)
+            )
+
+        if not fresh:
+            self._refresh_in_background(key, compute, ttl, stale_ttl)
+        return value
+
+    async def _load(self, key: str, compute, ttl: float, stale_ttl: float) -> Tuple[Any, bool]:
+        if self._redis_available():
+            value, fresh = await asyncio.to_thread(self._lookup_l2, key)
+            if value is not _MISSING:
+                return value, fresh
+
+        self.misses += 1
+        return await self._recompute(key, compute, ttl, stale_ttl)
+
+    async def _recompute(self, key: str, compute, ttl: float, stale_ttl: float) -> Tuple[Any, bool]:
+        value = compute()
+        if inspect.isawaitable(value):
+            value = await value
+
+        self._set_l1(key, value, ttl, stale_ttl)
+        if self._redis_available():
+            await asyncio.to_thread(self._set_l2, key, value, ttl, stale_ttl)
+        return value, True
+
+    async def _single_flight(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(load())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._flight_done(key, done))
+
+        # The load runs in its own task, so cancelling any one caller (including
+        # the one that started it) leaves it running for everyone else
+        return await asyncio.shield(task)
+
+    def _flight_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # waiters re-raise it; don't log as unretrieved
+
+    def _refresh_in_background(self, key: str, compute, ttl: float, stale_ttl: float) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await self._single_flight(key, lambda: self._recompute(key, compute, ttl, stale_ttl))
+            except Exception as e:
+                logger.error(f"{self.name}: background refresh failed for {key}: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.ensure_future(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    # --------------------------------------------------------
+    # Tiers
+    # --------------------------------------------------------
+
+    def _lookup_l1(self, key: str) -> Tuple[Any, bool]:
+        entry = self.l1.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING, False
+
+        value, fresh_until = entry
+        fresh = time.monotonic() < fresh_until
+        self.l1_hits += 1
+        if not fresh:
+            self.stale_hits += 1
+        return value, fresh
+
+    def _lookup_l2(self, key: str) -> Tuple[Any, bool]:
+        def fetch():
+            pipe = self.client.pipeline()
+            pipe.get(key)
+            pipe.ttl(key)
+            return pipe.execute()
+
+        result = self._redis_call(fetch)
+        if not result or result[0] is None:
+            return _MISSING, False
+
+        raw, remaining = result
+        try:
+            value = self.decode(raw)
+        except Exception as e:
+            logger.error(f"{self.name}: could not decode {key}: {e}")
+            return _MISSING, False
+
+        # Keys are written with ttl + stale_ttl, so the remaining TTL tells us freshness
+        fresh_for = (remaining or 0) - self.stale_ttl
+        self.l2_hits += 1
+        if fresh_for <= 0:
+            self.stale_hits += 1
+
+        # Promote into L1 with whatever life the L2 entry has left
+        l1_ttl = max(remaining or 0, 1)
+        self.l1.set(key, (value, time.monotonic() + max(fresh_for, 0)), ttl=l1_ttl)
+        return value, fresh_for > 0
+
+    def _set_l1(self, key: str, value: Any, ttl: float, stale_ttl: float) -> None:
+        self.l1.set(key, (value, time.monotonic() + ttl), ttl=ttl + stale_ttl)
+
+    def _set_l2(self, key: str, value: Any, ttl: float, stale_ttl: float) -> None:
+        if not self._redis_available():
+            return
+        try:
+            payload = self.encode(value)
+        except Exception as e:
+            logger.error(f"{self.name}: could not encode {key}: {e}")
+            return
+        self._redis_call(lambda: self.client.setex(key, int(ttl + stale_ttl), payload))
+
+    def _redis_available(self) -> bool:
+        return self.client is not None and self.breaker.state != 'open'
+
+    def _redis_call(self, fn: Callable[[], Any]) -> Any:
+        if self.client is None or not self.breaker.allow_request():
+            return None
+        try:
+            result = fn()
+        except Exception as e:
+            self.redis_errors += 1
+            self.breaker.record_failure()
+            logger.error(f"{self.name}: Redis error: {e}")
+            return None
+        self.breaker.record_success()
+        return result
+
+    # --------------------------------------------------------
+    # Serialization
+    # --------------------------------------------------------
+
+    def encode(self, value: Any) -> bytes:
+        return self.codec.encode(value)
+
+    def decode(self, raw: bytes) -> Any:
+        return self.codec.decode(raw)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'l1_hits': self.l1_hits,
+            'l2_hits': self.l2_hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'coalesced': self.coalesced,
+            'redis_errors': self.redis_errors,
+            'inflight': len(self._inflight),
+            'l1': self.l1.stats(),
+            'circuit': self.breaker.stats()
+        }
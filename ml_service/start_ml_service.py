@@ -5,7 +5,6 @@ Runs the FastAPI server with all ML models loaded
 """
 import sys
 import os
-import uvicorn
 import logging
 from pathlib import Path
 
@@ -45,8 +44,12 @@ if __name__ == "__main__":
     logger.info(f"Server will be available at http://localhost:{port}")
     logger.info(f"API documentation at http://localhost:{port}/docs")
     
+    import uvicorn
+    
+    # Serve the app imported above rather than re-resolving "api:app", so the
+    # lightweight fallback is honoured; heavy ML libraries load with the models
     uvicorn.run(
-        "api:app",
+        app,
         host=host,
         port=port,
         reload=False,  # Disable reload in production
@@ -264,6 +264,1088 @@ class TestDataValidation:
         assert len(request.available_bets) == 1
 
 
+class TestELOSimulation:
+    """Test vectorized ELO season simulation"""
+    
+    @pytest.fixture
+    def league(self):
+        from elo_system import ELORatingSystem
+        
+        elo = ELORatingSystem()
+        elo.ratings.update({'BOS': 1700, 'LAL': 1500, 'DET': 1300})
+        schedule = [
+            {'team1_id': home, 'team2_id': away}
+            for home in elo.ratings for away in elo.ratings if home != away
+        ] * 10
+        return elo, schedule
+    
+    def test_simulate_season_stats(self, league):
+        elo, schedule = league
+        
+        results = elo.simulate_season(schedule, n_simulations=500, chunk_size=128, random_state=1)
+        
+        total_wins = sum(r['mean_wins'] for r in results.values())
+        assert total_wins == pytest.approx(len(schedule))
+        assert results['BOS']['mean_wins'] > results['LAL']['mean_wins'] > results['DET']['mean_wins']
+        assert sum(results['LAL']['win_histogram']) == 500
+        assert len(results['LAL']['seed_histogram']) == 3
+        assert results['BOS']['seed_histogram'][0] > results['DET']['seed_histogram'][0]
+    
+    def test_simulate_season_matches_loop(self, league):
+        elo, schedule = league
+        
+        np.random.seed(0)
+        loop = elo._simulate_season_loop(schedule, n_simulations=300)
+        vectorized = elo.simulate_season(schedule, n_simulations=3000, random_state=0)
+        
+        for team_id in loop:
+            assert vectorized[team_id]['mean_wins'] == pytest.approx(loop[team_id]['mean_wins'], abs=1.0)
+    
+    def test_dynamic_simulation(self, league):
+        elo, schedule = league
+        schedule = [dict(game, date=idx // 3) for idx, game in enumerate(schedule)]
+        
+        days = elo._schedule_game_days(schedule, *elo._schedule_arrays(schedule)[1:3])
+        results = elo.simulate_season(schedule, n_simulations=500, random_state=2, dynamic=True)
+        
+        # Every game lands in exactly one batch with no team repeated inside it
+        assert sum(len(day) for day in days) == len(schedule)
+        assert sum(r['mean_wins'] for r in results.values()) == pytest.approx(len(schedule))
+        assert results['BOS']['mean_wins'] > results['DET']['mean_wins']
+        # Starting ratings are left untouched
+        assert elo.ratings['BOS'] == 1700
+
+
+class TestPoissonModel:
+    """Test cached Poisson score distributions"""
+    
+    def test_distribution_matches_skellam(self):
+        from scipy.stats import skellam
+        from poisson_model import get_score_distribution
+        
+        dist = get_score_distribution(112.0, 108.0)
+        
+        assert dist.win_probability() == pytest.approx(skellam.sf(0, 112.0, 108.0), abs=1e-9)
+        assert dist.cover_probability(3.5) == pytest.approx(skellam.sf(3.5, 112.0, 108.0), abs=1e-9)
+        assert get_score_distribution(112.001, 107.999) is dist
+    
+    def test_alt_line_ladder(self):
+        from poisson_model import PoissonModel
+        
+        model = PoissonModel()
+        team1 = {'off_rating': 115, 'def_rating': 108}
+        team2 = {'off_rating': 110, 'def_rating': 112}
+        
+        ladder = model.calculate_total_probability(team1, team2, np.arange(210.5, 240.5, 1.0))
+        
+        assert ladder['over_probability'].shape == (30,)
+        assert np.all(np.diff(ladder['over_probability']) < 0)
+    
+    def test_simulate_slate(self):
+        from poisson_model import PoissonModel
+        
+        model = PoissonModel(random_state=3)
+        strong = {'off_rating': 118, 'def_rating': 106}
+        weak = {'off_rating': 104, 'def_rating': 116}
+        
+        slate = model.simulate_slate([(strong, weak), (weak, strong)], n_simulations=5000)
+        
+        assert slate['margin_quantiles'].shape == (2, 5)
+        assert slate['team1_win_pct'][0] > 0.5 > slate['team1_win_pct'][1]
+        assert np.allclose(slate['team1_win_pct'] + slate['team2_win_pct'] + slate['tie_pct'], 1)
+
+
+class TestHistoricalSimulator:
+    """Test columnar backtesting"""
+    
+    @pytest.fixture
+    def games(self):
+        rng = np.random.default_rng(0)
+        n = 120
+        favorite_score = rng.poisson(112, n)
+        underdog_score = rng.poisson(108, n)
+        favorites = np.array([f"F{i}" for i in range(n)])
+        underdogs = np.array([f"U{i}" for i in range(n)])
+        
+        return pd.DataFrame({
+            'date': pd.date_range('2024-01-01', periods=30).repeat(4),
+            'game_id': np.arange(n),
+            'matchup': 'AWAY @ HOME',
+            'favorite': favorites,
+            'favorite_score': favorite_score,
+            'underdog_score': underdog_score,
+            'winner': np.where(favorite_score > underdog_score, favorites, underdogs),
+            'spread': 3.5,
+            'total_line': 220.5
+        })
+    
+    @pytest.mark.parametrize('row_strategy,vectorized_strategy', [
+        ('kelly_strategy', 'kelly_strategy_vectorized'),
+        ('flat_bet_strategy', 'flat_bet_strategy_vectorized'),
+    ])
+    def test_vectorized_matches_row_simulation(self, games, row_strategy, vectorized_strategy):
+        import historical_simulator
+        from historical_simulator import HistoricalSimulator
+        
+        simulator = HistoricalSimulator()
+        expected = simulator.run_simulation(getattr(historical_simulator, row_strategy), games)
+        result = simulator.run_simulation_vectorized(getattr(historical_simulator, vectorized_strategy), games)
+        
+        assert result['final_bankroll'] == pytest.approx(expected['final_bankroll'])
+        assert len(result['bet_history']) == len(expected['bet_history'])
+        assert [d['bankroll'] for d in result['daily_results']] == pytest.approx(
+            [d['bankroll'] for d in expected['daily_results']]
+        )
+        assert result['performance']['max_loss_streak'] == expected['performance']['max_loss_streak']
+    
+    def test_search_parameters(self, games):
+        from historical_simulator import HistoricalSimulator, flat_bet_strategy_vectorized, vectorized_template
+        
+        simulator = HistoricalSimulator()
+        search = simulator.search_parameters(
+            vectorized_template(flat_bet_strategy_vectorized),
+            {'unit_size': [10, 50, 100, 200]},
+            games,
+            metric='profit',
+            n_workers=1,
+            top_k=2,
+            prune_fraction=0.5
+        )
+        
+        assert search['pruned'] == 2
+        assert len(search['top_results']) == 2
+        best = search['top_results'][0]
+        assert best['params'] == search['best_params']
+        assert best['result']['total_profit'] == pytest.approx(best['score'])
+    
+    def test_monte_carlo_bootstrap(self, games):
+        from historical_simulator import HistoricalSimulator, kelly_strategy_vectorized
+        
+        simulator = HistoricalSimulator()
+        full = simulator.run_simulation_vectorized(kelly_strategy_vectorized, games)
+        
+        # A single block spanning every date replays the historical season exactly
+        replay = simulator.monte_carlo_bootstrap(kelly_strategy_vectorized, games, n_simulations=2, block_size=30)
+        assert replay['simulations']['final_bankroll'] == pytest.approx([full['final_bankroll']] * 2)
+        
+        bootstrap = simulator.monte_carlo_bootstrap(
+            kelly_strategy_vectorized, games, n_simulations=400, block_size=3, chunk_size=64, random_state=0
+        )
+        assert bootstrap['simulations']['roi'].shape == (400,)
+        assert 0 <= bootstrap['analysis']['ruin_probability'] <= 100
+        assert bootstrap['analysis']['mean_max_drawdown'] <= 0
+
+    
+    def test_shared_frame_round_trips_object_columns(self, games, tmp_path):
+        from historical_simulator import _load_shared_frame, _share_frame
+        
+        games = games.assign(date=games['date'].dt.date, winner=games['winner'].where(games.index % 7 != 0, None))
+        columns, kept = _share_frame(games, tmp_path)
+        shared = _load_shared_frame(tmp_path, columns, kept)
+        
+        # Dates and None survive unchanged, so date pruning and comparisons match
+        assert set(kept) == {'date', 'winner'}
+        assert shared['date'].tolist() == games['date'].tolist()
+        assert shared['winner'].isna().sum() == games['winner'].isna().sum()
+        assert shared['favorite'].tolist() == games['favorite'].tolist()
+
+
+class TestParlayOptimizer:
+    """Test branch-and-bound parlay search"""
+    
+    @pytest.fixture
+    def bets(self):
+        rng = np.random.default_rng(5)
+        bet_types = ['total_over', 'total_under', 'favorite_spread', 'underdog_spread']
+        return [
+            {
+                'bet_id': i,
+                'game_id': int(rng.integers(0, 4)),
+                'bet_type': bet_types[i % 4],
+                'date': '2026-01-20',
+                'odds': int(rng.choice([-150, -110, 120, 150])),
+                'win_probability': float(rng.uniform(0.4, 0.65))
+            }
+            for i in range(12)
+        ]
+    
+    def test_matches_exhaustive_search(self, bets):
+        from itertools import combinations
+        from parlay_optimizer import ParlayOptimizer
+        
+        optimizer = ParlayOptimizer(max_legs=5)
+        expected = []
+        for k in range(2, 6):
+            for combo in combinations(bets, k):
+                result = optimizer._build_parlay_result(
+                    list(combo), optimizer.calculate_parlay_probability(list(combo)), 1000
+                )
+                if result['expected_value'] >= 0:
+                    expected.append(result['score'])
+        expected = sorted(expected, reverse=True)[:20]
+        
+        parlays = optimizer.optimize_parlay(bets)
+        
+        assert [p['score'] for p in parlays] == pytest.approx(expected)
+        assert optimizer.last_search_stats['complete']
+    
+    def test_beam_mode(self, bets):
+        from parlay_optimizer import ParlayOptimizer
+        
+        optimizer = ParlayOptimizer(max_legs=5)
+        exact = optimizer.optimize_parlay(bets)
+        beam = optimizer.optimize_parlay(bets, beam_width=10)
+        
+        assert len(beam) > 0
+        assert beam[0]['score'] <= exact[0]['score'] + 1e-6
+    
+    def test_correlation_index(self, bets):
+        from parlay_optimizer import ParlayOptimizer
+        
+        optimizer = ParlayOptimizer()
+        index = optimizer.build_correlation_index(bets)
+        
+        for i in range(len(bets)):
+            for j in range(i + 1, len(bets)):
+                assert index.matrix[i, j] == pytest.approx(optimizer.get_correlation(bets[i], bets[j]))
+        
+        legs = [bets[0], bets[3], bets[5], bets[8]]
+        parlay = index.parlay(index.indices(legs))
+        expected = optimizer.calculate_parlay_probability(legs)
+        assert parlay.probability == pytest.approx(expected)
+        
+        parlay.add(10).remove(10)
+        assert parlay.probability == pytest.approx(expected)
+    
+    def test_round_robin(self, bets):
+        from parlay_optimizer import ParlayOptimizer
+        
+        optimizer = ParlayOptimizer()
+        parlays = optimizer.generate_round_robin(bets[:6], 3)
+        
+        assert 0 < len(parlays) <= 20
+        assert all(p['num_legs'] == 3 and p['expected_value'] >= 0 for p in parlays)
+
+
+class TestPortfolioOptimizer:
+    """Test portfolio optimization"""
+    
+    @pytest.fixture
+    def opportunities(self):
+        rng = np.random.default_rng(1)
+        return [
+            {
+                'id': i,
+                'game_id': i // 2,
+                'team': f"T{i % 7}",
+                'opponent': f"T{(i + 3) % 7}",
+                'sport': 'nba' if i % 3 else 'nfl',
+                'date': '2026-01-20',
+                'expected_return': float(rng.normal(0.04, 0.03)),
+                'risk': float(rng.uniform(0.5, 1.0))
+            }
+            for i in range(20)
+        ]
+    
+    def test_correlation_matrix_matches_pairwise(self, opportunities):
+        from portfolio_optimizer import PortfolioOptimizer
+        
+        optimizer = PortfolioOptimizer()
+        matrix = optimizer._build_correlation_matrix(opportunities)
+        
+        for i in range(len(opportunities)):
+            for j in range(i + 1, len(opportunities)):
+                assert matrix[i, j] == optimizer._calculate_correlation(opportunities[i], opportunities[j])
+        assert np.all(np.diag(matrix) == 1.0)
+    
+    def test_sharpe_gradient(self, opportunities):
+        from scipy.optimize import approx_fprime
+        from portfolio_optimizer import PortfolioOptimizer
+        
+        optimizer = PortfolioOptimizer()
+        returns = np.array([o['expected_return'] for o in opportunities])
+        risks = np.array([o['risk'] for o in opportunities])
+        cov = np.outer(risks, risks) * optimizer._build_correlation_matrix(opportunities)
+        weights = np.random.default_rng(2).uniform(0, 0.05, len(opportunities))
+        
+        _, grad = optimizer._negative_sharpe_with_grad(weights, returns, cov)
+        numeric = approx_fprime(weights, lambda w: optimizer._negative_sharpe_with_grad(w, returns, cov)[0], 1e-7)
+        
+        assert grad == pytest.approx(numeric, rel=1e-4, abs=1e-6)
+    
+    def test_rebalance_warm_start(self, opportunities):
+        from portfolio_optimizer import PortfolioOptimizer
+        
+        optimizer = PortfolioOptimizer()
+        optimal = optimizer.optimize_portfolio(opportunities[:15])
+        positions = [dict(a['opportunity'], stake=a['stake']) for a in optimal['allocation']]
+        
+        rebalanced = optimizer.rebalance_portfolio(positions, opportunities[15:])
+        
+        assert 'note' not in rebalanced['optimal_portfolio']
+        assert rebalanced['optimal_portfolio']['total_stake'] == pytest.approx(0.5 * optimizer.total_bankroll, rel=1e-3)
+
+
+class TestTTLCache:
+    """Test bounded in-process cache"""
+    
+    def test_lru_eviction(self):
+        from caching import TTLCache
+        
+        cache = TTLCache(max_entries=2, sweep_interval=None)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert 'b' not in cache
+        assert cache.get('a') == 1 and cache.get('c') == 3
+        assert cache.stats()['evictions'] == 1
+    
+    def test_byte_bound(self):
+        from caching import TTLCache
+        
+        cache = TTLCache(max_entries=100, max_bytes=100, sizeof=len, sweep_interval=None)
+        for i in range(5):
+            cache.set(i, 'x' * 30)
+        
+        assert len(cache) == 3
+        assert cache.stats()['bytes'] == 90
+    
+    def test_ttl_expiry_and_sweep(self):
+        import time
+        from caching import TTLCache
+        
+        cache = TTLCache(default_ttl=0.01, sweep_interval=None)
+        cache.set('short', 1)
+        cache.set('forever', 2, ttl=None)
+        time.sleep(0.02)
+        
+        assert cache.sweep() == 1
+        assert cache.get('short') is None
+        assert cache.get('forever') == 2
+        assert cache.stats()['expirations'] == 1
+
+
+class TestTieredCache:
+    """Test two-tier response cache"""
+    
+    def test_concurrent_misses_compute_once(self):
+        import asyncio
+        from tiered_cache import TieredCache
+        
+        cache = TieredCache(client=None)
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {'value': len(calls)}
+        
+        async def run():
+            return await asyncio.gather(*[cache.get_or_compute('key', compute) for _ in range(50)])
+        
+        results = asyncio.run(run())
+        
+        assert len(calls) == 1
+        assert all(r == {'value': 1} for r in results)
+        assert cache.stats()['coalesced'] == 49
+    
+    def test_cancelled_leader_and_stale_sync_reads(self):
+        import asyncio
+        import time
+        from tiered_cache import TieredCache
+        
+        cache = TieredCache(client=None)
+        
+        async def compute():
+            await asyncio.sleep(0.05)
+            return 'value'
+        
+        async def run():
+            leader = asyncio.ensure_future(cache.get_or_compute('key', compute))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(cache.get_or_compute('key', compute))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower, leader.cancelled()
+        
+        # Cancelling the caller that started the load doesn't fail the others
+        assert asyncio.run(run()) == ('value', True)
+        
+        # Sync reads treat stale entries as misses so the caller recomputes
+        cache.set('old', 'value', ttl=0.01, stale_ttl=60)
+        time.sleep(0.02)
+        assert cache.get('old') is None
+        assert cache.get('key') == 'value'
+    
+    def test_circuit_breaker_opens_and_recovers(self):
+        import time
+        from tiered_cache import CircuitBreaker
+        
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+        for _ in range(3):
+            assert breaker.allow_request()
+            breaker.record_failure()
+        
+        assert breaker.state == 'open'
+        assert not breaker.allow_request()
+        
+        time.sleep(0.06)
+        assert breaker.allow_request()
+        assert not breaker.allow_request()  # one trial at a time
+        breaker.record_success()
+        assert breaker.state == 'closed'
+
+
+class TestSerialization:
+    """Test cache codecs"""
+    
+    def test_binary_codec_round_trip(self):
+        from serialization import BinaryCodec, JSONCodec
+        
+        codec = BinaryCodec(min_list_size=4)
+        payload = {
+            'pmf': np.linspace(0, 1, 11),
+            'matrix': np.arange(12, dtype=np.int32).reshape(3, 4),
+            'draws': [0.5, 1.5, 2.5, 3.5, 4.5],
+            'meta': {'player': 'LeBron James', 'line': 25.5, 'flags': [1, 2]}
+        }
+        
+        raw = codec.encode(payload)
+        decoded = codec.decode(raw)
+        
+        np.testing.assert_array_equal(decoded['pmf'], payload['pmf'])
+        np.testing.assert_array_equal(decoded['matrix'], payload['matrix'])
+        assert decoded['matrix'].dtype == np.int32
+        assert not decoded['pmf'].flags.writeable  # zero-copy view on the payload
+        assert decoded['draws'] == payload['draws']
+        assert decoded['meta'] == payload['meta']
+        
+        # JSON entries written before the switch still decode
+        assert codec.decode(JSONCodec().encode({'a': 1})) == {'a': 1}
+        
+        # A mistyped CACHE_CODEC falls back instead of failing API import
+        from serialization import get_codec
+        assert isinstance(get_codec('bnary'), BinaryCodec)
+
+
+class TestPropInference:
+    """Test batch player prop scoring"""
+    
+    def test_batch_matches_single_prop_scoring(self):
+        from prop_inference import BaselinePropModel, PropEnsemble, build_prop_features, score_props
+        
+        ensemble = PropEnsemble([BaselinePropModel()])
+        props = [
+            {'player_name': f'Player {i}', 'stat_type': stat, 'line': line, 'opponent': 'BOS', 'is_home': i % 2 == 0}
+            for i, (stat, line) in enumerate([('points', 24.5), ('rebounds', 8.5), ('assists', 6.5), ('threes', 2.5)] * 5)
+        ]
+        
+        X = build_prop_features(props)
+        batch = score_props(props, X, ensemble)
+        single = [score_props([prop], build_prop_features([prop]), ensemble)[0] for prop in props]
+        
+        assert X.shape == (20, 13)
+        assert [r['prediction'] for r in batch] == [r['prediction'] for r in single]
+        assert all(0 < r['over_probability'] < 1 for r in batch)
+        assert all(r['recommendation'] in ('OVER', 'UNDER', 'PASS') for r in batch)
+
+
+class TestMicroBatching:
+    """Test micro-batching inference scheduler"""
+    
+    def test_concurrent_requests_share_batches(self):
+        import asyncio
+        from micro_batching import MicroBatcher
+        
+        batch_sizes = []
+        
+        def predict(items):
+            batch_sizes.append(len(items))
+            return [item * 2 for item in items]
+        
+        batcher = MicroBatcher(predict, max_batch_size=16, max_wait_ms=20)
+        
+        async def run():
+            return await asyncio.gather(*[batcher.submit(i) for i in range(40)])
+        
+        results = asyncio.run(run())
+        
+        assert results == [i * 2 for i in range(40)]
+        assert max(batch_sizes) == 16
+        assert len(batch_sizes) <= 4
+        assert batcher.stats()['rows'] == 40
+    
+    def test_errors_reach_every_caller(self):
+        import asyncio
+        from micro_batching import MicroBatcher
+        
+        def predict(items):
+            raise RuntimeError("model unavailable")
+        
+        batcher = MicroBatcher(predict, max_wait_ms=5)
+        
+        async def run():
+            return await asyncio.gather(*[batcher.submit(i) for i in range(3)], return_exceptions=True)
+        
+        results = asyncio.run(run())
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert batcher.stats()['errors'] >= 1
+
+
+class TestInferenceExecutor:
+    """Test bounded inference executor"""
+    
+    def test_rejects_when_backlog_full(self):
+        import asyncio
+        import threading
+        from inference_executor import ExecutorSaturated, InferenceExecutor
+        
+        executor = InferenceExecutor(max_threads=1, thread_queue_size=1)
+        release = threading.Event()
+        
+        async def run():
+            blocked = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            try:
+                await executor.run(sum, [1, 2])
+            except ExecutorSaturated:
+                rejected = True
+            else:
+                rejected = False
+            release.set()
+            await asyncio.gather(*blocked)
+            return rejected, await executor.run(sum, [1, 2])
+        
+        rejected, result = asyncio.run(run())
+        executor.shutdown()
+        
+        assert rejected
+        assert result == 3
+        assert executor.stats()['threads']['rejected'] == 1
+
+    def test_cancelled_request_keeps_slot_until_work_finishes(self):
+        import asyncio
+        import threading
+        from inference_executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_threads=1, thread_queue_size=1)
+        started, release = threading.Event(), threading.Event()
+
+        def work():
+            started.set()
+            release.wait(5)
+
+        async def run():
+            task = asyncio.ensure_future(executor.run(work))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            pending_after_cancel = executor.threads.pending
+            release.set()
+            for _ in range(100):
+                if executor.threads.pending == 0:
+                    break
+                await asyncio.sleep(0.01)
+            return pending_after_cancel, executor.threads.pending
+
+        pending_after_cancel, pending_after_work = asyncio.run(run())
+        executor.shutdown()
+
+        # A disconnected client doesn't free the thread its work still occupies
+        assert pending_after_cancel == 1
+        assert pending_after_work == 0
+
+
+class TestModelRegistry:
+    """Test process-wide model registry"""
+    
+    def test_loads_warms_and_shares_artifacts(self, tmp_path):
+        import pickle
+        from sklearn.preprocessing import StandardScaler
+        from model_registry import ModelRegistry
+        
+        (tmp_path / "player_props").mkdir()
+        scaler = StandardScaler().fit(np.random.default_rng(0).normal(size=(50, 13)))
+        with open(tmp_path / "player_props" / "scaler.pkl", 'wb') as f:
+            pickle.dump(scaler, f)
+        
+        registry = ModelRegistry(tmp_path)
+        assert not registry.ready
+        
+        registry.start()
+        
+        assert registry.ready
+        assert registry.names() == ['player_props/scaler']
+        assert registry.handles['player_props/scaler'].warmup_ms is not None
+        assert not registry.get('player_props/scaler').mean_.flags.writeable
+        assert registry.prop_ensemble.version == 'baseline_v1'
+        
+        path = tmp_path / "player_props" / "scaler.pkl"
+        assert registry.load_artifact(path) is registry.load_artifact(path)
+    
+    def test_reload_drains_leased_generation(self, tmp_path):
+        import os
+        import pickle
+        from sklearn.preprocessing import StandardScaler
+        from model_registry import ModelRegistry
+        
+        path = tmp_path / "scaler.pkl"
+        with open(path, 'wb') as f:
+            pickle.dump(StandardScaler().fit(np.ones((5, 13))), f)
+        
+        registry = ModelRegistry(tmp_path).start()
+        assert not registry.reload()
+        
+        lease = registry.acquire()
+        old = lease.generation
+        os.utime(path, ns=(0, 0))
+        
+        assert registry.reload()
+        assert registry.current is not old
+        assert registry.generations()['draining'][0]['version'] == old.version
+        
+        lease.release()
+        lease.release()
+        assert old.refs == 0
+        assert registry.generations()['draining'] == []
+        
+        # A retrained artifact that no longer loads doesn't replace the working one
+        live = registry.current
+        path.write_bytes(b"not a pickle")
+        assert not registry.reload()
+        assert registry.current is live
+        assert 'scaler' in registry.generations()['last_reload_error']
+    
+    def test_startup_failures_are_recorded_and_loads_dont_block_leases(self, tmp_path, monkeypatch):
+        import threading
+        import model_registry as registry_module
+        from model_registry import ModelRegistry
+        
+        def broken(*args, **kwargs):
+            raise RuntimeError("boom")
+        
+        # A failing prop warm-up is logged, not fatal
+        monkeypatch.setattr(registry_module, 'score_props', broken)
+        assert ModelRegistry(tmp_path).start().ready
+        
+        # A failing build is surfaced in status() until a retry succeeds
+        registry = ModelRegistry(tmp_path)
+        with pytest.raises(RuntimeError):
+            registry.acquire()
+        with monkeypatch.context() as patch:
+            patch.setattr(registry_module.PropEnsemble, 'from_artifacts', broken)
+            with pytest.raises(RuntimeError):
+                registry.start()
+        assert not registry.ready
+        assert registry.status()['start_error'] == "RuntimeError: boom"
+        registry.start()
+        assert registry.ready and registry.status()['start_error'] is None
+        
+        # Ad-hoc artifact loads don't hold the lock leases need
+        def slow_loader(path):
+            leased = threading.Event()
+            threading.Thread(target=lambda: (registry.acquire().release(), leased.set())).start()
+            assert leased.wait(1)
+            return 'model'
+        
+        (tmp_path / "extra.bin").write_bytes(b"")
+        assert registry.load_artifact(tmp_path / "extra.bin", loader=slow_loader) == 'model'
+
+
+class TestModelArtifacts:
+    """Test flat memory-mapped model artifacts"""
+    
+    def test_flat_trees_match_native_models(self, tmp_path):
+        import lightgbm as lgb
+        import xgboost as xgb
+        from model_artifacts import flatten_trees, load_flat_artifact, mapped_bytes, save_flat_artifact
+        
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(300, 5))
+        y = X[:, 0] - 2 * X[:, 1] + rng.normal(scale=0.1, size=300)
+        # Spans several scoring chunks, the last one partial
+        X_test = rng.normal(size=(300, 5))
+        X_test[::7, 2] = np.nan
+        
+        models = {
+            'xgb': xgb.XGBRegressor(n_estimators=30, max_depth=4).fit(X, y),
+            'lgb': lgb.LGBMClassifier(n_estimators=30, verbose=-1).fit(X, y > 0)
+        }
+        for name, model in models.items():
+            save_flat_artifact(flatten_trees(model), tmp_path / f"{name}.pkl")
+            flat = load_flat_artifact(tmp_path / f"{name}.npy")
+            
+            assert mapped_bytes(flat) > 0
+            if name == 'xgb':
+                np.testing.assert_allclose(flat.predict(X_test), model.predict(X_test), atol=1e-4)
+            else:
+                np.testing.assert_allclose(flat.predict_proba(X_test), model.predict_proba(X_test), atol=1e-6)
+                assert (flat.predict(X_test) == model.predict(X_test)).all()
+    
+    def test_registry_prefers_flat_scaler(self, tmp_path):
+        import pickle
+        from sklearn.preprocessing import StandardScaler
+        from model_artifacts import flatten_scaler, save_flat_artifact
+        from model_registry import ModelRegistry
+        
+        X = np.random.default_rng(1).normal(size=(40, 13))
+        scaler = StandardScaler().fit(X)
+        with open(tmp_path / "scaler.pkl", 'wb') as f:
+            pickle.dump(scaler, f)
+        save_flat_artifact(flatten_scaler(scaler), tmp_path / "scaler.pkl")
+        
+        registry = ModelRegistry(tmp_path).start()
+        
+        assert registry.handles['scaler'].path.suffix == '.npy'
+        np.testing.assert_allclose(registry.get('scaler').transform(X), scaler.transform(X))
+        assert registry.memory()['mapped_artifacts'] == 1
+        assert ModelRegistry(tmp_path, prefer_flat=False).start().handles['scaler'].path.suffix == '.pkl'
+        
+        # A retrained pickle behind an old export is detected and served instead
+        fingerprint = registry.fingerprint()
+        retrained = StandardScaler().fit(X * 2)
+        with open(tmp_path / "scaler.pkl", 'wb') as f:
+            pickle.dump(retrained, f)
+        assert registry.fingerprint() != fingerprint
+        assert registry.reload()
+        assert registry.handles['scaler'].path.suffix == '.pkl'
+        np.testing.assert_allclose(registry.get('scaler').transform(X), retrained.transform(X))
+    
+    def test_failed_export_removes_stale_pair(self, tmp_path):
+        import pickle
+        from sklearn.preprocessing import StandardScaler
+        from model_artifacts import export_flat_artifacts
+        
+        with open(tmp_path / "scaler.pkl", 'wb') as f:
+            pickle.dump(StandardScaler().fit(np.ones((5, 3))), f)
+        assert export_flat_artifacts(tmp_path) == {'scaler.pkl': 'exported'}
+        assert (tmp_path / "scaler.npy").exists()
+        
+        with open(tmp_path / "scaler.pkl", 'wb') as f:
+            pickle.dump({'not': 'a model'}, f)
+        assert export_flat_artifacts(tmp_path)['scaler.pkl'] != 'exported'
+        assert not (tmp_path / "scaler.npy").exists() and not (tmp_path / "scaler.json").exists()
+
+
+class TestOddsBuffer:
+    """Test columnar ring-buffer odds store"""
+    
+    def test_window_matches_object_history(self):
+        from datetime import datetime, timedelta
+        from realtime_analytics_engine import LineMovementDetector, LiveOdds, OddsBuffer
+        
+        start = datetime(2026, 1, 1, 19)
+        ticks = [
+            LiveOdds('g1', start + timedelta(seconds=30 * i), 'BOS', 'NYK', -150 + i, 130 - i,
+                     -3.5 + 0.5 * (i % 3), 3.5, -110, -110, 220.5, book=f"book{i % 4}")
+            for i in range(25)
+        ]
+        buffer = OddsBuffer(capacity=10)
+        for odds in ticks:
+            buffer.add(odds)
+        
+        window = buffer.get_window('g1')
+        assert len(window) == 10
+        assert np.shares_memory(window.spread_home, buffer.by_event['g1'].values)
+        assert buffer.get_history('g1') == ticks[-10:]
+        assert buffer.get_latest('g1') == ticks[-1]
+        
+        detector = LineMovementDetector()
+        assert detector.detect_line_movement(window) == detector.detect_line_movement(ticks[-10:])
+    
+    def test_streaming_detector_matches_full_scan(self):
+        from datetime import datetime, timedelta
+        from realtime_analytics_engine import LineMovementDetector, LiveOdds, OddsBuffer, StreamingLineDetector
+        
+        rng = np.random.default_rng(3)
+        start = datetime(2026, 1, 1, 19)
+        buffer = OddsBuffer(capacity=20)
+        detector = LineMovementDetector()
+        tracker = StreamingLineDetector(detector, capacity=20, range_minutes=5)
+        
+        for i in range(200):
+            buffer.add(LiveOdds('g1', start + timedelta(seconds=int(15 * i + rng.integers(0, 3))), 'BOS', 'NYK',
+                                -150 + rng.integers(-20, 20), 130, -3.5 + 0.5 * rng.integers(-2, 3), 3.5,
+                                -110, -110, 220.5))
+            window = buffer.get_window('g1')
+            streamed = tracker.update(window)
+            scanned = detector.detect_line_movement(window)
+            
+            assert streamed['detected'] == scanned['detected']
+            assert streamed.get('movements') == scanned.get('movements')
+            assert streamed.get('velocity', 0.0) == pytest.approx(scanned.get('velocity', 0.0))
+            if len(window) < 2:
+                continue
+            recent = window.spread_home[window.timestamp >= window.timestamp[-1] - 5 * 60e9]
+            assert (streamed['spread_low'], streamed['spread_high']) == (recent.min(), recent.max())
+
+
+class TestEventBus:
+    """Test asyncio pub/sub bus with per-subscriber backpressure"""
+    
+    def test_slow_subscriber_coalesces_without_blocking(self):
+        import asyncio
+        from event_bus import COALESCE_LATEST, EventBus
+        
+        async def scenario():
+            bus = EventBus(default_maxsize=3)
+            bus.configure('odds', COALESCE_LATEST, key=lambda odds: odds['event_id'])
+            fast = bus.subscribe('odds')
+            slow_seen = []
+            
+            async def slow(message):
+                await asyncio.sleep(0.05)
+                slow_seen.append(message)
+            
+            bus.subscribe_callback('signals', slow)
+            
+            start = asyncio.get_running_loop().time()
+            for i in range(10):
+                bus.publish('odds', {'event_id': f"g{i % 2}", 'price': i})
+                bus.publish('signals', {'n': i})
+            assert asyncio.get_running_loop().time() - start < 0.05
+            
+            received = [await fast.get() for _ in range(2)]
+            await asyncio.sleep(0.3)
+            return bus, fast, received, slow_seen
+        
+        bus, fast, received, slow_seen = asyncio.run(scenario())
+        
+        # Latest odds per event survive coalescing; signals beyond maxsize drop oldest
+        assert [m['price'] for _, m in received] == [8, 9]
+        assert fast.coalesced == 8 and fast.dropped == 0
+        assert slow_seen == [{'n': 7}, {'n': 8}, {'n': 9}]
+        assert bus.stats()['published'] == {'odds': 10, 'signals': 10}
+    
+    def test_odds_feed_pushes_changed_games_and_websocket_cleans_up(self):
+        import asyncio
+        import time
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from live_odds_aggregator import LiveOddsAggregator
+        from realtime_analytics_engine import StreamingEngine, realtime_api
+        from stream_api import OddsFeed, router
+        
+        def poll(home_spread):
+            return [
+                {'game_id': f"g{g}", 'home_team': f"H{g}", 'away_team': f"A{g}", 'bookmaker': 'fanduel',
+                 'spread': {'home': spread, 'away': -spread, 'home_odds': -110, 'away_odds': -110},
+                 'moneyline': {'home': -150, 'away': 130},
+                 'total': {'value': 221.5, 'over_odds': -110, 'under_odds': -110}}
+                for g, spread in enumerate([home_spread, 4.5])
+            ]
+        
+        class ReplayAggregator(LiveOddsAggregator):
+            """Real aggregation over recorded polls instead of HTTP"""
+            def __init__(self, polls):
+                super().__init__()
+                self.api_keys = {'replay': 'key'}
+                self.polls = iter(polls)
+            
+            async def fetch_all_odds(self, sport='basketball_nba', markets=None):
+                self._apply_odds(sport, next(self.polls))
+                return list(self.games[sport].values())
+        
+        async def run():
+            engine = StreamingEngine()
+            subscription = engine.bus.subscribe('odds')
+            feed = OddsFeed(engine, ReplayAggregator([poll(-3.0), poll(-3.0), poll(-3.5)]))
+            pushed, published = [], []
+            for _ in range(3):
+                pushed.append(await feed.poll_once())
+                while subscription.stats()['depth']:
+                    published.append((await subscription.get())[1]['event_id'])
+            return pushed, published
+        
+        # Unchanged games are not re-published
+        assert asyncio.run(run()) == ([2, 0, 1], ['g0', 'g1', 'g0'])
+        
+        # A client that leaves a quiet channel releases its subscription
+        app = FastAPI()
+        app.include_router(router)
+        bus = realtime_api.streaming_engine.bus
+        before = len(bus.subscriptions)
+        with TestClient(app).websocket_connect('/api/v2/stream?channels=line_movement'):
+            assert len(bus.subscriptions) == before + 1
+        deadline = time.monotonic() + 2
+        while len(bus.subscriptions) > before and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(bus.subscriptions) == before
+        
+        # Channels without a producer in the app aren't offered
+        assert TestClient(app).get('/api/v2/stream/sse?channels=signals').status_code == 400
+
+
+class TestLiveOddsAggregator:
+    """Test pooled, concurrent odds fetching against a local stub server"""
+    
+    # Recorded The Odds API payload, trimmed to one game
+    RECORDED_ODDS = [{
+        'id': 'g1', 'commence_time': '2025-01-15T00:00:00Z',
+        'home_team': 'Boston Celtics', 'away_team': 'Miami Heat',
+        'bookmakers': [{
+            'key': 'fanduel', 'last_update': '2025-01-14T20:00:00Z',
+            'markets': [
+                {'key': 'h2h', 'outcomes': [{'name': 'Boston Celtics', 'price': -180},
+                                            {'name': 'Miami Heat', 'price': 155}]},
+                {'key': 'spreads', 'outcomes': [{'name': 'Boston Celtics', 'price': -110, 'point': -4.5},
+                                                {'name': 'Miami Heat', 'price': -110, 'point': 4.5}]},
+                {'key': 'totals', 'outcomes': [{'name': 'Over', 'price': -105, 'point': 221.5},
+                                               {'name': 'Under', 'price': -115, 'point': 221.5}]}
+            ]
+        }]
+    }]
+    
+    def test_markets_fetched_concurrently_over_one_pool(self):
+        import asyncio
+        import time
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+        from live_odds_aggregator import LiveOddsAggregator
+        
+        requests, peers = [], set()
+        
+        async def odds(request):
+            market = request.query['markets']
+            requests.append(market)
+            peers.add(request.transport.get_extra_info('peername'))
+            if requests.count(market) == 1 and market == 'totals':
+                return web.Response(status=503)  # transient failure, retried
+            await asyncio.sleep(0.2)
+            return web.json_response(self.RECORDED_ODDS)
+        
+        async def rate_limited(request):
+            return web.Response(status=429, headers={'Retry-After': '3600'})
+        
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/v4/sports/{sport}/odds', odds)
+            app.router.add_get('/limited', rate_limited)
+            async with TestServer(app) as server:
+                aggregator = LiveOddsAggregator(
+                    base_urls={'the_odds_api': str(server.make_url('/v4/sports'))},
+                    retry_backoff=0.01
+                )
+                aggregator.api_keys['the_odds_api'] = 'test'
+                async with aggregator:
+                    start = time.perf_counter()
+                    first = await aggregator._fetch_the_odds_api('basketball_nba', ['h2h', 'spreads', 'totals'])
+                    elapsed = time.perf_counter() - start
+                    second = await aggregator._fetch_the_odds_api('basketball_nba', ['h2h', 'spreads', 'totals'])
+                    
+                    # An hour-long Retry-After gives up instead of stalling the poll
+                    start = time.perf_counter()
+                    assert await aggregator._get_json('the_odds_api', str(server.make_url('/limited'))) is None
+                    assert time.perf_counter() - start < 1
+                return first, second, elapsed
+        
+        first, second, elapsed = asyncio.run(scenario())
+        
+        assert [game['market_type'] for game in first] == ['h2h', 'spreads', 'totals']
+        assert first == second
+        # Three 200ms markets in parallel, not 600ms in sequence
+        assert elapsed < 0.5
+        # Keep-alive: the second poll reuses the first poll's connections
+        assert len(requests) == 7 and len(peers) <= 4
+    
+    def test_incremental_aggregation_matches_full_rebuild(self):
+        from live_odds_aggregator import LiveOddsAggregator
+        
+        def poll(spreads):
+            return [
+                {'game_id': g, 'home_team': f"H{g}", 'away_team': f"A{g}", 'bookmaker': book,
+                 'spread': {'home': spread, 'away': -spread, 'home_odds': -110, 'away_odds': -110},
+                 'moneyline': {'home': -150, 'away': 130}}
+                for g, spread in enumerate(spreads) for book in ('fanduel', 'draftkings')
+            ]
+        
+        aggregator = LiveOddsAggregator()
+        polls = [[-3.0, 5.5, 1.0], [-3.0, 5.5, 1.0], [-3.5, 5.5, 1.0], [-4.5, 5.5]]
+        changed = []
+        for spreads in polls:
+            changed.append(aggregator._apply_odds('nba', poll(spreads)))
+            aggregator._track_line_movements([aggregator.games['nba'][key] for key in changed[-1]])
+            # Polling another feed leaves this one's state alone
+            assert aggregator._apply_odds('nfl', []) == []
+        
+        # Only games whose quotes moved are recomputed; dropped games leave the state
+        assert changed == [['H0_A0', 'H1_A1', 'H2_A2'], [], ['H0_A0'], ['H0_A0']]
+        rebuilt = LiveOddsAggregator()
+        rebuilt._apply_odds('nba', poll(polls[-1]))
+        assert aggregator.games['nba'] == rebuilt.games['nba']
+        
+        # History keeps one delta per move and replays to full snapshots
+        assert len(aggregator.line_history['H0_A0']) == 3
+        assert len(aggregator.line_history['H1_A1']) == 1
+        spreads = [entry['consensus']['spread'] for entry in aggregator.get_line_movement('H0_A0')]
+        assert spreads == [-3.0, -3.5, -4.5]
+        assert aggregator.detect_steam_moves('H0_A0')['movement'] == 1.5
+
+
+class TestLazyImports:
+    """Test deferred loading of heavy ML libraries"""
+    
+    def test_api_import_skips_heavy_libraries(self):
+        import subprocess
+        import sys
+        from pathlib import Path
+        from lazy_imports import module_available, optional_import
+        
+        assert not module_available('not_a_real_module')
+        assert optional_import('not_a_real_module') is None
+        
+        heavy = ['torch', 'xgboost', 'lightgbm', 'sklearn', 'scipy', 'pandas']
+        result = subprocess.run(
+            [sys.executable, '-c', f"import sys, api; print([m for m in {heavy!r} if m in sys.modules])"],
+            cwd=Path(__file__).parent.parent / 'src', capture_output=True, text=True
+        )
+        assert result.stdout.strip().splitlines()[-1] == '[]'
+    
+    def test_api_imports_as_package_module(self):
+        import os
+        import subprocess
+        import sys
+        from pathlib import Path
+        
+        # Matches the Dockerfile entry point: uvicorn src.api:app from ml_service/
+        result = subprocess.run(
+            [sys.executable, '-c', "import src.api; print(type(src.api.app).__name__)"],
+            cwd=Path(__file__).parent.parent, capture_output=True, text=True,
+            env={**os.environ, 'MODEL_RELOAD_INTERVAL': '0'}
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1] == 'FastAPI'
+    
+    def test_prop_endpoints_shed_load_until_models_load(self):
+        import os
+        import subprocess
+        import sys
+        from pathlib import Path
+        
+        # No startup event has run, so no generation is loaded
+        script = (
+            "from fastapi.testclient import TestClient\n"
+            "from src.api import app, model_registry\n"
+            "prop = dict(player_id='1', player_name='A', stat_type='points', line=20.5,\n"
+            "            game_date='2025-01-15', opponent='BOS', is_home=True)\n"
+            "client = TestClient(app)\n"
+            "for path, body in [('/predict/player_prop', prop), ('/predict/player_props:batch', {'props': [prop]})]:\n"
+            "    response = client.post(path, json=body)\n"
+            "    print(response.status_code, response.headers.get('retry-after'))\n"
+            "print(model_registry.ready)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=Path(__file__).parent.parent, capture_output=True, text=True,
+            env={**os.environ, 'MODEL_RELOAD_INTERVAL': '0'}
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-3:] == ['503 5', '503 5', 'False']
+
+
 class TestIntegration:
     """Integration tests"""
     
@@ -582,6 +582,11 @@ def train_all_models():
     training_summary['models']['line_movement'] = line_metrics
     
     # Save training summary
+    # Flat .npy exports are memory-mapped by the API workers instead of the pickles
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+    from model_artifacts import export_flat_artifacts
+    training_summary['flat_artifacts'] = export_flat_artifacts('models')
+    
     summary_path = 'models/training_summary.json'
     with open(summary_path, 'w') as f:
         json.dump(training_summary, f, indent=2)